@@ -45,7 +45,7 @@ setup(
     },
     entry_points={
         "console_scripts": [
-            # Add CLI commands here if needed
+            "organ-aging-serve=organ_aging.serving:main",
         ],
     },
 )
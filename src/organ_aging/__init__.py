@@ -9,18 +9,12 @@ organ-specific biomarkers, enabling the calculation of biological age gaps for d
 __version__ = "0.1.0"
 __author__ = "Vitalist Team"
 
-from . import config
-from . import data_loading
-from . import preprocessing
-from . import features
-from . import models
-from . import evaluation
-from . import explainability
-from . import analysis
-from . import visualization
-from . import clustering
-
-__all__ = [
+import importlib
+
+# Submodules are imported on first attribute access (PEP 562), so that
+# `import organ_aging` stays cheap and scoring workers never load
+# matplotlib or scikit-learn unless a code path needs them.
+_SUBMODULES = (
     "config",
     "data_loading",
     "preprocessing",
@@ -31,4 +25,28 @@ __all__ = [
     "analysis",
     "visualization",
     "clustering",
-]
+    "scoring",
+    "bundle",
+    "serving",
+    "trees",
+    "training",
+    "binning",
+    "store",
+    "scaling",
+    "tuning",
+    "explanations",
+)
+
+__all__ = list(_SUBMODULES)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES))
@@ -0,0 +1,357 @@
+"""
+Feature binning shared across histogram gradient boosting fits.
+
+HistGradientBoostingRegressor bins its input into at most 255 quantile
+bins at the start of every fit. When the same rows are fitted many times
+(CV folds, several model configurations), the binning can be done once:
+each feature is mapped to small integer bin codes, and fits receive the
+codes instead of raw values. A feature with at most max_bins distinct
+values is binned 1:1 by HistGradientBoosting, so fitting on codes gives
+the same trees as fitting on data binned with these edges.
+
+A BinnedDataset bins a whole cohort once: every feature column gets its
+edges and uint8 codes a single time, and the result is cached under a hash
+of the data and the binning configuration. Organ clocks, CV folds and
+tuning candidates then take column and row subsets of the same codes
+instead of binning their own copy of the features.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+MISSING_CODE = 255
+
+
+def fit_bin_edges(X: np.ndarray, max_bins: int = 255) -> List[np.ndarray]:
+    """
+    Compute quantile bin edges for every feature, ignoring missing values.
+
+    Args:
+        X: Array of shape (n_samples, n_features).
+        max_bins: Maximum number of bins per feature (at most 255, code
+                 255 is reserved for missing values).
+
+    Returns:
+        List with one array of increasing inner edges per feature.
+
+    Example:
+        >>> edges = fit_bin_edges(X_train)
+        >>> codes = apply_bins(X_train, edges)
+    """
+    if not 2 <= max_bins <= 255:
+        raise ValueError(f"max_bins must be between 2 and 255, got {max_bins}")
+
+    X = np.asarray(X, dtype=np.float64)
+    quantiles = np.linspace(0, 1, max_bins + 1)[1:-1]
+
+    edges = []
+    for j in range(X.shape[1]):
+        values = X[:, j]
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            edges.append(np.empty(0))
+            continue
+
+        distinct = np.unique(values)
+        if len(distinct) <= max_bins:
+            # Midpoints keep every distinct value in its own bin
+            edges.append((distinct[:-1] + distinct[1:]) / 2)
+        else:
+            edges.append(np.unique(np.quantile(values, quantiles)))
+
+    return edges
+
+
+def apply_bins(X: np.ndarray, edges: List[np.ndarray]) -> np.ndarray:
+    """
+    Map raw feature values to uint8 bin codes.
+
+    Args:
+        X: Array of shape (n_samples, n_features).
+        edges: Bin edges from fit_bin_edges.
+
+    Returns:
+        uint8 array of the same shape; missing values get MISSING_CODE.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if X.shape[1] != len(edges):
+        raise ValueError(f"Expected {len(edges)} features, got {X.shape[1]}")
+
+    codes = np.empty(X.shape, dtype=np.uint8)
+    for j, feature_edges in enumerate(edges):
+        column = X[:, j]
+        codes[:, j] = np.searchsorted(feature_edges, column, side='left')
+        codes[np.isnan(column), j] = MISSING_CODE
+
+    return codes
+
+
+def codes_to_float(codes: np.ndarray) -> np.ndarray:
+    """
+    Convert bin codes to the float32 matrix passed to a fit.
+
+    Missing codes become NaN so the model keeps learning which side
+    missing values should go.
+
+    Args:
+        codes: uint8 bin codes from apply_bins.
+
+    Returns:
+        float32 array of bin codes with NaN for missing values.
+    """
+    X = codes.astype(np.float32)
+    X[codes == MISSING_CODE] = np.nan
+    return X
+
+
+# In-process cache of binned cohorts, keyed by BinnedDataset.key. Each
+# entry holds a whole-cohort code matrix, so only the _BINNED_CACHE_SIZE
+# most recently used are kept, oldest evicted first
+_BINNED_CACHE: Dict[str, 'BinnedDataset'] = {}
+_BINNED_CACHE_SIZE = 8
+
+
+def clear_binned_cache() -> None:
+    """
+    Drop the binned cohorts cached in memory by BinnedDataset.build.
+
+    Datasets persisted with cache_dir are left on disk.
+    """
+    _BINNED_CACHE.clear()
+
+
+def _cache_binned(key: str, dataset: 'BinnedDataset') -> 'BinnedDataset':
+    """Store a dataset as the most recently used cache entry."""
+    _BINNED_CACHE.pop(key, None)
+    _BINNED_CACHE[key] = dataset
+    while len(_BINNED_CACHE) > _BINNED_CACHE_SIZE:
+        del _BINNED_CACHE[next(iter(_BINNED_CACHE))]
+    return dataset
+
+
+class BinnedDataset:
+    """
+    uint8 bin codes of a whole cohort, computed once per feature.
+
+    Edges are fitted per column on every row of the cohort (bin edges are
+    unsupervised quantiles, so no target information is involved). Codes
+    are stored column-major, so taking the columns of one organ is cheap.
+    Use BinnedDataset.build rather than the constructor: it returns the
+    cached dataset when the same data and configuration were binned before.
+
+    Args:
+        codes: uint8 array of shape (n_samples, n_columns).
+        edges: Bin edges per column, as from fit_bin_edges.
+        columns: Column names.
+        index: Row identifiers used to find the rows of a split.
+        max_bins: Maximum number of bins per feature.
+        key: Cache key of the dataset.
+
+    Example:
+        >>> binned = BinnedDataset.build(df[feature_cols], cache_dir='cache')
+        >>> X_codes = binned.for_data(X_train)
+        >>> model = train_nonlinear_model(X_codes, y_train)
+        >>> flat = FlatTreeEnsemble.from_hist_gb(model, bin_edges=binned.edges_for(X_train.columns))
+    """
+
+    def __init__(self,
+                 codes: np.ndarray,
+                 edges: List[np.ndarray],
+                 columns: Sequence[str],
+                 index: np.ndarray,
+                 max_bins: int = 255,
+                 key: Optional[str] = None):
+        self._codes = np.asfortranarray(codes, dtype=np.uint8)
+        self.edges = list(edges)
+        self.columns = list(columns)
+        self.index = pd.Index(index)
+        self.max_bins = max_bins
+        self.key = key
+
+        if self._codes.shape != (len(self.index), len(self.columns)) or len(self.edges) != len(self.columns):
+            raise ValueError(f"Codes of shape {self._codes.shape} do not match "
+                             f"{len(self.index)} rows and {len(self.columns)} columns")
+        self._positions = {col: j for j, col in enumerate(self.columns)}
+
+    @classmethod
+    def build(cls,
+              X: Any,
+              columns: Optional[Sequence[str]] = None,
+              index: Optional[np.ndarray] = None,
+              max_bins: int = 255,
+              cache_dir: Optional[str] = None) -> 'BinnedDataset':
+        """
+        Bin every column of a cohort, reusing a cached result if possible.
+
+        Args:
+            X: store.FeatureStore, DataFrame or 2-D array of raw features.
+            columns: Columns to bin. Defaults to every column of X (numeric
+                    columns for a DataFrame).
+            index: Row identifiers. Defaults to the store index (SEQN for
+                  store.build_organ_views) or the DataFrame index (as kept by
+                  features.build_organ_datasets), so splits of either can be
+                  looked up by their index.
+            max_bins: Maximum number of bins per feature.
+            cache_dir: Optional directory for persisting binned cohorts.
+
+        Returns:
+            BinnedDataset covering all rows and the requested columns.
+        """
+        column_values = _column_reader(X, columns)
+        columns = list(column_values)
+        if index is None:
+            if hasattr(X, 'index'):
+                index = np.asarray(X.index)
+            else:
+                index = np.arange(len(X))
+
+        digest = hashlib.sha256(str((columns, max_bins)).encode())
+        for col in columns:
+            digest.update(np.ascontiguousarray(column_values[col]()).tobytes())
+        digest.update(pd.util.hash_pandas_object(pd.Index(index)).to_numpy().tobytes())
+        key = digest.hexdigest()[:16]
+
+        if key in _BINNED_CACHE:
+            return _cache_binned(key, _BINNED_CACHE[key])
+
+        cache_path = Path(cache_dir) / f"binned-{key}.npz" if cache_dir else None
+        if cache_path is not None and cache_path.exists():
+            with np.load(cache_path, allow_pickle=False) as stored:
+                offsets = stored['edge_offsets']
+                edges = [stored['edges'][start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+                dataset = cls(stored['codes'], edges, columns, index, max_bins=max_bins, key=key)
+        else:
+            codes = np.empty((len(index), len(columns)), dtype=np.uint8, order='F')
+            edges = []
+            # One column at a time, so the cohort is never copied to float64 whole
+            for j, col in enumerate(columns):
+                values = column_values[col]()[:, None]
+                col_edges = fit_bin_edges(values, max_bins=max_bins)
+                codes[:, j] = apply_bins(values, col_edges)[:, 0]
+                edges.extend(col_edges)
+            dataset = cls(codes, edges, columns, index, max_bins=max_bins, key=key)
+
+            if cache_path is not None:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                offsets = np.cumsum([0] + [len(e) for e in edges])
+                np.savez(cache_path, codes=codes, edge_offsets=offsets,
+                         edges=np.concatenate(edges) if edges else np.empty(0))
+
+        return _cache_binned(key, dataset)
+
+    @property
+    def shape(self):
+        return self._codes.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self._codes.nbytes + sum(e.nbytes for e in self.edges)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __repr__(self) -> str:
+        return (f"BinnedDataset({len(self)} rows, {len(self.columns)} columns, "
+                f"{self._codes.nbytes / 1024 ** 2:.1f} MB, key={self.key})")
+
+    def column_positions(self, columns: Sequence[str]) -> np.ndarray:
+        """
+        Positions of the given columns in the dataset.
+
+        Raises:
+            ValueError: If any column was not binned.
+        """
+        missing = [col for col in columns if col not in self._positions]
+        if missing:
+            raise ValueError(f"Columns not in binned dataset: {missing}")
+        return np.array([self._positions[col] for col in columns], dtype=np.intp)
+
+    def positions(self, labels: Sequence[Any]) -> np.ndarray:
+        """
+        Row positions of the given identifiers.
+
+        Raises:
+            ValueError: If any identifier is not in the dataset.
+        """
+        rows = self.index.get_indexer(pd.Index(labels))
+        if (rows < 0).any():
+            raise ValueError(f"{int((rows < 0).sum())} rows not found in binned dataset")
+        return rows
+
+    def edges_for(self, columns: Sequence[str]) -> List[np.ndarray]:
+        """Bin edges of the given columns, in that order."""
+        return [self.edges[j] for j in self.column_positions(columns)]
+
+    def codes(self, columns: Sequence[str], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Gather the uint8 codes of a column and row subset.
+
+        Args:
+            columns: Column names, in model order.
+            rows: Optional row positions. Defaults to all rows.
+
+        Returns:
+            C-contiguous uint8 array of shape (n_rows, n_columns).
+        """
+        positions = self.column_positions(columns)
+        n_rows = len(self) if rows is None else len(rows)
+        codes = np.empty((n_rows, len(positions)), dtype=np.uint8)
+        for j, position in enumerate(positions):
+            column = self._codes[:, position]
+            codes[:, j] = column if rows is None else column[rows]
+        return codes
+
+    def matrix(self, columns: Sequence[str], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Float32 codes of a column and row subset, ready to fit (see codes_to_float)."""
+        return codes_to_float(self.codes(columns, rows))
+
+    def for_data(self, X: Any, as_codes: bool = False) -> np.ndarray:
+        """
+        Binned counterpart of a feature matrix taken from this cohort.
+
+        Args:
+            X: DataFrame or store.OrganView whose columns were binned and
+              whose index holds identifiers of this dataset.
+            as_codes: If True, return uint8 codes instead of float32.
+
+        Returns:
+            Array with the rows and columns of X, in the same order.
+        """
+        if not hasattr(X, 'columns') or not hasattr(X, 'index'):
+            raise ValueError("Binned lookup needs a DataFrame or OrganView with columns and index")
+        rows = self.positions(X.index)
+        if as_codes:
+            return self.codes(list(X.columns), rows)
+        return self.matrix(list(X.columns), rows)
+
+
+def _column_reader(X: Any, columns: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """Map column names to callables returning that column as a float array."""
+    if hasattr(X, 'column_positions') and hasattr(X, 'values'):
+        # store.FeatureStore: columns are contiguous blocks of its array
+        columns = list(X.columns) if columns is None else list(columns)
+        positions = X.column_positions(columns)
+        return {col: (lambda j=j: X.values[:, j]) for col, j in zip(columns, positions)}
+
+    if isinstance(X, pd.DataFrame):
+        if columns is None:
+            columns = list(X.select_dtypes(include=[np.number, 'bool']).columns)
+        missing = [col for col in columns if col not in X.columns]
+        if missing:
+            raise ValueError(f"Columns not found in DataFrame: {missing}")
+        return {col: (lambda col=col: X[col].to_numpy(dtype=np.float64, na_value=np.nan))
+                for col in columns}
+
+    values = np.asarray(X)
+    if values.ndim != 2:
+        raise ValueError(f"Expected a 2-D array, got shape {values.shape}")
+    if columns is None:
+        columns = [f"x{j}" for j in range(values.shape[1])]
+    if len(columns) != values.shape[1]:
+        raise ValueError(f"Got {len(columns)} column names for {values.shape[1]} columns")
+    return {col: (lambda j=j: values[:, j]) for j, col in enumerate(columns)}
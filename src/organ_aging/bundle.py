@@ -0,0 +1,316 @@
+"""
+Versioned model bundle format for organ clocks.
+
+A bundle is a directory holding every organ clock of a release:
+
+    bundle/
+    ├── manifest.json          # format version, per-organ model description
+    └── blobs/
+        └── <sha256>.npy       # one plain .npy array per distinct content
+
+The manifest records, for each organ, the model kind, the feature order,
+the scaler parameters, the panel definition and the evaluation metrics.
+Arrays live in content-addressed blobs, so identical arrays (e.g. the same
+model saved under two filenames) are stored once. Loading reads JSON and
+memory-maps .npy files with allow_pickle=False, so no code is executed and
+arrays are paged in only when used.
+"""
+
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .trees import FlatTreeEnsemble
+
+
+BUNDLE_FORMAT_VERSION = 1
+
+
+class LinearClock:
+    """
+    Linear organ clock evaluated from its coefficient arrays.
+
+    Args:
+        coef: Coefficient per feature.
+        intercept: Model intercept.
+        impute: Optional per-feature values substituted for missing values,
+               from the SimpleImputer of a NaN-tolerant linear pipeline.
+
+    Example:
+        >>> clock = LinearClock(model.coef_, model.intercept_)
+        >>> np.allclose(clock.predict(X), model.predict(X))
+        True
+    """
+
+    def __init__(self, coef: np.ndarray, intercept: float, impute: Optional[np.ndarray] = None):
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.impute = None if impute is None else np.asarray(impute, dtype=np.float64)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict ages as X @ coef + intercept, imputing missing values if configured."""
+        X = np.asarray(X, dtype=np.float64)
+        if self.impute is not None:
+            X = np.where(np.isnan(X), self.impute, X)
+        return X @ self.coef + self.intercept
+
+
+def _model_arrays(model: Any) -> Dict[str, Any]:
+    """Describe a fitted model as a kind, arrays and scalars."""
+    if isinstance(model, FlatTreeEnsemble) or type(model).__name__ == 'HistGradientBoostingRegressor':
+        flat = model if isinstance(model, FlatTreeEnsemble) else FlatTreeEnsemble.from_hist_gb(model)
+        arrays = {name: getattr(flat, name) for name in flat.NODE_ARRAYS}
+        arrays['roots'] = flat.roots
+        for name in ('cover', 'gain'):
+            if getattr(flat, name) is not None:
+                arrays[name] = getattr(flat, name)
+        return {
+            'kind': 'hist_gb',
+            'arrays': arrays,
+            'params': {'baseline': flat.baseline, 'max_depth': flat.max_depth,
+                       'n_features': flat.n_features},
+        }
+
+    # Imputer + linear model pipeline from train_linear_model
+    impute = getattr(model, 'impute', None)
+    steps = getattr(model, 'steps', None)
+    if steps:
+        imputer = steps[0][1]
+        if len(steps) != 2 or type(imputer).__name__ != 'SimpleImputer':
+            raise ValueError("Only imputer + linear model pipelines are supported for bundling")
+        if len(imputer.statistics_) != np.size(steps[1][1].coef_):
+            raise ValueError("Imputer dropped empty features; refit with keep_empty_features=True")
+        impute = imputer.statistics_
+        model = steps[1][1]
+
+    if isinstance(model, LinearClock) or hasattr(model, 'coef_'):
+        coef = model.coef if isinstance(model, LinearClock) else model.coef_
+        intercept = model.intercept if isinstance(model, LinearClock) else model.intercept_
+        coef = np.asarray(coef, dtype=np.float64)
+        if coef.ndim != 1:
+            raise ValueError("Only single-output linear models are supported")
+        arrays = {'coef': coef}
+        if impute is not None:
+            arrays['impute'] = np.asarray(impute, dtype=np.float64)
+        return {
+            'kind': 'linear',
+            'arrays': arrays,
+            'params': {'intercept': float(np.ravel(intercept)[0])},
+        }
+
+    raise ValueError(f"Unsupported model type for bundling: {type(model).__name__}")
+
+
+def _build_model(kind: str, arrays: Dict[str, np.ndarray], params: Dict[str, Any]) -> Any:
+    """Rebuild an evaluator from bundle arrays."""
+    if kind == 'hist_gb':
+        return FlatTreeEnsemble(
+            roots=arrays['roots'],
+            baseline=params['baseline'],
+            max_depth=params['max_depth'],
+            n_features=params['n_features'],
+            cover=arrays.get('cover'),
+            gain=arrays.get('gain'),
+            **{name: arrays[name] for name in FlatTreeEnsemble.NODE_ARRAYS}
+        )
+    if kind == 'linear':
+        return LinearClock(arrays['coef'], params['intercept'], impute=arrays.get('impute'))
+    raise ValueError(f"Unknown model kind in bundle: {kind}")
+
+
+def _write_blob(array: np.ndarray, blobs_dir: Path) -> str:
+    """Write an array as a content-addressed .npy blob and return its digest."""
+    buffer = io.BytesIO()
+    np.save(buffer, np.ascontiguousarray(array), allow_pickle=False)
+    data = buffer.getvalue()
+    digest = hashlib.sha256(data).hexdigest()
+
+    blob_path = blobs_dir / f"{digest}.npy"
+    if not blob_path.exists():
+        tmp_path = blob_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, blob_path)
+
+    return digest
+
+
+def save_bundle(clocks: List[Any],
+                bundle_dir: str,
+                panels: Optional[Dict[str, List[str]]] = None,
+                metrics: Optional[Dict[str, Dict]] = None) -> Path:
+    """
+    Write organ clocks to a bundle directory.
+
+    Blobs already present in the directory are reused, so several releases
+    can share one bundle directory's blob store.
+
+    Args:
+        clocks: List of scoring.OrganClock objects.
+        bundle_dir: Destination bundle directory.
+        panels: Optional mapping from organ to its panel definition.
+        metrics: Optional mapping from organ to its evaluation metrics.
+
+    Returns:
+        Path to the written manifest.
+
+    Raises:
+        ValueError: If a clock's model type cannot be bundled.
+    """
+    bundle_dir = Path(bundle_dir)
+    blobs_dir = bundle_dir / "blobs"
+    blobs_dir.mkdir(parents=True, exist_ok=True)
+
+    organs = {}
+    for clock in clocks:
+        description = _model_arrays(clock.model)
+        entry = {
+            'kind': description['kind'],
+            'features': clock.features,
+            'arrays': {
+                name: _write_blob(array, blobs_dir)
+                for name, array in description['arrays'].items()
+            },
+            'params': description['params'],
+            'panel': (panels or {}).get(clock.organ, clock.features),
+            'metrics': (metrics or {}).get(clock.organ, {}),
+        }
+        for name in ('center', 'scale'):
+            values = getattr(clock, name)
+            entry['arrays'][name] = None if values is None else _write_blob(values, blobs_dir)
+        organs[clock.organ] = entry
+
+    manifest = {'format_version': BUNDLE_FORMAT_VERSION, 'organs': organs}
+    manifest_path = bundle_dir / "manifest.json"
+    tmp_path = manifest_path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+    n_blobs = len({d for e in organs.values() for d in e['arrays'].values() if d})
+    print(f"Bundle with {len(organs)} organ clocks ({n_blobs} blobs) saved to {bundle_dir}")
+
+    return manifest_path
+
+
+def load_bundle(bundle_dir: str,
+                organs: Optional[List[str]] = None,
+                mmap: bool = True,
+                verify: bool = False) -> List[Any]:
+    """
+    Load organ clocks from a bundle directory.
+
+    Args:
+        bundle_dir: Bundle directory containing manifest.json.
+        organs: Optional subset of organs to load. Defaults to all organs.
+        mmap: If True, memory-map the blobs read-only instead of reading them.
+        verify: If True, check every blob against its SHA-256 digest.
+
+    Returns:
+        List of scoring.OrganClock objects.
+
+    Raises:
+        FileNotFoundError: If the manifest or a blob is missing.
+        ValueError: If the format version is unsupported, an organ is
+                   unknown, or a blob fails verification.
+
+    Example:
+        >>> clocks = load_bundle("models/bundle", organs=['liver'])
+    """
+    from .scoring import OrganClock
+
+    bundle_dir = Path(bundle_dir)
+    manifest_path = bundle_dir / "manifest.json"
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"Bundle manifest not found: {manifest_path}")
+
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+
+    version = manifest.get('format_version')
+    if version != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported bundle format version: {version}")
+
+    entries = manifest['organs']
+    if organs is None:
+        organs = list(entries)
+    unknown = [organ for organ in organs if organ not in entries]
+    if unknown:
+        raise ValueError(f"Organs not in bundle: {unknown}")
+
+    def read_blob(digest):
+        if digest is None:
+            return None
+        blob_path = bundle_dir / "blobs" / f"{digest}.npy"
+        if not blob_path.exists():
+            raise FileNotFoundError(f"Bundle blob not found: {blob_path}")
+        if verify:
+            with open(blob_path, 'rb') as f:
+                if hashlib.sha256(f.read()).hexdigest() != digest:
+                    raise ValueError(f"Bundle blob is corrupt: {blob_path}")
+        return np.load(blob_path, mmap_mode='r' if mmap else None, allow_pickle=False)
+
+    clocks = []
+    for organ in organs:
+        entry = entries[organ]
+        arrays = {name: read_blob(digest) for name, digest in entry['arrays'].items()}
+        model = _build_model(entry['kind'], arrays, entry['params'])
+        metadata = {
+            'organ': organ,
+            'model_type': entry['kind'],
+            'features': entry['features'],
+            'panel': entry.get('panel'),
+            'metrics': entry.get('metrics', {}),
+        }
+        clocks.append(OrganClock(
+            organ, model, entry['features'],
+            center=arrays.get('center'), scale=arrays.get('scale'),
+            metadata=metadata
+        ))
+
+    return clocks
+
+
+def export_model_bundle(models_dir: str = "models",
+                        bundle_dir: str = "models/bundle",
+                        organs: Optional[List[str]] = None,
+                        panels: Optional[Dict[str, List[str]]] = None) -> Path:
+    """
+    Convert the pickled best models and scalers in a models directory to a bundle.
+
+    Metrics are taken from 'best_models_summary.json' when present.
+
+    Args:
+        models_dir: Directory containing organ model folders and scalers.
+        bundle_dir: Destination bundle directory.
+        organs: Optional subset of organs to export. Defaults to all organs.
+        panels: Optional organ panel definitions, e.g. from
+               config.load_organ_panels_config.
+
+    Returns:
+        Path to the written manifest.
+
+    Example:
+        >>> panels = load_organ_panels_config("configs/organ_panels.yaml")
+        >>> export_model_bundle("models", "models/bundle", panels=panels)
+    """
+    from .scoring import OrganClockEnsemble
+
+    ensemble = OrganClockEnsemble.from_models_dir(models_dir, organs=organs)
+
+    metrics = {}
+    summary_path = Path(models_dir) / "best_models_summary.json"
+    if summary_path.exists():
+        with open(summary_path, 'r') as f:
+            summary = json.load(f)
+        metrics = {
+            organ: {key: value for key, value in info.items() if key != 'filename'}
+            for organ, info in summary.get('best_models', {}).items()
+        }
+
+    return save_bundle(list(ensemble.clocks.values()), bundle_dir, panels=panels, metrics=metrics)
@@ -8,8 +8,6 @@ to identify patterns in organ aging profiles.
 import pandas as pd
 import numpy as np
 from typing import Tuple, Optional, Any
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
 import warnings
 
 
@@ -31,6 +29,8 @@ def apply_pca(X: pd.DataFrame,
         >>> X_pca, pca_model = apply_pca(age_gaps_df, n_components=2)
         >>> print(f"Explained variance: {pca_model.explained_variance_ratio_}")
     """
+    from sklearn.decomposition import PCA
+
     if scale:
         from sklearn.preprocessing import StandardScaler
         scaler = StandardScaler()
@@ -125,6 +125,8 @@ def perform_clustering(X: np.ndarray,
         >>> labels, model = perform_clustering(X_umap, method='kmeans', n_clusters=4)
         >>> print(f"Cluster distribution: {np.bincount(labels)}")
     """
+    from sklearn.cluster import KMeans
+
     if method == 'kmeans':
         default_params = {
             'n_clusters': n_clusters,
@@ -1,27 +1,116 @@
 """
 NHANES data loading utilities.
 
-This module provides functions for loading and merging NHANES data files (XPT or CSV format).
+This module provides functions for loading and merging NHANES data files (XPT or CSV format),
+with parallel parsing and a Parquet cache for repeated loads, and a dtype
+compaction stage that shrinks the merged cohort under a memory budget.
 """
 
+import hashlib
+import json
+import os
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 import warnings
 
 
-def load_nhanes_tables(paths_config: Dict, project_root: Path = None) -> Dict[str, pd.DataFrame]:
+# Demographic code columns stored as categoricals by compact_dtypes
+CODE_COLUMNS = ('RIAGENDR', 'RIDRETH1', 'RIDRETH3', 'DMDEDUC2', 'DMDMARTL')
+
+
+def _read_table(file_path: Path) -> pd.DataFrame:
+    """Parse a single XPT or CSV file with uppercase column names."""
+    if file_path.suffix.upper() == '.XPT':
+        try:
+            df = pd.read_sas(str(file_path), format='xport')
+        except Exception as e:
+            raise ValueError(f"Error reading XPT file {file_path}: {e}")
+
+    elif file_path.suffix.upper() == '.CSV':
+        try:
+            df = pd.read_csv(file_path)
+        except Exception as e:
+            raise ValueError(f"Error reading CSV file {file_path}: {e}")
+
+    else:
+        raise ValueError(f"Unsupported file format: {file_path.suffix}")
+
+    # Convert column names to uppercase for consistency
+    df.columns = df.columns.str.upper()
+
+    return df
+
+
+def _parse_and_cache(file_path: Path, cache_path: Optional[Path]) -> pd.DataFrame:
+    """Parse a raw file and write its typed Parquet copy (runs in a worker process)."""
+    df = _read_table(file_path)
+
+    if cache_path is not None:
+        tmp_path = cache_path.with_suffix('.tmp')
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+
+    return df
+
+
+def _file_sha256(file_path: Path) -> str:
+    """Compute the SHA-256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_cache_manifest(cache_dir: Path) -> Dict:
+    """Read the cache manifest, returning an empty one if absent or corrupt."""
+    manifest_path = cache_dir / "manifest.json"
+    if not manifest_path.exists():
+        return {}
+    try:
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache_manifest(cache_dir: Path, manifest: Dict) -> None:
+    """Atomically write the cache manifest."""
+    manifest_path = cache_dir / "manifest.json"
+    tmp_path = manifest_path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def load_nhanes_tables(paths_config: Dict,
+                       project_root: Path = None,
+                       n_jobs: Optional[int] = None,
+                       cache_dir: Optional[str] = None,
+                       use_cache: bool = True) -> Dict[str, pd.DataFrame]:
     """
     Load NHANES data tables from files specified in configuration.
 
-    Supports both XPT (SAS Transport) and CSV file formats.
+    Supports both XPT (SAS Transport) and CSV file formats. Files are parsed
+    in parallel worker processes. When a cache directory is configured, each
+    parsed table is stored as a typed Parquet file keyed by the source file's
+    SHA-256 hash; the manifest also records size and mtime so unchanged files
+    are recognised without rehashing and warm reloads skip parsing entirely.
 
     Args:
         paths_config: Dictionary containing:
             - 'raw_data_dir': Base directory for raw data files
             - 'nhanes_files': Dict mapping table names to filenames
+            - 'cache_dir' (optional): Directory for the Parquet cache
         project_root: Optional project root path for resolving relative paths.
                      If not provided, paths are treated as relative to current working directory.
+        n_jobs: Number of parallel workers. Defaults to one per file, capped
+               at the CPU count. Use 1 to load sequentially.
+        cache_dir: Cache directory overriding paths_config['cache_dir'].
+        use_cache: If False, ignore and do not write the cache.
 
     Returns:
         Dictionary mapping table names to pandas DataFrames.
@@ -33,7 +122,8 @@ def load_nhanes_tables(paths_config: Dict, project_root: Path = None) -> Dict[st
     Example:
         >>> paths = {
         ...     'raw_data_dir': 'data/raw',
-        ...     'nhanes_files': {'demographics': 'DEMO.XPT'}
+        ...     'nhanes_files': {'demographics': 'DEMO.XPT'},
+        ...     'cache_dir': 'data/interim/cache'
         ... }
         >>> tables = load_nhanes_tables(paths, project_root=Path('/path/to/project'))
         >>> print(tables['demographics'].shape)
@@ -46,54 +136,167 @@ def load_nhanes_tables(paths_config: Dict, project_root: Path = None) -> Dict[st
 
     nhanes_files = paths_config['nhanes_files']
 
-    tables = {}
-
+    file_paths = {}
     for table_name, filename in nhanes_files.items():
         file_path = raw_data_dir / filename
 
         if not file_path.exists():
             raise FileNotFoundError(f"Data file not found: {file_path}")
 
-        # Determine file format and load accordingly
-        if file_path.suffix.upper() == '.XPT':
-            try:
-                df = pd.read_sas(str(file_path), format='xport')
-            except Exception as e:
-                raise ValueError(f"Error reading XPT file {file_path}: {e}")
-
-        elif file_path.suffix.upper() == '.CSV':
-            try:
-                df = pd.read_csv(file_path)
-            except Exception as e:
-                raise ValueError(f"Error reading CSV file {file_path}: {e}")
-
-        else:
+        if file_path.suffix.upper() not in ('.XPT', '.CSV'):
             raise ValueError(f"Unsupported file format: {file_path.suffix}")
 
-        # Convert column names to uppercase for consistency
-        df.columns = df.columns.str.upper()
-
+        file_paths[table_name] = file_path
+
+    # Resolve the cache directory
+    if cache_dir is None:
+        cache_dir = paths_config.get('cache_dir')
+    if cache_dir is not None and use_cache:
+        cache_dir = Path(cache_dir)
+        if project_root is not None and not cache_dir.is_absolute():
+            cache_dir = project_root / cache_dir
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        manifest = _load_cache_manifest(cache_dir)
+    else:
+        cache_dir = None
+        manifest = {}
+
+    # Split files into cache hits and files that need parsing
+    cached = {}
+    to_parse = {}
+    for table_name, file_path in file_paths.items():
+        if cache_dir is None:
+            to_parse[table_name] = None
+            continue
+
+        key = str(file_path.resolve())
+        stat = file_path.stat()
+        entry = manifest.get(key, {})
+
+        if entry.get('size') != stat.st_size or entry.get('mtime_ns') != stat.st_mtime_ns:
+            sha256 = _file_sha256(file_path)
+            if entry.get('sha256') != sha256:
+                stale_file = entry.get('cache_file')
+                entry = {'sha256': sha256, 'cache_file': f"{file_path.stem}-{sha256[:16]}.parquet"}
+                still_used = any(e.get('cache_file') == stale_file
+                                 for k, e in manifest.items() if k != key)
+                if stale_file and not still_used:
+                    (cache_dir / stale_file).unlink(missing_ok=True)
+            entry.update({'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns})
+            manifest[key] = entry
+
+        cache_path = cache_dir / entry['cache_file']
+        if cache_path.exists():
+            cached[table_name] = cache_path
+        else:
+            to_parse[table_name] = cache_path
+
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+
+    loaded = {}
+
+    # Parquet reads release the GIL, so threads are enough for warm loads
+    if cached:
+        with ThreadPoolExecutor(max_workers=max(1, min(n_jobs, len(cached)))) as executor:
+            futures = {name: executor.submit(pd.read_parquet, path) for name, path in cached.items()}
+            for name, future in futures.items():
+                loaded[name] = future.result()
+
+    # XPT parsing is pure Python and CPU bound, so use processes
+    if to_parse:
+        n_workers = max(1, min(n_jobs, len(to_parse)))
+        if n_workers == 1:
+            for name, cache_path in to_parse.items():
+                loaded[name] = _parse_and_cache(file_paths[name], cache_path)
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                futures = {
+                    name: executor.submit(_parse_and_cache, file_paths[name], cache_path)
+                    for name, cache_path in to_parse.items()
+                }
+                for name, future in futures.items():
+                    loaded[name] = future.result()
+
+    if cache_dir is not None:
+        _save_cache_manifest(cache_dir, manifest)
+
+    # Preserve configuration order
+    tables = {}
+    for table_name in file_paths:
+        df = loaded[table_name]
         tables[table_name] = df
-        print(f"Loaded {table_name}: {df.shape[0]} rows, {df.shape[1]} columns")
+        source = " (cached)" if table_name in cached else ""
+        print(f"Loaded {table_name}: {df.shape[0]} rows, {df.shape[1]} columns{source}")
 
     return tables
 
 
-def merge_nhanes_tables(tables_dict: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+def _take_column(column: pd.Series, indexer: np.ndarray, needs_fill: bool) -> Any:
+    """
+    Gather a column at the given row positions, -1 giving a missing value.
+
+    Uses the column's own array take, so extension dtypes (string,
+    categorical, nullable) keep their dtype. Bool columns that need
+    missing values become the nullable 'boolean' dtype instead of object.
+    """
+    array = column.array
+    if needs_fill and column.dtype == bool:
+        array = column.astype('boolean').array
+    return array.take(indexer, allow_fill=needs_fill)
+
+
+def _seqn_indexer(seqn: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """
+    Map each key to its row position in a table, or -1 if absent.
+
+    The table's SEQN values are sorted once and looked up with a binary
+    search, so the cost is O((n + k) log n) regardless of table order.
+    """
+    if len(seqn) == 0:
+        return np.full(len(keys), -1, dtype=np.intp)
+
+    order = np.argsort(seqn, kind='stable')
+    sorted_seqn = seqn[order]
+    pos = np.minimum(np.searchsorted(sorted_seqn, keys), len(sorted_seqn) - 1)
+    matched = sorted_seqn[pos] == keys
+    return np.where(matched, order[pos], -1)
+
+
+def merge_nhanes_tables(tables_dict: Dict[str, pd.DataFrame],
+                        how: str = 'inner',
+                        verbose: bool = True) -> pd.DataFrame:
     """
     Merge multiple NHANES tables on the SEQN (sequence number) column.
 
-    Performs inner joins to keep only records present in all tables.
+    Every table is indexed on SEQN once and the final wide frame is built in
+    a single step by gathering each column at the matched row positions,
+    instead of chaining pairwise merges through intermediate frames.
+
+    Join policies:
+    - 'inner': keep only participants present in all tables (in the order
+      of the first table).
+    - 'left': keep every participant of the first table (normally
+      demographics); unmatched values are missing.
+    - 'outer': keep participants present in any table, sorted by SEQN.
+
+    Per-table match statistics are printed and stored in
+    ``merged.attrs['match_rates']`` as {table: {'n_rows', 'n_matched',
+    'match_rate'}}, where match_rate is the fraction of the table's rows
+    that appear in the result.
 
     Args:
         tables_dict: Dictionary mapping table names to DataFrames.
                     All DataFrames must contain a 'SEQN' column.
+        how: Join policy ('inner', 'left' or 'outer').
+        verbose: If True, print match rates and the final shape.
 
     Returns:
         Merged DataFrame containing all columns from all input tables.
 
     Raises:
-        ValueError: If SEQN column is missing from any table.
+        ValueError: If SEQN column is missing from any table, a table has
+                   duplicate SEQN values, or the join policy is unknown.
 
     Example:
         >>> tables = {
@@ -107,58 +310,347 @@ def merge_nhanes_tables(tables_dict: Dict[str, pd.DataFrame]) -> pd.DataFrame:
     if not tables_dict:
         raise ValueError("No tables provided for merging")
 
-    # Verify all tables have SEQN column
+    if how not in ('inner', 'left', 'outer'):
+        raise ValueError(f"Unknown join policy: {how}. Use 'inner', 'left' or 'outer'.")
+
+    # Verify all tables have a unique SEQN column
+    seqns = {}
     for table_name, df in tables_dict.items():
         if 'SEQN' not in df.columns:
             raise ValueError(f"Table '{table_name}' does not contain SEQN column")
+        seqn = df['SEQN'].to_numpy()
+        if len(np.unique(seqn)) != len(seqn):
+            raise ValueError(f"Table '{table_name}' contains duplicate SEQN values")
+        seqns[table_name] = seqn
 
-    # Start with the first table
     table_names = list(tables_dict.keys())
-    merged_df = tables_dict[table_names[0]].copy()
-    print(f"Starting merge with {table_names[0]}: {merged_df.shape}")
-
-    # Merge remaining tables
-    for table_name in table_names[1:]:
+    first_seqn = seqns[table_names[0]]
+
+    # Determine the output keys for the join policy
+    if how == 'outer':
+        keys = first_seqn
+        for table_name in table_names[1:]:
+            keys = np.union1d(keys, seqns[table_name])
+    else:
+        keys = first_seqn
+        if how == 'inner':
+            present = np.ones(len(keys), dtype=bool)
+            for table_name in table_names[1:]:
+                present &= np.isin(keys, seqns[table_name])
+            keys = keys[present]
+
+    # Gather every column at its matched positions into a single frame
+    columns = {'SEQN': keys}
+    match_rates = {}
+
+    for table_name in table_names:
         df = tables_dict[table_name]
+        indexer = _seqn_indexer(seqns[table_name], keys)
+        needs_fill = bool((indexer < 0).any())
 
-        # Get overlapping columns (excluding SEQN)
-        overlap_cols = set(merged_df.columns) & set(df.columns) - {'SEQN'}
-
-        if overlap_cols:
+        overlap_cols = [col for col in df.columns if col != 'SEQN' and col in columns]
+        if overlap_cols and verbose:
             warnings.warn(
                 f"Overlapping columns found between existing merged table and '{table_name}': "
-                f"{overlap_cols}. Suffixes will be added."
+                f"{set(overlap_cols)}. Suffixes will be added."
             )
 
-        merged_df = merged_df.merge(
-            df,
-            on='SEQN',
-            how='inner',
-            suffixes=('', f'_{table_name}')
-        )
-
-        print(f"After merging {table_name}: {merged_df.shape}")
-
-    print(f"\nFinal merged dataset: {merged_df.shape[0]} rows, {merged_df.shape[1]} columns")
+        for col in df.columns:
+            if col == 'SEQN':
+                continue
+            out_col = f"{col}_{table_name}" if col in columns else col
+            columns[out_col] = _take_column(df[col], indexer, needs_fill)
+
+        n_matched = int((indexer >= 0).sum())
+        match_rates[table_name] = {
+            'n_rows': len(df),
+            'n_matched': n_matched,
+            'match_rate': n_matched / len(df) if len(df) else 0.0
+        }
+
+    merged_df = pd.DataFrame(columns)
+    merged_df.attrs['match_rates'] = match_rates
+
+    if verbose:
+        print(f"Merged {len(table_names)} tables on SEQN ({how} join):")
+        for table_name, stats in match_rates.items():
+            print(f"  {table_name}: {stats['n_matched']}/{stats['n_rows']} rows matched "
+                  f"({100 * stats['match_rate']:.1f}%)")
+        print(f"\nFinal merged dataset: {merged_df.shape[0]} rows, {merged_df.shape[1]} columns")
 
     return merged_df
 
 
-def load_and_merge_nhanes(paths_config: Dict, project_root: Path = None) -> pd.DataFrame:
+def load_and_merge_nhanes(paths_config: Dict,
+                          project_root: Path = None,
+                          how: str = 'inner',
+                          compact: bool = False,
+                          memory_budget_mb: Optional[float] = None) -> pd.DataFrame:
     """
     Convenience function to load and merge NHANES tables in one step.
 
     Args:
         paths_config: Paths configuration dictionary.
         project_root: Optional project root path for resolving relative paths.
+        how: Join policy passed to merge_nhanes_tables ('inner', 'left', 'outer').
+        compact: If True, shrink column dtypes with compact_dtypes.
+        memory_budget_mb: Optional memory limit for the merged cohort.
+                         Implies compact.
 
     Returns:
         Merged DataFrame containing all NHANES data.
 
+    Raises:
+        MemoryError: If the compacted cohort exceeds memory_budget_mb.
+
     Example:
         >>> config = {'raw_data_dir': 'data/raw', 'nhanes_files': {...}}
         >>> df = load_and_merge_nhanes(config, project_root=Path('/path/to/project'))
     """
     tables = load_nhanes_tables(paths_config, project_root=project_root)
-    merged = merge_nhanes_tables(tables)
+    merged = merge_nhanes_tables(tables, how=how)
+    if compact or memory_budget_mb is not None:
+        merged, _ = compact_dtypes(merged, memory_budget_mb=memory_budget_mb)
     return merged
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-column dtype and memory usage of a DataFrame.
+
+    Args:
+        df: Input DataFrame.
+
+    Returns:
+        DataFrame indexed by column with 'dtype' and 'memory_mb', largest first.
+
+    Example:
+        >>> print(memory_report(df).head())
+    """
+    usage = df.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        'dtype': df.dtypes.astype(str),
+        'memory_mb': usage / 1024 ** 2,
+    })
+    return report.sort_values('memory_mb', ascending=False)
+
+
+def _float32_preserves(values: np.ndarray, rtol: float) -> bool:
+    """Whether a float64 column survives a float32 round trip within rtol."""
+    finite = values[np.isfinite(values)]
+    if len(finite) == 0:
+        return True
+    if np.abs(finite).max() > np.finfo(np.float32).max:
+        return False
+
+    restored = finite.astype(np.float32).astype(np.float64)
+    if np.all(finite == np.round(finite)):
+        # Integer-valued columns (counts, codes) must stay exact
+        return bool(np.all(restored == finite))
+    # Values below float32's smallest normal number (XPT zero artifacts) count as zero
+    return bool(np.allclose(restored, finite, rtol=rtol, atol=np.finfo(np.float32).tiny))
+
+
+def compact_dtypes(df: pd.DataFrame,
+                   code_cols: Sequence[str] = CODE_COLUMNS,
+                   id_cols: Sequence[str] = ('SEQN',),
+                   rtol: float = 1e-6,
+                   max_categories: int = 50,
+                   memory_budget_mb: Optional[float] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Shrink the merged cohort by downcasting column dtypes.
+
+    - float64 columns become float32 when every value survives the round
+      trip within rtol (integer-valued columns must stay exact).
+    - Demographic code columns become categoricals. Categories keep their
+      original values, so one-hot column names such as 'RIAGENDR_2.0'
+      are unchanged. Missing codes stay missing rather than being imputed
+      as numbers, and encode as all-zero dummies.
+    - Identifier columns without missing values become the smallest
+      integer type that holds them.
+
+    Args:
+        df: Merged DataFrame, e.g. from load_and_merge_nhanes.
+        code_cols: Code columns to store as categoricals, if present.
+        id_cols: Identifier columns to store as integers, if present.
+        rtol: Relative tolerance for the float32 round trip.
+        max_categories: Code columns with more distinct values are left as is.
+        memory_budget_mb: Optional limit on the compacted frame's memory.
+
+    Returns:
+        Tuple of (compacted DataFrame, report) where the report is indexed
+        by column with 'dtype_before', 'dtype_after', 'mb_before' and
+        'mb_after'.
+
+    Raises:
+        MemoryError: If the compacted frame exceeds memory_budget_mb.
+
+    Example:
+        >>> df, report = compact_dtypes(df, memory_budget_mb=500)
+        >>> print(report.sort_values('mb_after', ascending=False).head())
+    """
+    before = memory_report(df)
+    columns = {}
+
+    for col in df.columns:
+        series = df[col]
+        if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            columns[col] = series
+        elif col in code_cols and series.nunique() <= max_categories:
+            columns[col] = series.astype('category')
+        elif col in id_cols and not series.isna().any() and np.all(series == np.round(series)):
+            columns[col] = pd.to_numeric(series.astype(np.int64), downcast='integer')
+        elif series.dtype == np.float64 and _float32_preserves(series.to_numpy(), rtol):
+            columns[col] = series.astype(np.float32)
+        else:
+            columns[col] = series
+
+    compacted = pd.DataFrame(columns, index=df.index)
+    compacted.attrs = dict(df.attrs)
+
+    after = memory_report(compacted)
+    report = pd.DataFrame({
+        'dtype_before': before['dtype'],
+        'dtype_after': after['dtype'],
+        'mb_before': before['memory_mb'],
+        'mb_after': after['memory_mb'],
+    }).loc[df.columns]
+
+    total_before = report['mb_before'].sum()
+    total_after = report['mb_after'].sum()
+    print(f"Compacted {len(df.columns)} columns: {total_before:.1f} MB -> {total_after:.1f} MB")
+
+    if memory_budget_mb is not None and total_after > memory_budget_mb:
+        largest = report['mb_after'].nlargest(5)
+        details = ", ".join(f"{col} ({mb:.1f} MB)" for col, mb in largest.items())
+        raise MemoryError(
+            f"Cohort needs {total_after:.1f} MB after compaction, over the memory budget "
+            f"of {memory_budget_mb:.1f} MB. Largest columns: {details}"
+        )
+
+    return compacted, report
+
+
+def iter_table_chunks(file_path: Path, chunksize: int = 50000) -> Iterator[pd.DataFrame]:
+    """
+    Read a single XPT, CSV or Parquet file in row chunks.
+
+    Only one chunk is held in memory at a time, so arbitrarily large files
+    can be processed with memory bounded by the chunk size.
+
+    Args:
+        file_path: Path to the data file.
+        chunksize: Number of rows per chunk.
+
+    Yields:
+        DataFrames of at most chunksize rows with uppercase column names.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file format is not supported.
+
+    Example:
+        >>> for chunk in iter_table_chunks(Path("data/raw/DEMO_J.xpt"), chunksize=1000):
+        ...     print(chunk.shape)
+    """
+    file_path = Path(file_path)
+
+    if not file_path.exists():
+        raise FileNotFoundError(f"Data file not found: {file_path}")
+
+    suffix = file_path.suffix.upper()
+
+    if suffix == '.XPT':
+        reader = pd.read_sas(str(file_path), format='xport', chunksize=chunksize)
+    elif suffix == '.CSV':
+        reader = pd.read_csv(file_path, chunksize=chunksize)
+    elif suffix == '.PARQUET':
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(file_path)
+        reader = (batch.to_pandas() for batch in parquet_file.iter_batches(batch_size=chunksize))
+    else:
+        raise ValueError(f"Unsupported file format: {file_path.suffix}")
+
+    for chunk in reader:
+        chunk.columns = chunk.columns.str.upper()
+        yield chunk
+
+
+def iter_merged_chunks(paths_config: Dict,
+                       project_root: Path = None,
+                       chunksize: int = 50000) -> Iterator[pd.DataFrame]:
+    """
+    Stream the inner join of all NHANES tables on SEQN in row chunks.
+
+    Performs a streaming sort-merge join: the first table drives the
+    iteration and every other table is read forward just far enough to
+    cover the driver chunk's SEQN range. NHANES release files are sorted by
+    SEQN, which this relies on; an unsorted table raises ValueError.
+
+    Args:
+        paths_config: Paths configuration dictionary (see load_nhanes_tables).
+        project_root: Optional project root path for resolving relative paths.
+        chunksize: Number of driver rows per chunk.
+
+    Yields:
+        Merged DataFrames with the same columns as merge_nhanes_tables.
+
+    Raises:
+        ValueError: If a table is not sorted by SEQN or lacks a SEQN column.
+
+    Example:
+        >>> for chunk in iter_merged_chunks(config, project_root=root, chunksize=10000):
+        ...     process(chunk)
+    """
+    raw_data_dir = Path(paths_config['raw_data_dir'])
+    if project_root is not None and not raw_data_dir.is_absolute():
+        raw_data_dir = project_root / raw_data_dir
+
+    nhanes_files = paths_config['nhanes_files']
+    table_names = list(nhanes_files.keys())
+
+    def sorted_chunks(table_name):
+        last_seqn = None
+        for chunk in iter_table_chunks(raw_data_dir / nhanes_files[table_name], chunksize):
+            if 'SEQN' not in chunk.columns:
+                raise ValueError(f"Table '{table_name}' does not contain SEQN column")
+            seqn = chunk['SEQN']
+            if len(seqn) == 0:
+                continue
+            if not seqn.is_monotonic_increasing or (last_seqn is not None and seqn.iloc[0] <= last_seqn):
+                raise ValueError(f"Table '{table_name}' is not sorted by SEQN")
+            last_seqn = seqn.iloc[-1]
+            yield chunk
+
+    readers = {name: sorted_chunks(name) for name in table_names[1:]}
+    buffers = {name: None for name in table_names[1:]}
+    exhausted = {name: False for name in table_names[1:]}
+
+    for driver_chunk in sorted_chunks(table_names[0]):
+        max_seqn = driver_chunk['SEQN'].iloc[-1]
+        chunk_tables = {table_names[0]: driver_chunk}
+
+        for name in table_names[1:]:
+            # Read forward until the buffer covers the driver chunk's SEQN range
+            while not exhausted[name] and (buffers[name] is None or len(buffers[name]) == 0
+                                           or buffers[name]['SEQN'].iloc[-1] < max_seqn):
+                try:
+                    next_chunk = next(readers[name])
+                except StopIteration:
+                    exhausted[name] = True
+                    break
+                buffers[name] = next_chunk if buffers[name] is None else pd.concat(
+                    [buffers[name], next_chunk], ignore_index=True
+                )
+
+            buffer = buffers[name]
+            if buffer is None:
+                # Table has no rows at all, so the inner join is empty
+                buffer = driver_chunk.iloc[:0][['SEQN']]
+            covered = buffer['SEQN'] <= max_seqn
+            chunk_tables[name] = buffer[covered]
+            buffers[name] = buffer[~covered].reset_index(drop=True)
+
+        merged = merge_nhanes_tables(chunk_tables, verbose=False)
+        if len(merged) > 0:
+            yield merged
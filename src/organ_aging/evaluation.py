@@ -5,10 +5,11 @@ This module provides functions for evaluating organ clock models
 and computing biological age gaps.
 """
 
+import hashlib
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
 
 
 def calculate_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
@@ -28,6 +29,8 @@ def calculate_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float
         >>> metrics = calculate_metrics(y_true, y_pred)
         >>> print(f"MAE: {metrics['mae']:.2f}")
     """
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
     mae = mean_absolute_error(y_true, y_pred)
     rmse = np.sqrt(mean_squared_error(y_true, y_pred))
     r2 = r2_score(y_true, y_pred)
@@ -238,3 +241,319 @@ def cross_validate_organ_clock(X: pd.DataFrame,
         cv_results[f'{metric_name}_std'] = np.std(values)
 
     return cv_results
+
+
+# Fold assignments keyed by dataset hash and split parameters, oldest
+# entries evicted first once _FOLD_CACHE_SIZE datasets are cached
+_FOLD_CACHE: Dict[str, np.ndarray] = {}
+_FOLD_CACHE_SIZE = 32
+
+# Default ElasticNet regularization path, strongest penalty first
+DEFAULT_ALPHAS = np.logspace(1, -3, 30)
+
+
+def _dataset_hash(X: np.ndarray, y: np.ndarray) -> str:
+    """SHA-256 of the feature matrix and target, including their shapes."""
+    digest = hashlib.sha256()
+    for array in (X, y):
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.shape, array.dtype.str)).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def get_cv_folds(X: Any,
+                 y: Any,
+                 n_folds: int = 5,
+                 random_state: int = 42,
+                 cache_dir: Optional[str] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Get shuffled K-fold (train, validation) index splits, cached per dataset.
+
+    Fold assignments are cached in memory, and optionally on disk, under a
+    key built from the data hash, n_folds and random_state, so every model
+    evaluated on the same organ dataset reuses identical folds.
+
+    Args:
+        X: Feature matrix.
+        y: Target vector.
+        n_folds: Number of folds.
+        random_state: Seed for the shuffled KFold split.
+        cache_dir: Optional directory for persisting fold assignments.
+
+    Returns:
+        List of (train_indices, validation_indices) tuples.
+
+    Example:
+        >>> folds = get_cv_folds(X, y, n_folds=5)
+        >>> train_idx, val_idx = folds[0]
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    key = f"{_dataset_hash(X, y)[:16]}-k{n_folds}-s{random_state}"
+
+    fold_ids = _FOLD_CACHE.get(key)
+    cache_path = Path(cache_dir) / f"folds-{key}.npy" if cache_dir else None
+
+    if fold_ids is None and cache_path is not None and cache_path.exists():
+        fold_ids = np.load(cache_path, allow_pickle=False)
+
+    if fold_ids is None:
+        from sklearn.model_selection import KFold
+
+        fold_ids = np.empty(len(y), dtype=np.int8)
+        kf = KFold(n_splits=n_folds, shuffle=True, random_state=random_state)
+        for fold, (_, val_idx) in enumerate(kf.split(X)):
+            fold_ids[val_idx] = fold
+
+        if cache_path is not None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            np.save(cache_path, fold_ids)
+
+    _FOLD_CACHE.pop(key, None)
+    _FOLD_CACHE[key] = fold_ids
+    while len(_FOLD_CACHE) > _FOLD_CACHE_SIZE:
+        del _FOLD_CACHE[next(iter(_FOLD_CACHE))]
+
+    return [
+        (np.flatnonzero(fold_ids != fold), np.flatnonzero(fold_ids == fold))
+        for fold in range(n_folds)
+    ]
+
+
+def clear_fold_cache() -> None:
+    """
+    Drop the fold assignments cached in memory by get_cv_folds.
+
+    Folds persisted with cache_dir are left on disk.
+    """
+    _FOLD_CACHE.clear()
+
+
+def _enet_path_predict(X_train: np.ndarray,
+                       y_train: np.ndarray,
+                       X_val: np.ndarray,
+                       l1_ratio: float,
+                       alphas: np.ndarray) -> np.ndarray:
+    """Fit the ElasticNet path with warm starts and predict X_val for every alpha."""
+    import warnings
+    from sklearn.linear_model import enet_path
+
+    # Missing values fall back to medians learned on the training fold,
+    # as train_linear_model does with its imputer
+    if np.isnan(X_train).any():
+        fill = np.nanmedian(X_train, axis=0)
+        X_train = np.where(np.isnan(X_train), fill, X_train)
+        X_val = np.where(np.isnan(X_val), fill, X_val)
+
+    # enet_path fits no intercept: center on the training fold instead
+    X_mean = X_train.mean(axis=0)
+    y_mean = y_train.mean()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        _, coefs, _ = enet_path(X_train - X_mean, y_train - y_mean,
+                                l1_ratio=l1_ratio, alphas=alphas)
+    return (X_val - X_mean) @ coefs + y_mean
+
+
+def _fit_fold(X: np.ndarray,
+              y: np.ndarray,
+              train_idx: np.ndarray,
+              val_idx: np.ndarray,
+              model_type: str,
+              params: Dict[str, Any],
+              alphas: Optional[np.ndarray],
+              n_inner_folds: int = 5,
+              random_state: int = 42) -> Any:
+    """
+    Fit one fold and return validation predictions.
+
+    For 'elastic_net' the whole regularization path is fitted with warm
+    starts, and a tuple (predictions, alpha_index) is returned:
+    predictions for every alpha, of shape (n_val, n_alphas), and the index
+    of the alpha with the lowest MAE in an inner K-fold split of the
+    training fold. The validation fold plays no part in choosing alpha.
+    """
+    from .models import train_linear_model, train_nonlinear_model
+
+    X_train, y_train = X[train_idx], y[train_idx]
+    X_val = X[val_idx]
+
+    if model_type == 'elastic_net':
+        from sklearn.model_selection import KFold
+
+        l1_ratio = params.get('l1_ratio', 0.5)
+        alpha_index = 0
+        if len(alphas) > 1:
+            inner_mae = np.zeros(len(alphas))
+            inner = KFold(n_splits=n_inner_folds, shuffle=True, random_state=random_state)
+            for inner_train, inner_val in inner.split(X_train):
+                pred = _enet_path_predict(X_train[inner_train], y_train[inner_train],
+                                          X_train[inner_val], l1_ratio, alphas)
+                inner_mae += np.abs(pred - y_train[inner_val][:, None]).mean(axis=0)
+            alpha_index = int(np.argmin(inner_mae))
+
+        return _enet_path_predict(X_train, y_train, X_val, l1_ratio, alphas), alpha_index
+
+    if model_type == 'linear':
+        model = train_linear_model(X_train, y_train, model_type='linear', **params)
+    else:
+        model = train_nonlinear_model(X_train, y_train, model_type=model_type, **params)
+
+    return model.predict(X_val)
+
+
+def cross_validate_organs(organ_datasets: Dict[str, Tuple[pd.DataFrame, pd.Series]],
+                          model_types: List[str] = ('elastic_net', 'hist_gb'),
+                          n_folds: int = 5,
+                          n_jobs: int = -1,
+                          random_state: int = 42,
+                          model_params: Optional[Dict[str, Dict]] = None,
+                          alphas: Optional[np.ndarray] = None,
+                          prebin: bool = True,
+                          cache_dir: Optional[str] = None,
+                          binned: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Cross-validate every organ and model type in one parallel sweep.
+
+    All (organ, model type, fold) fits are dispatched to a single joblib
+    pool, so short linear folds fill the gaps between long boosting folds.
+    Folds come from get_cv_folds and are identical for every model of an
+    organ. ElasticNet fits the whole alpha path per fold with warm starts.
+    Its reported metrics are nested: each fold is scored at the alpha
+    chosen by an inner K-fold split of that fold's training rows, so the
+    scores are not biased by the selection. The alpha with the lowest mean
+    validation MAE over the outer folds is returned as the value to refit
+    with, and the per-alpha curve as a diagnostic. With
+    prebin=True, tree models are fitted on bin codes computed once per
+    organ (see binning), instead of rebinning in every fold. Bin edges
+    are unsupervised quantiles of the whole organ dataset, so no target
+    information leaks into the folds. Passing a binning.BinnedDataset of
+    the cohort instead reuses its codes for every organ, so shared
+    covariates are binned once rather than once per organ.
+
+    Args:
+        organ_datasets: Dictionary mapping organ names to (X, y) tuples,
+                       e.g. from features.build_organ_datasets.
+        model_types: Any of 'linear', 'elastic_net', 'hist_gb', 'lightgbm',
+                    'xgboost'.
+        n_folds: Number of folds.
+        n_jobs: Number of parallel workers (-1 uses all cores).
+        random_state: Seed for the fold split.
+        model_params: Optional mapping from model type to extra parameters.
+        alphas: ElasticNet regularization path. Defaults to DEFAULT_ALPHAS.
+        prebin: Whether to share pre-binned features across tree-model folds.
+        cache_dir: Optional directory for persisting fold assignments.
+        binned: Optional binning.BinnedDataset covering the rows and columns
+               of every organ dataset, used for tree models when prebin=True.
+
+    Returns:
+        Dictionary with:
+            'summary': DataFrame with one row per (organ, model_type) and the
+                      mean/std of MAE, RMSE and R² across folds, plus the
+                      alpha to refit ElasticNet with.
+            'fold_metrics': DataFrame with one row per (organ, model_type, fold),
+                           with the alpha each ElasticNet fold was scored at.
+            'oof_predictions': {organ: DataFrame of out-of-fold predictions,
+                               one column per model type, indexed like y}.
+            'fold_ids': {organ: array of fold assignments}.
+            'alpha_path': {organ: DataFrame of mean validation MAE per alpha}.
+                         Diagnostic only: its minimum is optimistic.
+
+    Example:
+        >>> cv = cross_validate_organs(organ_datasets, ['elastic_net', 'hist_gb'])
+        >>> print(cv['summary'])
+    """
+    from joblib import Parallel, delayed
+    from .binning import apply_bins, codes_to_float, fit_bin_edges
+
+    model_params = model_params or {}
+    alphas = DEFAULT_ALPHAS if alphas is None else np.sort(np.asarray(alphas, dtype=float))[::-1]
+    tree_models = {'hist_gb', 'lightgbm', 'xgboost'}
+
+    arrays = {}
+    folds = {}
+    tasks = []
+    for organ, (X, y) in organ_datasets.items():
+        X_values = np.asarray(X, dtype=np.float64)
+        y_values = np.asarray(y, dtype=np.float64)
+        folds[organ] = get_cv_folds(X_values, y_values, n_folds, random_state, cache_dir)
+        arrays[(organ, 'raw')] = X_values
+        if prebin and tree_models.intersection(model_types):
+            if binned is not None:
+                arrays[(organ, 'binned')] = binned.for_data(X)
+            else:
+                arrays[(organ, 'binned')] = codes_to_float(apply_bins(X_values, fit_bin_edges(X_values)))
+
+        for model_type in model_types:
+            X_fit = arrays[(organ, 'binned')] if prebin and model_type in tree_models else X_values
+            for fold, (train_idx, val_idx) in enumerate(folds[organ]):
+                tasks.append(((organ, model_type, fold),
+                              (X_fit, y_values, train_idx, val_idx, model_type,
+                               model_params.get(model_type, {}), alphas,
+                               n_folds, random_state)))
+
+    print(f"Cross-validating {len(organ_datasets)} organs × {len(model_types)} models "
+          f"× {n_folds} folds ({len(tasks)} fits)...")
+
+    outputs = Parallel(n_jobs=n_jobs)(delayed(_fit_fold)(*args) for _, args in tasks)
+    predictions = {key: pred for (key, _), pred in zip(tasks, outputs)}
+
+    summary_rows = []
+    fold_rows = []
+    oof_predictions = {}
+    fold_ids = {}
+    alpha_path = {}
+
+    for organ, (X, y) in organ_datasets.items():
+        y_values = np.asarray(y, dtype=np.float64)
+        oof = pd.DataFrame(index=y.index if hasattr(y, 'index') else None)
+        fold_ids[organ] = np.empty(len(y_values), dtype=np.int8)
+        for fold, (_, val_idx) in enumerate(folds[organ]):
+            fold_ids[organ][val_idx] = fold
+
+        for model_type in model_types:
+            row = {'organ': organ, 'model_type': model_type}
+
+            if model_type == 'elastic_net':
+                # Mean validation MAE of every alpha across folds
+                path_mae = np.mean([
+                    np.abs(predictions[(organ, model_type, fold)][0] - y_values[val_idx][:, None]).mean(axis=0)
+                    for fold, (_, val_idx) in enumerate(folds[organ])
+                ], axis=0)
+                alpha_path[organ] = pd.DataFrame({'alpha': alphas, 'mae_mean': path_mae})
+                row['alpha'] = alphas[int(np.argmin(path_mae))]
+
+            oof_values = np.empty(len(y_values))
+            fold_metrics = []
+            for fold, (_, val_idx) in enumerate(folds[organ]):
+                pred = predictions[(organ, model_type, fold)]
+                fold_row = {'organ': organ, 'model_type': model_type, 'fold': fold}
+                if model_type == 'elastic_net':
+                    pred, alpha_index = pred
+                    pred = pred[:, alpha_index]
+                    fold_row['alpha'] = alphas[alpha_index]
+                oof_values[val_idx] = pred
+                metrics = calculate_metrics(y_values[val_idx], pred)
+                fold_metrics.append(metrics)
+                fold_rows.append({**fold_row, **metrics})
+
+            oof[model_type] = oof_values
+            for metric_name in ('mae', 'rmse', 'r2'):
+                values = [m[metric_name] for m in fold_metrics]
+                row[f'{metric_name}_mean'] = np.mean(values)
+                row[f'{metric_name}_std'] = np.std(values)
+            summary_rows.append(row)
+
+        oof_predictions[organ] = oof
+
+    summary = pd.DataFrame(summary_rows)
+    print(summary.to_string(index=False))
+
+    return {
+        'summary': summary,
+        'fold_metrics': pd.DataFrame(fold_rows),
+        'oof_predictions': oof_predictions,
+        'fold_ids': fold_ids,
+        'alpha_path': alpha_path,
+    }
@@ -7,8 +7,7 @@ using feature importance, SHAP values, and other interpretability methods.
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from typing import Any, Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 import warnings
 
 
@@ -18,6 +17,14 @@ def get_feature_importance(model: Any,
     """
     Extract feature importance from a trained model.
 
+    'gain' and 'split' importances are read from the split nodes of
+    gradient boosted trees (HistGradientBoosting and its FlatTreeEnsemble
+    export, LightGBM, XGBoost) in one pass, without re-predicting any data.
+    Other scikit-learn trees and forests report their normalized impurity
+    decrease (feature_importances_) as 'gain' and their split nodes as
+    'split'. With 'auto', models without feature_importances_ or coef_
+    (e.g. HistGradientBoostingRegressor) fall back to 'gain'.
+
     Args:
         model: Trained model.
         feature_names: List of feature names.
@@ -26,20 +33,35 @@ def get_feature_importance(model: Any,
     Returns:
         DataFrame with feature names and importance scores, sorted by importance.
 
+    Raises:
+        ValueError: If the model does not provide the requested importance
+                   (e.g. 'coef' for a tree model) or the type is unknown.
+
     Example:
         >>> importance = get_feature_importance(model, X_train.columns.tolist())
         >>> print(importance.head())
+        >>> splits = get_feature_importance(hist_gb_model, features, importance_type='split')
     """
-    if hasattr(model, 'feature_importances_'):
-        # Tree-based models
-        importances = model.feature_importances_
+    if importance_type in ('gain', 'split'):
+        importances = _split_importances(model, importance_type)
 
-    elif hasattr(model, 'coef_'):
-        # Linear models - use absolute coefficients
+    elif importance_type == 'coef':
+        if not hasattr(model, 'coef_'):
+            raise ValueError(f"Model has no coefficients: {type(model).__name__}")
         importances = np.abs(model.coef_)
 
+    elif importance_type == 'auto':
+        if hasattr(model, 'feature_importances_'):
+            # Tree-based models
+            importances = model.feature_importances_
+        elif hasattr(model, 'coef_'):
+            # Linear models - use absolute coefficients
+            importances = np.abs(model.coef_)
+        else:
+            importances = _split_importances(model, 'gain')
+
     else:
-        raise ValueError("Model does not have feature_importances_ or coef_ attribute")
+        raise ValueError(f"Unknown importance_type: {importance_type}")
 
     # Create DataFrame
     importance_df = pd.DataFrame({
@@ -53,10 +75,51 @@ def get_feature_importance(model: Any,
     return importance_df
 
 
+def _split_importances(model: Any, importance_type: str) -> np.ndarray:
+    """Total split gain or split count per feature of a boosted tree model."""
+    from .trees import FlatTreeEnsemble
+
+    if isinstance(model, FlatTreeEnsemble):
+        return model.feature_importance(importance_type)
+
+    if type(model).__name__ == 'HistGradientBoostingRegressor':
+        return FlatTreeEnsemble.from_hist_gb(model).feature_importance(importance_type)
+
+    if hasattr(model, 'booster_'):
+        # LightGBM
+        return np.asarray(model.booster_.feature_importance(importance_type=importance_type),
+                          dtype=np.float64)
+
+    if hasattr(model, 'get_booster'):
+        # XGBoost: total_gain matches the summed gain of the other libraries
+        booster = model.get_booster()
+        scores = booster.get_score(importance_type='total_gain' if importance_type == 'gain' else 'weight')
+        names = booster.feature_names or [f"f{j}" for j in range(model.n_features_in_)]
+        return np.array([scores.get(name, 0.0) for name in names], dtype=np.float64)
+
+    trees = [model] if hasattr(model, 'tree_') else [
+        estimator for estimator in np.ravel(getattr(model, 'estimators_', []))
+        if hasattr(estimator, 'tree_')
+    ]
+    if trees:
+        # Decision trees, forests and GradientBoosting: impurity decrease
+        # is their gain, summed over trees and normalized by scikit-learn
+        if importance_type == 'gain':
+            return np.asarray(model.feature_importances_, dtype=np.float64)
+        counts = np.zeros(model.n_features_in_)
+        for tree in trees:
+            split_features = tree.tree_.feature
+            np.add.at(counts, split_features[split_features >= 0], 1)
+        return counts
+
+    raise ValueError(f"Model does not have feature_importances_, coef_ or tree splits: "
+                     f"{type(model).__name__}")
+
+
 def plot_feature_importance(importance_df: pd.DataFrame,
                            top_n: int = 20,
                            title: str = "Feature Importance",
-                           figsize: tuple = (10, 8)) -> plt.Figure:
+                           figsize: tuple = (10, 8)) -> "plt.Figure":
     """
     Plot feature importance as a horizontal bar chart.
 
@@ -73,6 +136,8 @@ def plot_feature_importance(importance_df: pd.DataFrame,
         >>> fig = plot_feature_importance(importance_df, top_n=15)
         >>> plt.show()
     """
+    import matplotlib.pyplot as plt
+
     top_features = importance_df.head(top_n)
 
     fig, ax = plt.subplots(figsize=figsize)
@@ -89,21 +154,152 @@ def plot_feature_importance(importance_df: pd.DataFrame,
     return fig
 
 
+class LocalExplanation:
+    """
+    Minimal stand-in for shap.Explanation when shap is not installed.
+
+    Exposes the same values, base_values, data and feature_names
+    attributes, so code reading an explanation works with either.
+    """
+
+    def __init__(self, values: np.ndarray, base_values: np.ndarray,
+                 data: np.ndarray, feature_names: Optional[List[str]]):
+        self.values = values
+        self.base_values = base_values
+        self.data = data
+        self.feature_names = feature_names
+
+    @property
+    def shape(self) -> tuple:
+        return self.values.shape
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def _explanation(values: np.ndarray, base_values: np.ndarray,
+                 data: np.ndarray, feature_names: Optional[List[str]]) -> Any:
+    """shap.Explanation if shap is installed, else a LocalExplanation."""
+    try:
+        import shap
+    except ImportError:
+        return LocalExplanation(values, base_values, data, feature_names)
+    return shap.Explanation(values=values, base_values=base_values,
+                            data=data, feature_names=feature_names)
+
+
+def linear_attributions(model: Any,
+                        X: Any,
+                        scaler: Any = None,
+                        reference: Optional[np.ndarray] = None,
+                        dtype: Any = np.float64) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact per-feature contributions of a linear clock, in raw feature units.
+
+    The saved scaler is folded into the coefficients
+    (scaling.fold_scaler_into_linear), so X holds raw lab values and the
+    contribution of feature j is coef_j / scale_j * (x_j - reference_j).
+    With the scaler's center as reference, this equals the linear SHAP
+    values of the model in scaled space (shap.LinearExplainer with the
+    training data as background). Missing values are attributed through
+    the model's imputation values, like its predictions.
+
+    Args:
+        model: Fitted linear model, imputer + linear Pipeline or LinearClock.
+        X: Raw feature matrix (DataFrame, store.OrganView or array).
+        scaler: Fitted scaler the model was trained behind, or None if the
+               model takes X as is.
+        reference: Per-feature reference values. Defaults to the scaler's
+                  center, or to the column means of X without a scaler.
+        dtype: Output dtype, e.g. np.float32 to halve memory for millions of rows.
+
+    Returns:
+        Tuple of (values, base_values): contributions of shape
+        (n_samples, n_features) and the prediction at the reference,
+        so that values.sum(axis=1) + base_values equals the prediction.
+
+    Raises:
+        ValueError: If the model is not linear.
+
+    Example:
+        >>> values, base = linear_attributions(model, X_raw, scaler=scaler)
+        >>> np.allclose(values.sum(axis=1) + base, model.predict(scaler.transform(X_raw)))
+        True
+    """
+    from .scaling import fold_scaler_into_linear
+
+    clock = fold_scaler_into_linear(model, scaler)
+    X = np.asarray(X)
+
+    if reference is None:
+        center = None if scaler is None else getattr(scaler, 'mean_', None)
+        if center is None and scaler is not None:
+            center = getattr(scaler, 'center_', None)
+        if center is None:
+            filled = X if clock.impute is None else np.where(np.isnan(X), clock.impute, X)
+            center = np.nanmean(filled, axis=0)
+        reference = center
+    reference = np.asarray(reference, dtype=np.float64)
+
+    values = np.empty(X.shape, dtype=dtype)
+    np.subtract(X, reference, out=values, casting='same_kind')
+    values *= clock.coef.astype(dtype)
+
+    if clock.impute is not None:
+        rows, cols = np.nonzero(np.isnan(values))
+        values[rows, cols] = ((clock.impute - reference) * clock.coef)[cols]
+
+    base_value = clock.intercept + float(clock.coef @ reference)
+    return values, np.full(len(values), base_value)
+
+
+def _is_linear(model: Any) -> bool:
+    """Whether bundle._model_arrays describes the model as linear."""
+    from .bundle import _model_arrays
+
+    if type(model).__name__ == 'HistGradientBoostingRegressor':
+        return False
+    try:
+        return _model_arrays(model)['kind'] == 'linear'
+    except ValueError:
+        return False
+
+
+def _flat_trees(model: Any) -> Optional[Any]:
+    """FlatTreeEnsemble for models explained by the native TreeSHAP path, else None."""
+    from .trees import FlatTreeEnsemble
+
+    if isinstance(model, FlatTreeEnsemble) and model.cover is not None:
+        return model
+    if type(model).__name__ == 'HistGradientBoostingRegressor':
+        return FlatTreeEnsemble.from_hist_gb(model)
+    return None
+
+
 def calculate_shap_values(model: Any,
                          X: pd.DataFrame,
-                         background_samples: Optional[int] = 100) -> Any:
+                         background_samples: Optional[int] = 100,
+                         n_jobs: int = -1,
+                         scaler: Any = None) -> Any:
     """
     Calculate SHAP values for model predictions.
 
-    Requires the 'shap' package to be installed.
+    HistGradientBoosting clocks (and their FlatTreeEnsemble exports) are
+    explained with the exact TreeSHAP of trees.FlatTreeEnsemble.shap_values,
+    and linear clocks with the closed form of linear_attributions. Neither
+    needs the 'shap' package. Other models require 'shap' to be installed.
 
     Args:
         model: Trained model.
         X: Feature matrix to explain.
         background_samples: Number of background samples for TreeExplainer.
+        n_jobs: Parallel workers over row chunks for the native TreeSHAP path.
+        scaler: For linear models, the fitted scaler the model was trained
+               behind. X is then raw and attributions are in raw units.
 
     Returns:
-        SHAP Explanation object.
+        SHAP Explanation object (a LocalExplanation with the same attributes
+        if shap is not installed and a native path was used).
 
     Example:
         >>> # Requires: pip install shap
@@ -114,6 +310,18 @@ def calculate_shap_values(model: Any,
         If SHAP is not installed, this function will raise an ImportError
         with installation instructions.
     """
+    feature_names = X.columns.tolist() if hasattr(X, 'columns') else None
+
+    flat = _flat_trees(model)
+    if flat is not None:
+        values = flat.shap_values(X, n_jobs=n_jobs)
+        base_values = np.full(len(values), flat.expected_value)
+        return _explanation(values, base_values, np.asarray(X), feature_names or flat.feature_names)
+
+    if _is_linear(model):
+        values, base_values = linear_attributions(model, X, scaler=scaler)
+        return _explanation(values, base_values, np.asarray(X), feature_names)
+
     try:
         import shap
     except ImportError:
@@ -129,7 +337,7 @@ def calculate_shap_values(model: Any,
         shap_values = explainer.shap_values(X)
 
     elif hasattr(model, 'estimators_'):
-        # Ensemble tree models (XGBoost, LightGBM, HistGradientBoosting)
+        # Ensemble tree models (XGBoost, LightGBM)
         if background_samples and len(X) > background_samples:
             background = shap.sample(X, background_samples)
             explainer = shap.TreeExplainer(model, background)
@@ -138,11 +346,6 @@ def calculate_shap_values(model: Any,
 
         shap_values = explainer.shap_values(X)
 
-    elif hasattr(model, 'coef_'):
-        # Linear models
-        explainer = shap.LinearExplainer(model, X)
-        shap_values = explainer.shap_values(X)
-
     else:
         # Fallback to KernelExplainer (slower)
         warnings.warn("Using KernelExplainer - this may be slow for large datasets")
@@ -194,50 +397,183 @@ def plot_shap_summary(shap_explanation: Any,
         raise ValueError(f"Unknown plot_type: {plot_type}")
 
 
+def panel_feature_groups(organ_panels: Dict[str, List[str]],
+                         features: List[str]) -> Dict[str, List[str]]:
+    """
+    Feature groups for permutation importance from organ panels.
+
+    Every panel (e.g. from config.load_organ_panels_config) becomes one
+    group of its biomarkers present in features; features that are in no
+    panel are kept as single-feature groups. A biomarker listed in two
+    panels belongs to both groups.
+
+    Args:
+        organ_panels: Dictionary mapping panel names to biomarker columns.
+        features: Feature names of the model.
+
+    Returns:
+        Dictionary mapping group names to lists of feature names.
+
+    Example:
+        >>> groups = panel_feature_groups(organ_panels, X_test.columns.tolist())
+        >>> calculate_permutation_importance(model, X_test, y_test, groups=groups)
+    """
+    groups = {}
+    for panel, biomarkers in organ_panels.items():
+        members = [col for col in features if col in set(biomarkers)]
+        if members:
+            groups[panel] = members
+
+    grouped = {col for members in groups.values() for col in members}
+    for col in features:
+        if col not in grouped:
+            groups[col] = [col]
+
+    return groups
+
+
 def calculate_permutation_importance(model: Any,
                                     X: pd.DataFrame,
                                     y: pd.Series,
                                     n_repeats: int = 10,
-                                    random_state: int = 42) -> pd.DataFrame:
+                                    random_state: int = 42,
+                                    groups: Optional[Dict[str, List[str]]] = None,
+                                    metric: str = 'r2',
+                                    chunk_size: int = 8192,
+                                    n_jobs: int = -1) -> pd.DataFrame:
     """
-    Calculate permutation importance for model features.
-
-    This is a model-agnostic method that works with any model.
+    Calculate permutation importance for model features or feature groups.
+
+    This is a model-agnostic method that works with any model. The
+    baseline prediction is computed once. Each group's columns are then
+    permuted together, so a whole organ panel or a set of correlated
+    features (e.g. the lipid ratios) is scored as a unit. Rows are
+    predicted in chunks of chunk_size through one reused buffer per
+    worker, so memory stays bounded. Workers are threads that share X and
+    the model rather than copying them. Repeat r of group g always uses
+    the permutation seeded by (random_state, r, g), whatever n_jobs and
+    chunk_size are.
 
     Args:
         model: Trained model.
         X: Feature matrix.
         y: Target vector.
-        n_repeats: Number of times to permute each feature.
+        n_repeats: Number of times to permute each group.
         random_state: Random seed.
+        groups: Optional mapping from group names to feature lists, e.g.
+               from panel_feature_groups. Defaults to one group per feature.
+        metric: 'r2' (importance is the drop in R², as in
+               sklearn.inspection.permutation_importance), 'mae' or 'rmse'
+               (importance is the increase in error, in years).
+        chunk_size: Rows predicted at a time.
+        n_jobs: Number of parallel workers over groups (-1 uses all cores).
 
     Returns:
-        DataFrame with feature names, importance mean, and std.
+        DataFrame with feature (group) names, number of features, importance
+        mean and std, sorted by importance.
+
+    Raises:
+        ValueError: If metric is unknown or a group names a missing feature.
 
     Example:
         >>> perm_importance = calculate_permutation_importance(model, X_test, y_test)
         >>> print(perm_importance.head())
     """
-    from sklearn.inspection import permutation_importance
-
-    result = permutation_importance(
-        model, X, y,
-        n_repeats=n_repeats,
-        random_state=random_state,
-        n_jobs=-1
+    from joblib import Parallel, delayed
+
+    if metric not in ('r2', 'mae', 'rmse'):
+        raise ValueError(f"Unknown metric: {metric}. Choose 'r2', 'mae' or 'rmse'")
+
+    columns = list(X.columns) if hasattr(X, 'columns') else None
+    names = columns if columns is not None else [f"x{j}" for j in range(np.shape(X)[1])]
+    groups = groups if groups is not None else {name: [name] for name in names}
+    missing = sorted({col for members in groups.values() for col in members} - set(names))
+    if missing:
+        raise ValueError(f"Group features not found in X: {missing}")
+
+    X_values = np.asarray(X)
+    if not np.issubdtype(X_values.dtype, np.floating):
+        X_values = X_values.astype(np.float64)
+    y_values = np.asarray(y, dtype=np.float64)
+    chunk_size = max(1, min(chunk_size, len(X_values)))
+    position = {name: j for j, name in enumerate(names)}
+
+    # Baseline errors, predicted once on the unpermuted rows
+    baseline = np.zeros(2)
+    for start in range(0, len(X_values), chunk_size):
+        stop = start + chunk_size
+        baseline += _error_sums(_predict_chunk(model, X_values[start:stop], columns), y_values[start:stop])
+
+    permuted = Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(_permuted_error_sums)(model, X_values, y_values, columns,
+                                      np.array([position[col] for col in members]),
+                                      g, n_repeats, random_state, chunk_size)
+        for g, members in enumerate(groups.values())
     )
 
-    importance_df = pd.DataFrame({
-        'feature': X.columns,
-        'importance_mean': result.importances_mean,
-        'importance_std': result.importances_std
-    })
+    baseline_score = _score_from_sums(baseline, y_values, metric)
+    rows = []
+    for (name, members), sums in zip(groups.items(), permuted):
+        scores = np.array([_score_from_sums(repeat, y_values, metric) for repeat in sums])
+        drops = baseline_score - scores if metric == 'r2' else scores - baseline_score
+        rows.append({'feature': name, 'n_features': len(members),
+                     'importance_mean': drops.mean(), 'importance_std': drops.std()})
 
+    importance_df = pd.DataFrame(rows)
+
+    # Sort by importance
     importance_df = importance_df.sort_values('importance_mean', ascending=False)
 
     return importance_df
 
 
+def _predict_chunk(model: Any, X: np.ndarray, columns: Optional[List[str]]) -> np.ndarray:
+    """Predict a chunk, restoring column names for models fitted on DataFrames."""
+    if columns is not None and hasattr(model, 'feature_names_in_'):
+        X = pd.DataFrame(X, columns=columns, copy=False)
+    return np.asarray(model.predict(X), dtype=np.float64)
+
+
+def _error_sums(y_pred: np.ndarray, y_true: np.ndarray) -> np.ndarray:
+    """Sum of absolute and of squared errors."""
+    errors = y_pred - y_true
+    return np.array([np.abs(errors).sum(), np.square(errors).sum()])
+
+
+def _score_from_sums(sums: np.ndarray, y: np.ndarray, metric: str) -> float:
+    """R², MAE or RMSE from summed absolute and squared errors."""
+    if metric == 'mae':
+        return sums[0] / len(y)
+    if metric == 'rmse':
+        return float(np.sqrt(sums[1] / len(y)))
+    return 1 - sums[1] / np.square(y - y.mean()).sum()
+
+
+def _permuted_error_sums(model: Any,
+                         X: np.ndarray,
+                         y: np.ndarray,
+                         columns: Optional[List[str]],
+                         positions: np.ndarray,
+                         group_index: int,
+                         n_repeats: int,
+                         random_state: int,
+                         chunk_size: int) -> np.ndarray:
+    """Error sums of every repeat with one group's columns permuted."""
+    buffer = np.empty((chunk_size, X.shape[1]), dtype=X.dtype)
+    sums = np.zeros((n_repeats, 2))
+
+    for repeat in range(n_repeats):
+        order = np.random.default_rng((random_state, repeat, group_index)).permutation(len(X))
+        for start in range(0, len(X), chunk_size):
+            stop = min(start + chunk_size, len(X))
+            chunk = buffer[:stop - start]
+            chunk[:] = X[start:stop]
+            chunk[:, positions] = X[np.ix_(order[start:stop], positions)]
+            sums[repeat] += _error_sums(_predict_chunk(model, chunk, columns), y[start:stop])
+
+    return sums
+
+
 def analyze_prediction_errors(y_true: np.ndarray,
                              y_pred: np.ndarray,
                              X: Optional[pd.DataFrame] = None,
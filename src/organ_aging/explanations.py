@@ -0,0 +1,292 @@
+"""
+Precomputed per-individual explanations of every organ clock.
+
+Explaining one person used to mean re-running SHAP in a notebook. This
+module computes the attributions of every individual for every organ in
+one batch, using the shap-free explainers of explainability: exact
+TreeSHAP for gradient boosted clocks and closed-form contributions for
+linear clocks. The result is one columnar table keyed by (SEQN, organ),
+with a base value and one float16/float32 column per feature (missing
+for features the organ does not use), written to Parquet next to the
+age-gap export.
+
+An ExplanationStore loads that table once, pre-sorts every row by
+absolute contribution, and answers "what drives this person's liver
+age?" with a dictionary lookup and a slice.
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .explainability import _flat_trees, _is_linear, linear_attributions
+from .store import FeatureStore
+
+
+def explain_clock(clock: Any, X: np.ndarray, n_jobs: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-feature attributions of one organ clock, in years.
+
+    Args:
+        clock: scoring.OrganClock.
+        X: Raw (unscaled) feature block of shape (n_samples, len(clock.features)).
+        n_jobs: Parallel workers for tree clocks.
+
+    Returns:
+        Tuple of (values, base_values) with values.sum(axis=1) + base_values
+        equal to the clock's predicted age. Rows the clock cannot score
+        (missing values for a model without imputation) are NaN.
+
+    Raises:
+        ValueError: If the clock's model has no shap-free explainer.
+    """
+    model = clock.model
+    X = np.array(X, dtype=np.float64)
+
+    if _is_linear(model):
+        # Fold the clock's scaling parameters into raw-unit coefficients
+        scaler = None
+        if clock.center is not None or clock.scale is not None:
+            scaler = SimpleNamespace(center_=clock.center, scale_=clock.scale)
+        return linear_attributions(model, X, scaler=scaler)
+
+    flat = _flat_trees(model)
+    if flat is None:
+        raise ValueError(f"No shap-free explainer for {type(model).__name__} ({clock.organ})")
+
+    if clock.center is not None:
+        X -= clock.center
+    if clock.scale is not None:
+        X /= clock.scale
+    values = flat.shap_values(X, n_jobs=n_jobs)
+    return values, np.full(len(values), flat.expected_value)
+
+
+def explain_cohort(ensemble: Any,
+                   df: Any,
+                   id_col: str = 'SEQN',
+                   dtype: Any = np.float32,
+                   n_jobs: int = -1) -> pd.DataFrame:
+    """
+    Attributions of every individual for every organ clock.
+
+    Args:
+        ensemble: scoring.OrganClockEnsemble. Load it without fold_scalers,
+                 so linear contributions are measured from the training
+                 centers rather than from this cohort's means.
+        df: DataFrame or store.FeatureStore with every ensemble feature.
+        id_col: Identifier column (a store's index is used for a FeatureStore).
+        dtype: Storage dtype of the attributions, np.float32 or np.float16.
+        n_jobs: Parallel workers for tree clocks.
+
+    Returns:
+        DataFrame with one row per (id, organ) the clock could score:
+        id_col, 'organ' (categorical), 'base_value' and one column per
+        feature of ensemble.feature_names, missing where the organ does not
+        use the feature. Organs without a shap-free explainer are skipped
+        with a warning.
+
+    Example:
+        >>> explanations = explain_cohort(ensemble, df)
+        >>> explanations[explanations['organ'] == 'liver'].head()
+    """
+    X = ensemble.build_feature_matrix(df)
+    if isinstance(df, FeatureStore):
+        ids = np.asarray(df.index)
+    elif id_col in df.columns:
+        ids = df[id_col].to_numpy()
+    else:
+        raise ValueError(f"Identifier column '{id_col}' not found in DataFrame")
+
+    blocks = []
+    for organ, clock in ensemble.clocks.items():
+        try:
+            values, base_values = explain_clock(clock, X[:, ensemble.column_index[organ]], n_jobs=n_jobs)
+        except ValueError as e:
+            print(f"Warning: {e}, skipping")
+            continue
+        keep = ~np.isnan(values).any(axis=1)
+        blocks.append((organ, keep, values[keep], base_values[keep]))
+
+    n_rows = sum(len(values) for _, _, values, _ in blocks)
+    matrix = np.full((n_rows, len(ensemble.feature_names)), np.nan, dtype=dtype)
+    organ_codes = np.empty(n_rows, dtype=np.int8)
+    id_values = np.empty(n_rows, dtype=ids.dtype)
+    base = np.empty(n_rows, dtype=np.float32)
+
+    start = 0
+    organs = [organ for organ, _, _, _ in blocks]
+    for code, (organ, keep, values, base_values) in enumerate(blocks):
+        stop = start + len(values)
+        matrix[start:stop, ensemble.column_index[organ]] = values
+        organ_codes[start:stop] = code
+        id_values[start:stop] = ids[keep]
+        base[start:stop] = base_values
+        start = stop
+
+    columns = {
+        id_col: id_values,
+        'organ': pd.Categorical.from_codes(organ_codes, categories=organs),
+        'base_value': base,
+    }
+    columns.update({feature: matrix[:, j] for j, feature in enumerate(ensemble.feature_names)})
+    return pd.DataFrame(columns)
+
+
+def export_explanations(ensemble: Any,
+                        df: Any,
+                        output_path: str,
+                        id_col: str = 'SEQN',
+                        dtype: Any = np.float32,
+                        n_jobs: int = -1) -> int:
+    """
+    Compute explain_cohort and write it to a Parquet file.
+
+    Args:
+        ensemble: scoring.OrganClockEnsemble.
+        df: DataFrame or store.FeatureStore with every ensemble feature.
+        output_path: Destination .parquet file.
+        id_col: Identifier column.
+        dtype: Storage dtype of the attributions, np.float32 or np.float16.
+        n_jobs: Parallel workers for tree clocks.
+
+    Returns:
+        Number of (id, organ) rows written.
+
+    Example:
+        >>> export_explanations(ensemble, df, "data/processed/explanations.parquet")
+        >>> store = ExplanationStore.load("data/processed/explanations.parquet")
+    """
+    explanations = explain_cohort(ensemble, df, id_col=id_col, dtype=dtype, n_jobs=n_jobs)
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    explanations.to_parquet(output_path, index=False)
+    print(f"Explanations for {explanations[id_col].nunique()} individuals × "
+          f"{explanations['organ'].nunique()} organs → {output_path}")
+
+    return len(explanations)
+
+
+class ExplanationStore:
+    """
+    In-memory lookup of precomputed per-individual explanations.
+
+    Each organ's attributions are kept as a float32 matrix over that
+    organ's features only, with every row's features pre-sorted by
+    absolute contribution, so top_drivers is a dictionary lookup plus a
+    slice.
+
+    Args:
+        explanations: DataFrame from explain_cohort (or its Parquet file).
+        id_col: Identifier column.
+
+    Example:
+        >>> store = ExplanationStore.load("data/processed/explanations.parquet")
+        >>> store.top_drivers(93705, k=3)
+        {'liver': [('LBXSATSI', 2.41), ('BMXBMI', -1.12), ('LBXSGTSI', 0.87)], ...}
+    """
+
+    def __init__(self, explanations: pd.DataFrame, id_col: str = 'SEQN'):
+        missing = [col for col in (id_col, 'organ', 'base_value') if col not in explanations.columns]
+        if missing:
+            raise ValueError(f"Explanation table is missing columns: {missing}")
+
+        self.id_col = id_col
+        feature_names = [col for col in explanations.columns if col not in (id_col, 'organ', 'base_value')]
+        self._organs = {}
+
+        for organ, part in explanations.groupby('organ', sort=False, observed=True):
+            values = part[feature_names].to_numpy(dtype=np.float32)
+            used = ~np.isnan(values).all(axis=0)
+            values = np.ascontiguousarray(values[:, used])
+            self._organs[str(organ)] = {
+                'features': [feature for feature, keep in zip(feature_names, used) if keep],
+                'values': values,
+                'base_values': part['base_value'].to_numpy(dtype=np.float32),
+                'order': np.argsort(-np.abs(values), axis=1, kind='stable').astype(np.int16),
+                'rows': {key: row for row, key in enumerate(part[id_col].tolist())},
+            }
+
+    @classmethod
+    def load(cls, path: str, id_col: str = 'SEQN') -> 'ExplanationStore':
+        """
+        Load explanations from a Parquet file or dataset directory.
+
+        Raises:
+            FileNotFoundError: If the path does not exist.
+        """
+        if not Path(path).exists():
+            raise FileNotFoundError(f"Explanations not found: {path}")
+        return cls(pd.read_parquet(path), id_col=id_col)
+
+    @property
+    def organs(self) -> List[str]:
+        """Organs with stored explanations."""
+        return list(self._organs)
+
+    def __len__(self) -> int:
+        return sum(len(table['rows']) for table in self._organs.values())
+
+    def __repr__(self) -> str:
+        return f"ExplanationStore({len(self)} rows, organs={self.organs})"
+
+    def top_drivers(self,
+                    person_id: Any,
+                    k: int = 5,
+                    organs: Optional[List[str]] = None) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        The k features contributing most to a person's biological age, per organ.
+
+        Args:
+            person_id: Identifier (e.g. SEQN).
+            k: Number of drivers per organ.
+            organs: Optional organs to include. Defaults to all.
+
+        Returns:
+            Dictionary mapping organs to (feature, contribution in years)
+            pairs, largest absolute contribution first. Organs without an
+            explanation for the person are left out.
+
+        Raises:
+            KeyError: If no organ has an explanation for the person.
+        """
+        drivers = {}
+        for organ in organs or self._organs:
+            table = self._organs[organ]
+            row = table['rows'].get(person_id)
+            if row is None:
+                continue
+            values = table['values'][row]
+            features = table['features']
+            drivers[organ] = [(features[j], float(values[j])) for j in table['order'][row, :k]]
+
+        if not drivers:
+            raise KeyError(f"No explanations for {self.id_col} {person_id}")
+        return drivers
+
+    def explain(self, person_id: Any, organ: str) -> pd.Series:
+        """
+        All contributions of one person for one organ.
+
+        Args:
+            person_id: Identifier (e.g. SEQN).
+            organ: Organ name.
+
+        Returns:
+            Series of contributions indexed by feature, with the base value
+            under 'base_value'. Contributions plus base value give the
+            predicted biological age.
+
+        Raises:
+            KeyError: If the organ or person has no stored explanation.
+        """
+        table = self._organs[organ]
+        row = table['rows'].get(person_id)
+        if row is None:
+            raise KeyError(f"No {organ} explanation for {self.id_col} {person_id}")
+        return pd.Series(np.append(table['values'][row], table['base_values'][row]),
+                         index=table['features'] + ['base_value'], name=person_id)
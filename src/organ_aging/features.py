@@ -1,29 +1,280 @@
 """
 Feature engineering for organ-specific datasets.
 
-This module handles construction of organ-specific feature matrices,
-train/val/test splitting, and feature scaling.
+This module handles engineered biomarkers, construction of organ-specific
+feature matrices, train/val/test splitting (optionally recorded as a split
+manifest of participant identifiers), and feature scaling.
 """
 
+import json
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Optional
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, RobustScaler
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Tuple, Optional
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Element-wise division returning NaN where the denominator is zero or missing."""
+    result = np.full(np.broadcast(numerator, denominator).shape, np.nan)
+    np.divide(numerator, denominator, out=result,
+              where=(denominator != 0) & ~np.isnan(denominator))
+    return result
+
+
+# eGFR equation the shipped kidney clock was trained on (notebook 02).
+# Changing it shifts every eGFR value, so the kidney clock must be
+# retrained alongside.
+EGFR_EQUATION = 'CKD-EPI 2009 (race-free)'
+
+
+def compute_egfr(creatinine: np.ndarray, age: np.ndarray, sex: np.ndarray) -> np.ndarray:
+    """
+    Compute eGFR with the CKD-EPI 2009 creatinine equation, without race factor.
+
+    eGFR = 141 × min(Scr/κ, 1)^α × max(Scr/κ, 1)^(-1.209) × 0.993^Age × [1.018 if female]
+
+    where κ = 0.7 (female) or 0.9 (male) and α = -0.329 (female) or -0.411 (male).
+    These are the constants used to build the training data; see EGFR_EQUATION.
+
+    Args:
+        creatinine: Serum creatinine in mg/dL (LBXSCR).
+        age: Age in years (RIDAGEYR).
+        sex: NHANES sex code (RIAGENDR: 1 = male, 2 = female).
+
+    Returns:
+        eGFR in mL/min/1.73m². NaN where any input is missing, the
+        creatinine is not positive, or the sex code is unknown.
+
+    Example:
+        >>> compute_egfr(np.array([0.7]), np.array([50]), np.array([2]))
+        array([101.0...])
+    """
+    creatinine = np.asarray(creatinine, dtype=np.float64)
+    age = np.asarray(age, dtype=np.float64)
+    sex = np.asarray(sex, dtype=np.float64)
+
+    female = sex == 2
+    known_sex = female | (sex == 1)
+
+    kappa = np.where(female, 0.7, 0.9)
+    alpha = np.where(female, -0.329, -0.411)
+    ratio = _safe_divide(creatinine, kappa)
+    ratio[~(ratio > 0)] = np.nan
+
+    egfr = (141.0
+            * np.minimum(ratio, 1.0) ** alpha
+            * np.maximum(ratio, 1.0) ** -1.209
+            * 0.993 ** age
+            * np.where(female, 1.018, 1.0))
+    egfr[~known_sex] = np.nan
+
+    return egfr
+
+
+def _scaled_product(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Absolute count from a total count and a percentage."""
+    return a * b / 100
+
+
+class DerivedFeature(NamedTuple):
+    """
+    A derived biomarker: its inputs and the NumPy kernel computing it.
+
+    Inputs may be raw NHANES columns or other derived features. Kernels
+    receive float64 arrays in input order and must be vectorized.
+    """
+    inputs: Tuple[str, ...]
+    kernel: Callable[..., np.ndarray]
+
+
+# Declarative graph of engineered biomarkers, keyed by feature name
+DERIVED_FEATURES: Dict[str, DerivedFeature] = {
+    # Kidney
+    'eGFR': DerivedFeature(('LBXSCR', 'RIDAGEYR', 'RIAGENDR'), compute_egfr),
+    'ACR': DerivedFeature(('URXUMA', 'URXUCR'), lambda alb, cr: _safe_divide(alb, cr) * 1000),
+    'BUN_Cr_Ratio': DerivedFeature(('LBXSBU', 'LBXSCR'), _safe_divide),
+    # Liver
+    'AST_ALT_Ratio': DerivedFeature(('LBXSASSI', 'LBXSATSI'), _safe_divide),
+    # Cardio-metabolic
+    'Non_HDL': DerivedFeature(('LBXTC', 'LBDHDD'), np.subtract),
+    'TC_HDL_Ratio': DerivedFeature(('LBXTC', 'LBDHDD'), _safe_divide),
+    'TG_HDL_Ratio': DerivedFeature(('LBXTR', 'LBDHDD'), _safe_divide),
+    # Immune
+    'Abs_Lymphocyte_Count': DerivedFeature(('LBXWBCSI', 'LBXLYPCT'), _scaled_product),
+    'Abs_Neutrophil_Count': DerivedFeature(('LBXWBCSI', 'LBXNEPCT'), _scaled_product),
+    'NLR': DerivedFeature(('LBXNEPCT', 'LBXLYPCT'), _safe_divide),
+}
+
+
+def resolve_derived_features(required: Iterable[str]) -> List[str]:
+    """
+    Order the derived features needed for a set of required columns.
+
+    Args:
+        required: Column names that will be read downstream. Names that
+                 are not derived features are ignored.
+
+    Returns:
+        Derived feature names, each listed after the derived features it
+        depends on.
+
+    Raises:
+        ValueError: If the feature graph contains a cycle.
+
+    Example:
+        >>> resolve_derived_features(['LBXSCR', 'eGFR', 'BMXBMI'])
+        ['eGFR']
+    """
+    ordered: List[str] = []
+    visiting = set()
+
+    def visit(name):
+        if name not in DERIVED_FEATURES or name in ordered:
+            return
+        if name in visiting:
+            raise ValueError(f"Cycle in derived feature graph at '{name}'")
+        visiting.add(name)
+        for dependency in DERIVED_FEATURES[name].inputs:
+            visit(dependency)
+        visiting.discard(name)
+        ordered.append(name)
+
+    for name in required:
+        visit(name)
+
+    return ordered
+
+
+def panel_derived_features(organ_panels: Dict[str, List[str]],
+                           organs: Optional[List[str]] = None) -> List[str]:
+    """
+    List the derived features used by the given organ panels.
+
+    Args:
+        organ_panels: Organ panel configuration (e.g. from
+                     config.load_organ_panels_config). A 'global_covariates'
+                     entry is always included.
+        organs: Optional subset of organs. Defaults to all panels.
+
+    Returns:
+        Derived feature names in dependency order.
+
+    Example:
+        >>> panel_derived_features(organ_panels, organs=['kidney'])
+        ['eGFR', 'ACR', 'BUN_Cr_Ratio']
+    """
+    if organs is None:
+        organs = [name for name in organ_panels if name != 'global_covariates']
+
+    required = []
+    for name in list(organs) + ['global_covariates']:
+        panel = organ_panels.get(name) or []
+        if isinstance(panel, list):
+            required.extend(panel)
+
+    return resolve_derived_features(required)
+
+
+def compute_engineered_features(columns: Mapping[str, np.ndarray],
+                                features: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Compute engineered biomarkers from raw NHANES columns.
+
+    Features are evaluated from the DERIVED_FEATURES graph in dependency
+    order, one vectorized kernel per feature. Works on any mapping of
+    column name to array (a dict of NumPy arrays or a DataFrame), so the
+    same code serves batch and single-person scoring. Each input column is
+    converted to a contiguous float64 array once. A feature is only
+    computed when all of its inputs are present. Divisions by zero or by
+    missing values yield NaN.
+
+    Features:
+        eGFR (kidney), ACR (kidney), BUN_Cr_Ratio (kidney),
+        AST_ALT_Ratio (liver), Non_HDL, TC_HDL_Ratio, TG_HDL_Ratio
+        (cardio-metabolic), Abs_Lymphocyte_Count, Abs_Neutrophil_Count,
+        NLR (immune).
+
+    Args:
+        columns: Mapping of raw column names to arrays.
+        features: Optional names of the columns needed downstream (e.g. a
+                 model's feature list, or panel_derived_features output).
+                 Only the derived features among them, and their
+                 dependencies, are computed. Defaults to all features.
+
+    Returns:
+        Dictionary mapping engineered feature names to float64 arrays.
+
+    Example:
+        >>> derived = compute_engineered_features({'LBXSASSI': ast, 'LBXSATSI': alt})
+        >>> derived['AST_ALT_Ratio']
+        >>> kidney_only = compute_engineered_features(df, features=['eGFR', 'ACR'])
+    """
+    order = resolve_derived_features(DERIVED_FEATURES if features is None else features)
+
+    arrays: Dict[str, np.ndarray] = {}
+
+    def get(name):
+        if name not in arrays:
+            arrays[name] = np.ascontiguousarray(columns[name], dtype=np.float64)
+        return arrays[name]
+
+    derived = {}
+    for name in order:
+        spec = DERIVED_FEATURES[name]
+        if not all(dep in columns or dep in derived for dep in spec.inputs):
+            continue
+        result = spec.kernel(*(derived[dep] if dep in derived else get(dep) for dep in spec.inputs))
+        derived[name] = result
+
+    return derived
+
+
+def add_engineered_features(df: pd.DataFrame,
+                            features: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Add engineered biomarkers to a DataFrame.
+
+    Existing columns are left untouched, so this can be used as a
+    row-local transform for chunked scoring.
+
+    Args:
+        df: DataFrame with raw NHANES columns.
+        features: Optional needed columns, as for compute_engineered_features.
+
+    Returns:
+        Copy of df with the computed features appended.
+
+    Example:
+        >>> df = add_engineered_features(df, features=panel_derived_features(organ_panels))
+    """
+    derived = {
+        name: values
+        for name, values in compute_engineered_features(df, features).items()
+        if name not in df.columns
+    }
+    return df.assign(**derived)
 
 
 def build_organ_datasets(df: pd.DataFrame,
                         organ_panels: Dict[str, List[str]],
                         global_covars: List[str],
-                        target_col: str = 'AGE') -> Dict[str, Tuple[pd.DataFrame, pd.Series]]:
+                        target_col: str = 'AGE',
+                        dropna: bool = True) -> Dict[str, Tuple[pd.DataFrame, pd.Series]]:
     """
     Build organ-specific datasets by combining organ biomarkers with global covariates.
 
+    Every organ gets its own copy of its columns. store.build_organ_views
+    builds the same datasets as views over one shared column store.
+
     Args:
         df: Input DataFrame containing all biomarkers and covariates.
         organ_panels: Dictionary mapping organ names to lists of biomarker column names.
         global_covars: List of global covariate columns (e.g., SEX, BMI, SMOKING_STATUS).
         target_col: Name of the target variable (chronological age).
+        dropna: If True, drop each organ's rows with a missing feature. If
+               False, keep missing values for NaN-native models: every organ
+               uses the same rows (those with a target).
 
     Returns:
         Dictionary mapping organ names to tuples of (X, y) where:
@@ -68,7 +319,9 @@ def build_organ_datasets(df: pd.DataFrame,
         y = df[target_col].copy()
 
         # Drop rows with any missing values
-        valid_idx = X.notna().all(axis=1) & y.notna()
+        valid_idx = y.notna()
+        if dropna:
+            valid_idx &= X.notna().all(axis=1)
         X = X[valid_idx]
         y = y[valid_idx]
 
@@ -80,43 +333,38 @@ def build_organ_datasets(df: pd.DataFrame,
     return organ_datasets
 
 
-def split_train_val_test(X: pd.DataFrame,
-                         y: pd.Series,
-                         train_size: float = 0.6,
-                         val_size: float = 0.2,
-                         random_state: int = 42,
-                         stratify_bins: Optional[int] = None) -> Tuple:
-    """
-    Split data into train, validation, and test sets.
+def _take_rows(data: Any, positions: np.ndarray) -> Any:
+    """Select rows by position from a DataFrame, Series, OrganView or array."""
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        return data.iloc[positions]
+    if hasattr(data, 'take') and hasattr(data, 'store'):
+        return data.take(positions)
+    return np.asarray(data)[positions]
 
-    Args:
-        X: Feature matrix.
-        y: Target vector.
-        train_size: Proportion for training set (default 0.6).
-        val_size: Proportion for validation set (default 0.2).
-                 Test set gets the remainder (1 - train_size - val_size).
-        random_state: Random seed for reproducibility.
-        stratify_bins: If provided, stratify split by age bins (number of bins).
 
-    Returns:
-        Tuple of (X_train, X_val, X_test, y_train, y_val, y_test).
+def _split_positions(y: Any,
+                     train_size: float,
+                     val_size: float,
+                     random_state: int,
+                     stratify_bins: Optional[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Row positions of the train, validation and test splits."""
+    from sklearn.model_selection import train_test_split
 
-    Example:
-        >>> X_train, X_val, X_test, y_train, y_val, y_test = split_train_val_test(X, y)
-    """
     test_size = 1 - train_size - val_size
     if test_size < 0:
         raise ValueError("train_size + val_size must be <= 1")
 
+    y = np.asarray(y)
+    positions = np.arange(len(y))
+
     # Optionally stratify by age bins
     stratify = None
     if stratify_bins:
-        age_bins = pd.cut(y, bins=stratify_bins, labels=False)
-        stratify = age_bins
+        stratify = pd.cut(y, bins=stratify_bins, labels=False)
 
     # First split: train + val vs test
-    X_temp, X_test, y_temp, y_test = train_test_split(
-        X, y,
+    temp, test = train_test_split(
+        positions,
         test_size=test_size,
         random_state=random_state,
         stratify=stratify
@@ -125,21 +373,252 @@ def split_train_val_test(X: pd.DataFrame,
     # Second split: train vs val
     val_size_adjusted = val_size / (train_size + val_size)
 
+    stratify_temp = None
     if stratify_bins:
-        stratify_temp = pd.cut(y_temp, bins=stratify_bins, labels=False)
-    else:
-        stratify_temp = None
+        stratify_temp = pd.cut(y[temp], bins=stratify_bins, labels=False)
 
-    X_train, X_val, y_train, y_val = train_test_split(
-        X_temp, y_temp,
+    train, val = train_test_split(
+        temp,
         test_size=val_size_adjusted,
         random_state=random_state,
         stratify=stratify_temp
     )
 
+    return train, val, test
+
+
+def split_train_val_test(X: pd.DataFrame,
+                         y: pd.Series,
+                         train_size: float = 0.6,
+                         val_size: float = 0.2,
+                         random_state: int = 42,
+                         stratify_bins: Optional[int] = None,
+                         ids: Optional[Iterable] = None,
+                         return_manifest: bool = False) -> Tuple:
+    """
+    Split data into train, validation, and test sets.
+
+    Args:
+        X: Feature matrix (DataFrame or store.OrganView).
+        y: Target vector.
+        train_size: Proportion for training set (default 0.6).
+        val_size: Proportion for validation set (default 0.2).
+                 Test set gets the remainder (1 - train_size - val_size).
+        random_state: Random seed for reproducibility.
+        stratify_bins: If provided, stratify split by age bins (number of bins).
+        ids: Row identifiers (e.g. SEQN) recorded in the manifest.
+            Defaults to the index of X.
+        return_manifest: If True, also return a SplitManifest of the split.
+
+    Returns:
+        Tuple of (X_train, X_val, X_test, y_train, y_val, y_test), followed
+        by a SplitManifest if return_manifest is True.
+
+    Example:
+        >>> X_train, X_val, X_test, y_train, y_val, y_test = split_train_val_test(X, y)
+    """
+    train, val, test = _split_positions(y, train_size, val_size, random_state, stratify_bins)
+
+    X_train, X_val, X_test = (_take_rows(X, rows) for rows in (train, val, test))
+    y_train, y_val, y_test = (_take_rows(y, rows) for rows in (train, val, test))
+
     print(f"Split sizes - Train: {len(X_train)}, Val: {len(X_val)}, Test: {len(X_test)}")
 
-    return X_train, X_val, X_test, y_train, y_val, y_test
+    if not return_manifest:
+        return X_train, X_val, X_test, y_train, y_val, y_test
+
+    ids = np.asarray(X.index if ids is None else ids)
+    manifest = SplitManifest(
+        {'train': ids[train], 'val': ids[val], 'test': ids[test]},
+        params={'train_size': train_size, 'val_size': val_size,
+                'random_state': random_state, 'stratify_bins': stratify_bins}
+    )
+
+    return X_train, X_val, X_test, y_train, y_val, y_test, manifest
+
+
+class SplitManifest:
+    """
+    Train/val/test split recorded as participant identifiers.
+
+    Instead of writing train, val and test copies of every organ dataset,
+    the split is stored once as the identifiers (SEQN) in each split plus
+    the parameters that produced it. Organ splits are rebuilt on demand
+    from the cleaned cohort, so every organ uses the same participants in
+    each split. Rows an organ does not have (e.g. dropped for missing
+    biomarkers) are simply absent from that organ's splits.
+
+    Args:
+        ids: Mapping from split name ('train', 'val', 'test') to identifiers.
+        params: Split parameters (sizes, seed, stratification, id column).
+
+    Example:
+        >>> manifest = make_split_manifest(df, target_col='AGE', stratify_bins=5)
+        >>> manifest.save("data/processed/splits.json")
+        >>> organ_splits = manifest.organ_splits(build_organ_views(df, panels, covars))
+    """
+
+    SPLITS = ('train', 'val', 'test')
+
+    def __init__(self, ids: Dict[str, Iterable], params: Optional[Dict[str, Any]] = None):
+        missing = [name for name in self.SPLITS if name not in ids]
+        if missing:
+            raise ValueError(f"Split manifest is missing splits: {missing}")
+        self.ids = {name: np.asarray(ids[name]) for name in self.SPLITS}
+        self.params = dict(params or {})
+
+    def __len__(self) -> int:
+        return sum(len(values) for values in self.ids.values())
+
+    def positions(self, ids: Iterable) -> Dict[str, np.ndarray]:
+        """
+        Positions of each split's rows within a set of row identifiers.
+
+        Rows keep their order in the manifest, so rebuilding the split of
+        the original data gives the same rows in the same order.
+
+        Args:
+            ids: Identifiers of the rows to split, e.g. an organ's SEQNs.
+
+        Returns:
+            Dictionary mapping split names to row positions.
+
+        Raises:
+            ValueError: If the identifiers are not unique.
+        """
+        index = pd.Index(np.asarray(ids))
+        if not index.is_unique:
+            raise ValueError("Row identifiers must be unique to apply a split manifest")
+
+        positions = {}
+        for name in self.SPLITS:
+            found = index.get_indexer(self.ids[name])
+            positions[name] = found[found >= 0]
+        return positions
+
+    def split(self, X: Any, y: Any = None, ids: Optional[Iterable] = None) -> Tuple:
+        """
+        Rebuild the split of one dataset.
+
+        Args:
+            X: Feature matrix (DataFrame or store.OrganView).
+            y: Target vector. Defaults to the view's target for an OrganView.
+            ids: Row identifiers. Defaults to the index of X.
+
+        Returns:
+            Tuple of (X_train, X_val, X_test, y_train, y_val, y_test).
+        """
+        if y is None:
+            y = X.y
+        positions = self.positions(X.index if ids is None else ids)
+        X_splits = tuple(_take_rows(X, positions[name]) for name in self.SPLITS)
+        y_splits = tuple(_take_rows(y, positions[name]) for name in self.SPLITS)
+        return X_splits + y_splits
+
+    def organ_splits(self, organ_views: Mapping[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Rebuild every organ's split from views over the cleaned cohort.
+
+        Args:
+            organ_views: Mapping from organ to store.OrganView, e.g. from
+                        store.build_organ_views.
+
+        Returns:
+            Dictionary mapping organs to split dictionaries with 'X_train',
+            'X_val', 'X_test' views and 'y_train', 'y_val', 'y_test' arrays,
+            as accepted by training.train_organs_parallel.
+        """
+        organ_splits = {}
+        for organ, view in organ_views.items():
+            parts = self.split(view)
+            keys = [f'X_{name}' for name in self.SPLITS] + [f'y_{name}' for name in self.SPLITS]
+            organ_splits[organ] = dict(zip(keys, parts))
+        return organ_splits
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the manifest as a JSON-serializable dictionary."""
+        return {
+            'params': self.params,
+            'ids': {name: values.tolist() for name, values in self.ids.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SplitManifest":
+        """Rebuild a manifest from to_dict() output."""
+        return cls(data['ids'], params=data.get('params'))
+
+    def save(self, filepath: str) -> None:
+        """
+        Save the manifest as JSON.
+
+        Args:
+            filepath: Destination path, e.g. 'data/processed/splits.json'.
+        """
+        filepath = Path(filepath)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        with open(filepath, 'w') as f:
+            json.dump(self.to_dict(), f)
+        print(f"Split manifest saved to {filepath}")
+
+    @classmethod
+    def load(cls, filepath: str) -> "SplitManifest":
+        """
+        Load a manifest saved with save().
+
+        Args:
+            filepath: Path to the JSON file.
+
+        Returns:
+            SplitManifest.
+        """
+        filepath = Path(filepath)
+        if not filepath.exists():
+            raise FileNotFoundError(f"Split manifest not found: {filepath}")
+        with open(filepath, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+def make_split_manifest(df: pd.DataFrame,
+                        target_col: str = 'AGE',
+                        id_col: str = 'SEQN',
+                        train_size: float = 0.6,
+                        val_size: float = 0.2,
+                        random_state: int = 42,
+                        stratify_bins: Optional[int] = None) -> SplitManifest:
+    """
+    Split the whole cleaned cohort once and record the split as identifiers.
+
+    Args:
+        df: Cleaned cohort with identifier and target columns.
+        target_col: Target column used for stratification.
+        id_col: Participant identifier column.
+        train_size: Proportion for training set (default 0.6).
+        val_size: Proportion for validation set (default 0.2).
+        random_state: Random seed for reproducibility.
+        stratify_bins: If provided, stratify split by age bins (number of bins).
+
+    Returns:
+        SplitManifest covering every participant.
+
+    Example:
+        >>> manifest = make_split_manifest(df, target_col='RIDAGEYR', stratify_bins=5)
+    """
+    for col in (target_col, id_col):
+        if col not in df.columns:
+            raise ValueError(f"Column '{col}' not found in DataFrame")
+
+    ids = df[id_col].to_numpy()
+    train, val, test = _split_positions(df[target_col], train_size, val_size,
+                                        random_state, stratify_bins)
+
+    manifest = SplitManifest(
+        {'train': ids[train], 'val': ids[val], 'test': ids[test]},
+        params={'train_size': train_size, 'val_size': val_size, 'random_state': random_state,
+                'stratify_bins': stratify_bins, 'target_col': target_col, 'id_col': id_col}
+    )
+    print(f"Split manifest - Train: {len(train)}, Val: {len(val)}, Test: {len(test)}")
+
+    return manifest
 
 
 def scale_features(X_train: pd.DataFrame,
@@ -152,7 +631,7 @@ def scale_features(X_train: pd.DataFrame,
     Fits scaler on training data and transforms all sets.
 
     Args:
-        X_train: Training feature matrix.
+        X_train: Training feature matrix (DataFrame or store.OrganView).
         X_val: Validation feature matrix (optional).
         X_test: Test feature matrix (optional).
         method: Scaling method ('standard' or 'robust').
@@ -166,6 +645,8 @@ def scale_features(X_train: pd.DataFrame,
         ...     X_train, X_val, X_test, method='standard'
         ... )
     """
+    from sklearn.preprocessing import StandardScaler, RobustScaler
+
     if method == 'standard':
         scaler = StandardScaler()
     elif method == 'robust':
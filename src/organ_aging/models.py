@@ -7,25 +7,41 @@ as well as saving and loading trained models.
 
 import pandas as pd
 import numpy as np
-import joblib
 from pathlib import Path
 from typing import Any, Optional, Dict
-from sklearn.linear_model import LinearRegression, ElasticNet
-from sklearn.ensemble import HistGradientBoostingRegressor
 import warnings
 
 
+def _has_missing(X: Any) -> bool:
+    """Whether a DataFrame or array holds missing values, without upcasting it."""
+    if isinstance(X, pd.DataFrame):
+        return bool(X.isna().to_numpy().any())
+    if X.dtype.kind == 'f':
+        return bool(np.isnan(X).any())
+    if X.dtype.kind in 'iub':
+        return False
+    return bool(pd.isna(X).any())
+
+
 def train_linear_model(X_train: pd.DataFrame,
                       y_train: pd.Series,
                       model_type: str = 'linear',
+                      impute_strategy: Optional[str] = 'median',
                       **kwargs) -> Any:
     """
     Train a linear model for age prediction.
 
+    Linear models cannot use missing values. When X_train contains NaN
+    (e.g. organ datasets built with dropna=False), the model is wrapped
+    in a Pipeline behind a SimpleImputer fitted on the same data, so the
+    returned model predicts on NaN-bearing matrices directly.
+
     Args:
         X_train: Training feature matrix.
         y_train: Training target vector.
         model_type: Type of linear model ('linear' or 'elastic_net').
+        impute_strategy: SimpleImputer strategy used when X_train has
+                        missing values, or None to fit on X_train as is.
         **kwargs: Additional parameters for the model.
 
     Returns:
@@ -35,6 +51,8 @@ def train_linear_model(X_train: pd.DataFrame,
         >>> model = train_linear_model(X_train, y_train, model_type='linear')
         >>> predictions = model.predict(X_test)
     """
+    from sklearn.linear_model import LinearRegression, ElasticNet
+
     if model_type == 'linear':
         model = LinearRegression(**kwargs)
     elif model_type == 'elastic_net':
@@ -45,7 +63,18 @@ def train_linear_model(X_train: pd.DataFrame,
     else:
         raise ValueError(f"Unknown linear model type: {model_type}")
 
-    print(f"Training {model_type} model...")
+    if not isinstance(X_train, pd.DataFrame):
+        # Gathers a store.OrganView once; arrays are used as they are
+        X_train = np.asarray(X_train)
+
+    if impute_strategy is not None and _has_missing(X_train):
+        from sklearn.impute import SimpleImputer
+        from sklearn.pipeline import Pipeline
+
+        model = Pipeline([('imputer', SimpleImputer(strategy=impute_strategy)), ('model', model)])
+        print(f"Training {model_type} model with {impute_strategy} imputation...")
+    else:
+        print(f"Training {model_type} model...")
     model.fit(X_train, y_train)
 
     return model
@@ -71,6 +100,8 @@ def train_nonlinear_model(X_train: pd.DataFrame,
         >>> model = train_nonlinear_model(X_train, y_train, model_type='hist_gb')
         >>> predictions = model.predict(X_test)
     """
+    from sklearn.ensemble import HistGradientBoostingRegressor
+
     if model_type == 'hist_gb':
         # Default HistGradientBoosting parameters
         default_params = {
@@ -135,6 +166,8 @@ def save_model(model: Any, filepath: str, metadata: Optional[Dict] = None) -> No
         >>> save_model(model, "models/liver/linear_model.pkl",
         ...           metadata={'organ': 'liver', 'model_type': 'linear'})
     """
+    import joblib
+
     filepath = Path(filepath)
     filepath.parent.mkdir(parents=True, exist_ok=True)
 
@@ -148,20 +181,24 @@ def save_model(model: Any, filepath: str, metadata: Optional[Dict] = None) -> No
     print(f"Model saved to {filepath}")
 
 
-def load_model(filepath: str) -> Any:
+def load_model(filepath: str, return_metadata: bool = False) -> Any:
     """
     Load a trained model from disk.
 
     Args:
         filepath: Path to the saved model file.
+        return_metadata: If True, return a (model, metadata) tuple instead of
+                        just the model. Old-format files yield empty metadata.
 
     Returns:
-        Loaded model object.
+        Loaded model object, or (model, metadata) if return_metadata is True.
 
     Example:
         >>> model = load_model("models/liver/linear_model.pkl")
         >>> predictions = model.predict(X_test)
     """
+    import joblib
+
     filepath = Path(filepath)
 
     if not filepath.exists():
@@ -177,8 +214,12 @@ def load_model(filepath: str) -> Any:
             print(f"Loaded model with metadata: {metadata}")
     else:
         model = loaded
+        metadata = {}
 
     print(f"Model loaded from {filepath}")
+
+    if return_metadata:
+        return model, metadata
     return model
 
 
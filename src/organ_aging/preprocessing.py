@@ -4,10 +4,11 @@ Data preprocessing utilities for NHANES data.
 This module provides functions for cleaning, filtering, and encoding NHANES data.
 """
 
+import json
 import pandas as pd
 import numpy as np
-from typing import List, Optional
-from sklearn.impute import SimpleImputer
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
 
 
 def filter_by_age(df: pd.DataFrame, min_age: int = 18, max_age: int = 80,
@@ -45,7 +46,7 @@ def filter_by_age(df: pd.DataFrame, min_age: int = 18, max_age: int = 80,
 
 def handle_missing_values(df: pd.DataFrame,
                           missing_threshold: float = 0.5,
-                          strategy: str = 'median',
+                          strategy: Optional[str] = 'median',
                           numeric_only: bool = True) -> pd.DataFrame:
     """
     Handle missing values in the dataset.
@@ -57,7 +58,8 @@ def handle_missing_values(df: pd.DataFrame,
     Args:
         df: Input DataFrame.
         missing_threshold: Drop columns with missing rate above this threshold (0-1).
-        strategy: Imputation strategy ('mean', 'median', 'most_frequent').
+        strategy: Imputation strategy ('mean', 'median', 'most_frequent'), or
+                 None to skip imputation for NaN-native models.
         numeric_only: If True, only process numeric columns.
 
     Returns:
@@ -67,6 +69,8 @@ def handle_missing_values(df: pd.DataFrame,
         >>> df = pd.DataFrame({'A': [1, 2, np.nan], 'B': [np.nan, np.nan, np.nan]})
         >>> clean = handle_missing_values(df, missing_threshold=0.5)
     """
+    from sklearn.impute import SimpleImputer
+
     df_clean = df.copy()
     initial_shape = df_clean.shape
 
@@ -82,12 +86,16 @@ def handle_missing_values(df: pd.DataFrame,
         df_clean = df_clean.drop(columns=cols_to_drop)
 
     # Impute remaining missing values in numeric columns
-    if numeric_only:
+    if numeric_only and strategy is not None:
         numeric_cols = df_clean.select_dtypes(include=[np.number]).columns
         imputer = SimpleImputer(strategy=strategy)
 
         if len(numeric_cols) > 0:
-            df_clean[numeric_cols] = imputer.fit_transform(df_clean[numeric_cols])
+            # Keep compacted dtypes (e.g. float32 from compact_dtypes) after imputation
+            dtypes = df_clean[numeric_cols].dtypes
+            imputed = pd.DataFrame(imputer.fit_transform(df_clean[numeric_cols]),
+                                   columns=numeric_cols, index=df_clean.index)
+            df_clean[numeric_cols] = imputed.astype(dtypes)
             print(f"Imputed missing values in {len(numeric_cols)} numeric columns using '{strategy}' strategy")
 
     final_shape = df_clean.shape
@@ -142,6 +150,135 @@ def encode_categorical_variables(df: pd.DataFrame,
     return df_encoded
 
 
+class OutlierBounds:
+    """
+    Per-column outlier bounds fitted once on a reference population.
+
+    All column bounds are computed in a single vectorized quantile (or
+    mean/std) call. The fitted bounds can then be reused to drop, flag or
+    clip new rows without recomputing population statistics. Missing
+    values are never treated as outliers.
+
+    Args:
+        method: Method to use ('iqr' or 'zscore').
+        threshold: IQR multiplier or z-score threshold.
+
+    Example:
+        >>> bounds = OutlierBounds(method='iqr', threshold=3.0).fit(train_df, columns)
+        >>> clean = train_df[~bounds.outlier_mask(train_df)]
+        >>> new_df = bounds.clip(new_df)
+    """
+
+    def __init__(self, method: str = 'iqr', threshold: float = 3.0):
+        if method not in ('iqr', 'zscore'):
+            raise ValueError(f"Unknown method: {method}. Use 'iqr' or 'zscore'.")
+        self.method = method
+        self.threshold = threshold
+        self.columns: List[str] = []
+        self.lower_: np.ndarray = np.empty(0)
+        self.upper_: np.ndarray = np.empty(0)
+
+    def fit(self, df: pd.DataFrame, columns: List[str]) -> "OutlierBounds":
+        """
+        Fit bounds for the given columns.
+
+        Args:
+            df: Reference DataFrame.
+            columns: Columns to fit bounds for. Missing columns are skipped
+                    with a warning.
+
+        Returns:
+            self
+        """
+        for col in columns:
+            if col not in df.columns:
+                print(f"Warning: Column '{col}' not found, skipping")
+        self.columns = [col for col in columns if col in df.columns]
+
+        values = df[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        if self.method == 'iqr':
+            q1, q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+            spread = self.threshold * (q3 - q1)
+            self.lower_, self.upper_ = q1 - spread, q3 + spread
+        else:
+            mean = np.nanmean(values, axis=0)
+            spread = self.threshold * np.nanstd(values, axis=0, ddof=1)
+            self.lower_, self.upper_ = mean - spread, mean + spread
+
+        return self
+
+    def _values(self, X) -> np.ndarray:
+        """Bounded columns of X as a float64 array."""
+        if isinstance(X, pd.DataFrame):
+            return X[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        X = np.asarray(X, dtype=np.float64)
+        if X.shape[1] != len(self.columns):
+            raise ValueError(f"Expected {len(self.columns)} columns, got {X.shape[1]}")
+        return X
+
+    def flag(self, X) -> np.ndarray:
+        """
+        Flag out-of-bounds values.
+
+        Args:
+            X: DataFrame containing the bounded columns, or an array with
+               the bounded columns in order.
+
+        Returns:
+            Boolean array of shape (n_samples, n_columns).
+        """
+        values = self._values(X)
+        return (values < self.lower_) | (values > self.upper_)
+
+    def outlier_mask(self, X) -> np.ndarray:
+        """
+        Mark rows with at least one out-of-bounds value.
+
+        Args:
+            X: DataFrame or array, as for flag.
+
+        Returns:
+            Boolean array of shape (n_samples,).
+        """
+        return self.flag(X).any(axis=1)
+
+    def clip(self, X):
+        """
+        Clip values to the fitted bounds.
+
+        Args:
+            X: DataFrame or array, as for flag.
+
+        Returns:
+            Copy of X with bounded columns clipped; missing values are kept.
+        """
+        clipped = np.clip(self._values(X), self.lower_, self.upper_)
+        if isinstance(X, pd.DataFrame):
+            X = X.copy()
+            X[self.columns] = clipped
+            return X
+        return clipped
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Fitted bounds as a JSON-serializable dictionary."""
+        return {
+            'method': self.method,
+            'threshold': self.threshold,
+            'columns': self.columns,
+            'lower': self.lower_.tolist(),
+            'upper': self.upper_.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OutlierBounds":
+        """Rebuild fitted bounds from to_dict output."""
+        bounds = cls(method=data['method'], threshold=data['threshold'])
+        bounds.columns = list(data['columns'])
+        bounds.lower_ = np.array(data['lower'], dtype=np.float64)
+        bounds.upper_ = np.array(data['upper'], dtype=np.float64)
+        return bounds
+
+
 def remove_outliers(df: pd.DataFrame,
                    columns: List[str],
                    method: str = 'iqr',
@@ -149,6 +286,9 @@ def remove_outliers(df: pd.DataFrame,
     """
     Remove outliers from specified columns.
 
+    Bounds for all columns are computed on the full input at once, so the
+    result does not depend on column order.
+
     Args:
         df: Input DataFrame.
         columns: List of column names to check for outliers.
@@ -162,39 +302,17 @@ def remove_outliers(df: pd.DataFrame,
         >>> df = pd.DataFrame({'A': [1, 2, 3, 100]})
         >>> clean = remove_outliers(df, columns=['A'], method='iqr')
     """
-    df_clean = df.copy()
-    initial_count = len(df_clean)
-
-    for col in columns:
-        if col not in df_clean.columns:
-            print(f"Warning: Column '{col}' not found, skipping")
-            continue
+    bounds = OutlierBounds(method=method, threshold=threshold).fit(df, columns)
+    flags = bounds.flag(df)
 
-        if method == 'iqr':
-            Q1 = df_clean[col].quantile(0.25)
-            Q3 = df_clean[col].quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - threshold * IQR
-            upper_bound = Q3 + threshold * IQR
-
-            outliers = (df_clean[col] < lower_bound) | (df_clean[col] > upper_bound)
-
-        elif method == 'zscore':
-            z_scores = np.abs((df_clean[col] - df_clean[col].mean()) / df_clean[col].std())
-            outliers = z_scores > threshold
-
-        else:
-            raise ValueError(f"Unknown method: {method}. Use 'iqr' or 'zscore'.")
-
-        n_outliers = outliers.sum()
+    for col, n_outliers in zip(bounds.columns, flags.sum(axis=0)):
         if n_outliers > 0:
-            df_clean = df_clean[~outliers]
-            print(f"Removed {n_outliers} outliers from '{col}'")
+            print(f"Found {n_outliers} outliers in '{col}'")
 
-    final_count = len(df_clean)
-    print(f"\nTotal rows removed: {initial_count - final_count}")
+    outliers = flags.any(axis=1)
+    print(f"\nTotal rows removed: {outliers.sum()}")
 
-    return df_clean
+    return df[~outliers].copy()
 
 
 def standardize_column_names(df: pd.DataFrame) -> pd.DataFrame:
@@ -210,3 +328,296 @@ def standardize_column_names(df: pd.DataFrame) -> pd.DataFrame:
     df_clean = df.copy()
     df_clean.columns = df_clean.columns.str.upper().str.replace(' ', '_')
     return df_clean
+
+
+class PreprocessingPipeline:
+    """
+    Fitted preprocessing for training/inference parity.
+
+    Reproduces the notebook preprocessing (age filter, missing-value
+    handling, column name standardization, one-hot encoding and optional
+    outlier handling) but learns every statistic once in fit. The fitted
+    state (dropped columns, fill values, category vocabularies, outlier
+    bounds) is saved as JSON next to the organ clocks and replayed by
+    transform without re-learning anything.
+
+    Args:
+        age_col: Name of the age column used for filtering.
+        min_age: Minimum age (inclusive).
+        max_age: Maximum age (inclusive).
+        missing_threshold: Drop columns with missing rate above this threshold.
+        strategy: Imputation strategy ('mean', 'median', 'most_frequent'), or
+                 None to keep missing values for NaN-native models.
+        categorical_cols: Columns to one-hot encode (after name standardization).
+        drop_first: If True, drop the first category of each encoded column.
+        outlier_columns: Optional columns to fit outlier bounds for.
+        outlier_method: Outlier method ('iqr' or 'zscore').
+        outlier_threshold: IQR multiplier or z-score threshold.
+        outlier_action: 'drop' removes outlier rows, 'clip' clips values.
+
+    Example:
+        >>> pipeline = PreprocessingPipeline(age_col='RIDAGEYR').fit(merged_df)
+        >>> df_clean = pipeline.transform(merged_df)
+        >>> pipeline.save("models/preprocessing.json")
+    """
+
+    def __init__(self,
+                 age_col: str = 'RIDAGEYR',
+                 min_age: int = 18,
+                 max_age: int = 80,
+                 missing_threshold: float = 0.5,
+                 strategy: Optional[str] = 'median',
+                 categorical_cols: Optional[List[str]] = ('RIAGENDR', 'RIDRETH1'),
+                 drop_first: bool = True,
+                 outlier_columns: Optional[List[str]] = None,
+                 outlier_method: str = 'iqr',
+                 outlier_threshold: float = 3.0,
+                 outlier_action: str = 'drop'):
+        if strategy not in ('mean', 'median', 'most_frequent', None):
+            raise ValueError(f"Unknown imputation strategy: {strategy}")
+        if outlier_action not in ('drop', 'clip'):
+            raise ValueError(f"Unknown outlier action: {outlier_action}. Use 'drop' or 'clip'.")
+
+        self.age_col = age_col
+        self.min_age = min_age
+        self.max_age = max_age
+        self.missing_threshold = missing_threshold
+        self.strategy = strategy
+        self.categorical_cols = list(categorical_cols or [])
+        self.drop_first = drop_first
+        self.outlier_columns = list(outlier_columns) if outlier_columns else None
+        self.outlier_method = outlier_method
+        self.outlier_threshold = outlier_threshold
+        self.outlier_action = outlier_action
+
+        self.dropped_columns_: List[str] = []
+        self.fill_values_: Dict[str, float] = {}
+        self.categories_: Dict[str, List[Any]] = {}
+        self.outlier_bounds_: Optional[OutlierBounds] = None
+        self.output_columns_: List[str] = []
+
+    @staticmethod
+    def _standardize(name: str) -> str:
+        """Standardized column name, as in standardize_column_names."""
+        return str(name).upper().replace(' ', '_')
+
+    def _dummy_columns(self, col: str) -> List[str]:
+        """Dummy column names produced for one categorical column."""
+        categories = self.categories_[col][1 if self.drop_first else 0:]
+        return [f"{col}_{value}" for value in categories]
+
+    def _fill_value(self, values: np.ndarray) -> float:
+        """Imputation value for one numeric column."""
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return np.nan
+        if self.strategy == 'mean':
+            return float(values.mean())
+        if self.strategy == 'median':
+            return float(np.median(values))
+        uniques, counts = np.unique(values, return_counts=True)
+        return float(uniques[np.argmax(counts)])
+
+    def fit(self, df: pd.DataFrame) -> "PreprocessingPipeline":
+        """
+        Learn dropped columns, fill values, categories and outlier bounds.
+
+        Args:
+            df: Raw merged DataFrame.
+
+        Returns:
+            self
+        """
+        df = self._filter_age(df)
+
+        missing_rates = df.isnull().mean()
+        self.dropped_columns_ = missing_rates[missing_rates > self.missing_threshold].index.tolist()
+        kept = df.drop(columns=self.dropped_columns_)
+
+        numeric_cols = kept.select_dtypes(include=[np.number]).columns if self.strategy else []
+        self.fill_values_ = {
+            col: self._fill_value(kept[col].to_numpy(dtype=np.float64, na_value=np.nan))
+            for col in numeric_cols
+        }
+        kept = kept.fillna(self.fill_values_).rename(columns=self._standardize)
+
+        self.categories_ = {
+            col: sorted(kept[col].dropna().unique().tolist())
+            for col in self.categorical_cols if col in kept.columns
+        }
+
+        encoded = self._encode(kept)
+        if self.outlier_columns:
+            self.outlier_bounds_ = OutlierBounds(self.outlier_method, self.outlier_threshold)
+            self.outlier_bounds_.fit(encoded, [self._standardize(c) for c in self.outlier_columns])
+        self.output_columns_ = encoded.columns.tolist()
+
+        print(f"Preprocessing fitted: {len(self.dropped_columns_)} columns dropped, "
+              f"{len(self.fill_values_)} imputed, {len(self.categories_)} encoded")
+
+        return self
+
+    def _filter_age(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Keep rows inside the age range when the age column is present."""
+        if self.age_col not in df.columns:
+            return df
+        age = df[self.age_col]
+        return df[(age >= self.min_age) & (age <= self.max_age)]
+
+    def _encode(self, df: pd.DataFrame) -> pd.DataFrame:
+        """One-hot encode with the fitted vocabularies, like pd.get_dummies."""
+        dummies = {}
+        for col in self.categories_:
+            if col not in df.columns:
+                continue
+            values = df[col].to_numpy()
+            for value, name in zip(self.categories_[col][1 if self.drop_first else 0:],
+                                   self._dummy_columns(col)):
+                dummies[name] = (values == value).astype(int)
+        encoded = df.drop(columns=[col for col in self.categories_ if col in df.columns])
+        return pd.concat([encoded, pd.DataFrame(dummies, index=df.index)], axis=1)
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Apply the fitted preprocessing to a DataFrame.
+
+        Args:
+            df: Raw DataFrame with the same columns as the fitted data.
+
+        Returns:
+            Preprocessed DataFrame. Rows outside the age range, and outlier
+            rows when outlier_action is 'drop', are removed.
+        """
+        df = self._filter_age(df)
+        df = df.drop(columns=[col for col in self.dropped_columns_ if col in df.columns])
+        df = df.fillna({col: value for col, value in self.fill_values_.items() if col in df.columns})
+        df = self._encode(df.rename(columns=self._standardize))
+
+        if self.outlier_bounds_ is not None:
+            if self.outlier_action == 'drop':
+                df = df[~self.outlier_bounds_.outlier_mask(df)]
+            else:
+                df = self.outlier_bounds_.clip(df)
+
+        return df
+
+    def transform_columns(self,
+                          columns: Mapping[str, np.ndarray],
+                          n_rows: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Apply the fitted preprocessing to column arrays, without pandas.
+
+        This is the per-request path used by the scoring service. Rows are
+        never removed: missing values are filled, dummy columns are added
+        and, when outlier bounds are fitted, values are clipped. Original
+        categorical columns are kept alongside their dummies so derived
+        features can still read the raw codes.
+
+        Args:
+            columns: Mapping from raw column names to float arrays.
+            n_rows: Number of rows. When given, fitted columns absent from
+                   columns are added filled with their imputation value.
+
+        Returns:
+            Dictionary of preprocessed float64 column arrays.
+        """
+        if n_rows is not None:
+            columns = dict(columns)
+            for name, fill in self.fill_values_.items():
+                if name not in columns:
+                    columns[name] = np.full(n_rows, fill)
+
+        result = {}
+        for name, values in columns.items():
+            if name in self.dropped_columns_:
+                continue
+            values = np.asarray(values, dtype=np.float64)
+            fill = self.fill_values_.get(name)
+            if fill is not None and not np.isnan(fill):
+                values = np.where(np.isnan(values), fill, values)
+            result[self._standardize(name)] = values
+
+        for col in self.categories_:
+            if col in result:
+                for value, name in zip(self.categories_[col][1 if self.drop_first else 0:],
+                                       self._dummy_columns(col)):
+                    result[name] = (result[col] == value).astype(np.float64)
+
+        if self.outlier_bounds_ is not None:
+            bounds = self.outlier_bounds_
+            for j, name in enumerate(bounds.columns):
+                if name in result:
+                    result[name] = np.clip(result[name], bounds.lower_[j], bounds.upper_[j])
+
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Fitted pipeline as a JSON-serializable dictionary."""
+        return {
+            'params': {
+                'age_col': self.age_col,
+                'min_age': self.min_age,
+                'max_age': self.max_age,
+                'missing_threshold': self.missing_threshold,
+                'strategy': self.strategy,
+                'categorical_cols': self.categorical_cols,
+                'drop_first': self.drop_first,
+                'outlier_columns': self.outlier_columns,
+                'outlier_method': self.outlier_method,
+                'outlier_threshold': self.outlier_threshold,
+                'outlier_action': self.outlier_action,
+            },
+            'dropped_columns': self.dropped_columns_,
+            'fill_values': {
+                col: None if np.isnan(value) else value
+                for col, value in self.fill_values_.items()
+            },
+            'categories': self.categories_,
+            'outlier_bounds': self.outlier_bounds_.to_dict() if self.outlier_bounds_ else None,
+            'output_columns': self.output_columns_,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PreprocessingPipeline":
+        """Rebuild a fitted pipeline from to_dict output."""
+        pipeline = cls(**data['params'])
+        pipeline.dropped_columns_ = list(data['dropped_columns'])
+        pipeline.fill_values_ = {
+            col: np.nan if value is None else value
+            for col, value in data['fill_values'].items()
+        }
+        pipeline.categories_ = {col: list(values) for col, values in data['categories'].items()}
+        if data.get('outlier_bounds'):
+            pipeline.outlier_bounds_ = OutlierBounds.from_dict(data['outlier_bounds'])
+        pipeline.output_columns_ = list(data.get('output_columns', []))
+        return pipeline
+
+    def save(self, filepath: str) -> None:
+        """
+        Save the fitted pipeline as JSON.
+
+        Args:
+            filepath: Destination path, e.g. 'models/preprocessing.json'.
+        """
+        filepath = Path(filepath)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        with open(filepath, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        print(f"Preprocessing pipeline saved to {filepath}")
+
+    @classmethod
+    def load(cls, filepath: str) -> "PreprocessingPipeline":
+        """
+        Load a pipeline saved with save().
+
+        Args:
+            filepath: Path to the JSON file.
+
+        Returns:
+            Fitted PreprocessingPipeline.
+        """
+        filepath = Path(filepath)
+        if not filepath.exists():
+            raise FileNotFoundError(f"Preprocessing file not found: {filepath}")
+        with open(filepath, 'r') as f:
+            return cls.from_dict(json.load(f))
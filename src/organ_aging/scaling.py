@@ -0,0 +1,387 @@
+"""
+Mergeable streaming feature scaling.
+
+features.scale_features fits a scikit-learn scaler on a fully materialized
+training matrix. StreamingScaler fits the same parameters from chunks:
+per-column counts, means and squared deviations are combined with the
+Welford/Chan update for the standard variant, and per-column
+QuantileSketch objects track medians and quartiles for the robust
+variant. Scalers fitted on separate chunks (e.g. by parallel workers)
+merge into one. Transforms run in place on float32 arrays, and a fitted
+scaler can be folded into the coefficients of a linear clock so that
+inference needs no separate scaling pass.
+"""
+
+from typing import Any, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch for one column (KLL-style compactors).
+
+    Values are buffered at level 0. When a level holds more than k items
+    it is sorted and every other item (random offset) moves up one level,
+    where each item stands for twice as many values. Quantiles are exact
+    while fewer than k values have been seen; afterwards the rank error
+    shrinks as k grows, using O(k log n) memory.
+
+    Args:
+        k: Items kept per level before compaction.
+        random_state: Seed for the compaction offsets.
+
+    Example:
+        >>> sketch = QuantileSketch()
+        >>> for chunk in chunks:
+        ...     sketch.update(chunk)
+        >>> q25, q75 = sketch.quantile([0.25, 0.75])
+    """
+
+    def __init__(self, k: int = 4096, random_state: int = 0):
+        if k < 2:
+            raise ValueError(f"k must be at least 2, got {k}")
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(random_state)
+
+    def update(self, values: np.ndarray) -> "QuantileSketch":
+        """Add values, ignoring NaN."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compact()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Merge another sketch into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compact()
+        return self
+
+    def _compact(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.k:
+                items = np.sort(items)
+                # An odd item out stays at this level with its weight
+                n_even = len(items) - len(items) % 2
+                self.levels[level] = items[n_even:]
+                items = items[:n_even]
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def quantile(self, q: Any) -> np.ndarray:
+        """
+        Estimate quantiles.
+
+        Args:
+            q: Quantile or sequence of quantiles in [0, 1].
+
+        Returns:
+            Quantile estimates (NaN if no values were seen). Exact, with
+            linear interpolation like np.quantile, until compaction starts.
+        """
+        q = np.asarray(q, dtype=np.float64)
+        if self.n == 0:
+            return np.full(q.shape, np.nan)
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], q)
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_), 2.0 ** level)
+                                  for level, items_ in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, weights = items[order], weights[order]
+        # Midpoint ranks of each weighted item, normalised to [0, 1]
+        ranks = (np.cumsum(weights) - weights / 2) / weights.sum()
+        return np.interp(q, ranks, items)
+
+
+class StreamingScaler:
+    """
+    Standard or robust feature scaler fitted from chunks and mergeable.
+
+    The fitted attributes mirror scikit-learn: 'standard' sets mean_,
+    var_ and scale_ like StandardScaler, 'robust' sets center_ (median)
+    and scale_ (interquartile range) like RobustScaler. Missing values
+    are ignored when fitting and stay missing when transforming. Zero
+    scales are replaced by 1.
+
+    Args:
+        method: 'standard' or 'robust'.
+        quantile_range: Quantile range in percent for the robust scale.
+        sketch_size: Items per compactor level of the robust quantile sketches.
+        random_state: Seed for the quantile sketches.
+
+    Example:
+        >>> scaler = StreamingScaler('standard')
+        >>> for chunk in chunks:
+        ...     scaler.partial_fit(chunk)
+        >>> X = scaler.transform(X.astype(np.float32))  # in place
+    """
+
+    def __init__(self,
+                 method: str = 'standard',
+                 quantile_range: Tuple[float, float] = (25.0, 75.0),
+                 sketch_size: int = 4096,
+                 random_state: int = 0):
+        if method not in ('standard', 'robust'):
+            raise ValueError(f"Unknown scaling method: {method}. Use 'standard' or 'robust'.")
+        self.method = method
+        self.quantile_range = quantile_range
+        self.sketch_size = sketch_size
+        self.random_state = random_state
+
+        self.feature_names_in_: Optional[np.ndarray] = None
+        self.n_samples_seen_: Optional[np.ndarray] = None
+        self._mean: Optional[np.ndarray] = None
+        self._m2: Optional[np.ndarray] = None
+        self._sketches = None
+
+    def _start(self, n_features: int, feature_names: Optional[Sequence[str]]) -> None:
+        self.n_samples_seen_ = np.zeros(n_features, dtype=np.int64)
+        self._mean = np.zeros(n_features)
+        self._m2 = np.zeros(n_features)
+        if self.method == 'robust':
+            self._sketches = [QuantileSketch(self.sketch_size, self.random_state + j)
+                              for j in range(n_features)]
+        if feature_names is not None:
+            self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+
+    def _combine(self, n_b: np.ndarray, mean_b: np.ndarray, m2_b: np.ndarray) -> None:
+        """Chan et al. parallel update of per-column counts, means and M2."""
+        n_a = self.n_samples_seen_
+        n = n_a + n_b
+        safe_n = np.maximum(n, 1)
+        delta = mean_b - self._mean
+        self._mean = self._mean + delta * n_b / safe_n
+        self._m2 = self._m2 + m2_b + delta ** 2 * n_a * n_b / safe_n
+        self.n_samples_seen_ = n
+
+    def partial_fit(self, X: Any) -> "StreamingScaler":
+        """
+        Update the scaler with one chunk of rows.
+
+        Args:
+            X: Array, DataFrame or store.OrganView of shape (n_samples, n_features).
+
+        Returns:
+            self
+        """
+        names = getattr(X, 'columns', None)
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2:
+            raise ValueError(f"Expected a 2-D array, got shape {X.shape}")
+
+        if self.n_samples_seen_ is None:
+            self._start(X.shape[1], names)
+        elif X.shape[1] != len(self.n_samples_seen_):
+            raise ValueError(f"Expected {len(self.n_samples_seen_)} features, got {X.shape[1]}")
+
+        observed = ~np.isnan(X)
+        n_b = observed.sum(axis=0)
+        mean_b = np.where(observed, X, 0).sum(axis=0) / np.maximum(n_b, 1)
+        m2_b = np.where(observed, (X - mean_b) ** 2, 0).sum(axis=0)
+        self._combine(n_b, mean_b, m2_b)
+
+        if self._sketches is not None:
+            for j, sketch in enumerate(self._sketches):
+                sketch.update(X[:, j])
+
+        return self
+
+    def fit(self, X: Any, chunk_size: int = 65536) -> "StreamingScaler":
+        """
+        Fit from a matrix, reading it chunk by chunk.
+
+        An OrganView is gathered one chunk of rows at a time, so the full
+        training matrix is never materialized.
+
+        Args:
+            X: Array, DataFrame or store.OrganView.
+            chunk_size: Rows per chunk.
+
+        Returns:
+            self
+        """
+        self.n_samples_seen_ = None
+        for start in range(0, len(X), chunk_size):
+            rows = np.arange(start, min(start + chunk_size, len(X)))
+            if isinstance(X, pd.DataFrame):
+                chunk = X.iloc[rows]
+            elif hasattr(X, 'take') and hasattr(X, 'store'):
+                chunk = X.take(rows)
+            else:
+                chunk = np.asarray(X)[rows]
+            self.partial_fit(chunk)
+        return self
+
+    def fit_chunks(self, chunks: Iterable[Any]) -> "StreamingScaler":
+        """Fit from an iterable of chunks, e.g. data_loading.iter_merged_chunks."""
+        self.n_samples_seen_ = None
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def merge(self, other: "StreamingScaler") -> "StreamingScaler":
+        """
+        Merge a scaler fitted on other rows of the same features into this one.
+
+        Args:
+            other: StreamingScaler with the same method and features.
+
+        Returns:
+            self
+        """
+        if other.method != self.method:
+            raise ValueError("Cannot merge scalers with different methods")
+        if other.n_samples_seen_ is None:
+            return self
+        if self.n_samples_seen_ is None:
+            self._start(len(other.n_samples_seen_), other.feature_names_in_)
+        elif len(other.n_samples_seen_) != len(self.n_samples_seen_):
+            raise ValueError("Cannot merge scalers fitted on different numbers of features")
+
+        self._combine(other.n_samples_seen_, other._mean, other._m2)
+        if self._sketches is not None:
+            for sketch, other_sketch in zip(self._sketches, other._sketches):
+                sketch.merge(other_sketch)
+        return self
+
+    def _check_fitted(self) -> None:
+        if self.n_samples_seen_ is None:
+            raise ValueError("StreamingScaler is not fitted yet")
+
+    def _check_standard(self, name: str) -> None:
+        # AttributeError keeps getattr(scaler, 'mean_', None) working as for RobustScaler
+        if self.method != 'standard':
+            raise AttributeError(f"{name} is only available for the standard method")
+        self._check_fitted()
+
+    @property
+    def mean_(self) -> np.ndarray:
+        self._check_standard('mean_')
+        return np.where(self.n_samples_seen_ > 0, self._mean, np.nan)
+
+    @property
+    def var_(self) -> np.ndarray:
+        self._check_standard('var_')
+        return np.where(self.n_samples_seen_ > 0,
+                        self._m2 / np.maximum(self.n_samples_seen_, 1), np.nan)
+
+    @property
+    def center_(self) -> np.ndarray:
+        """Per-feature centering values: the mean or the median."""
+        if self.method == 'standard':
+            return self.mean_
+        self._check_fitted()
+        return np.array([sketch.quantile(0.5) for sketch in self._sketches])
+
+    @property
+    def scale_(self) -> np.ndarray:
+        """Per-feature scaling values: the standard deviation or the IQR."""
+        if self.method == 'standard':
+            scale = np.sqrt(self.var_)
+        else:
+            self._check_fitted()
+            q = np.asarray(self.quantile_range) / 100
+            bounds = np.array([sketch.quantile(q) for sketch in self._sketches])
+            scale = bounds[:, 1] - bounds[:, 0]
+        return np.where(scale == 0, 1.0, scale)
+
+    def transform(self, X: Any, copy: bool = False) -> Any:
+        """
+        Scale features as (X - center_) / scale_.
+
+        A writable float32 or float64 array is scaled in place unless copy
+        is True. Other inputs are converted to float32 first. DataFrames
+        return a new float32 DataFrame with the same columns and index.
+
+        Args:
+            X: Array, DataFrame or store.OrganView.
+            copy: If True, never modify X.
+
+        Returns:
+            Scaled array (X itself when scaled in place) or DataFrame.
+        """
+        center, scale = self.center_, self.scale_
+
+        if isinstance(X, pd.DataFrame):
+            values = self.transform(X.to_numpy(dtype=np.float32, na_value=np.nan))
+            return pd.DataFrame(values, columns=X.columns, index=X.index)
+
+        in_place = (isinstance(X, np.ndarray) and X.dtype in (np.float32, np.float64)
+                    and X.flags.writeable and not copy)
+        if not in_place:
+            X = np.array(X, dtype=np.float32)
+        if X.shape[1] != len(scale):
+            raise ValueError(f"Expected {len(scale)} features, got {X.shape[1]}")
+
+        X -= center.astype(X.dtype)
+        X /= scale.astype(X.dtype)
+        return X
+
+
+def fold_scaler_into_linear(model: Any, scaler: Any = None) -> Any:
+    """
+    Fold feature scaling into a linear model's coefficients.
+
+    For a model trained on (x - center) / scale, returns a
+    bundle.LinearClock with coef / scale and a shifted intercept, which
+    predicts directly from raw features. Imputation values of NaN-tolerant
+    linear pipelines are mapped back to raw units as well.
+
+    Args:
+        model: Fitted linear model, imputer + linear Pipeline or LinearClock.
+        scaler: Fitted StreamingScaler or scikit-learn scaler, or None.
+
+    Returns:
+        LinearClock predicting from unscaled features.
+
+    Raises:
+        ValueError: If the model is not linear.
+
+    Example:
+        >>> clock = fold_scaler_into_linear(model, scaler)
+        >>> np.allclose(clock.predict(X_raw), model.predict(scaler.transform(X_raw)))
+        True
+    """
+    from .bundle import LinearClock, _model_arrays
+
+    description = _model_arrays(model)
+    if description['kind'] != 'linear':
+        raise ValueError(f"Only linear models can absorb a scaler, got {type(model).__name__}")
+
+    coef = description['arrays']['coef']
+    intercept = description['params']['intercept']
+    impute = description['arrays'].get('impute')
+
+    center = np.zeros(len(coef))
+    scale = np.ones(len(coef))
+    if scaler is not None:
+        fitted_center = getattr(scaler, 'mean_', None)
+        if fitted_center is None:
+            fitted_center = getattr(scaler, 'center_', None)
+        if fitted_center is not None:
+            center = np.asarray(fitted_center, dtype=np.float64)
+        if getattr(scaler, 'scale_', None) is not None:
+            scale = np.asarray(scaler.scale_, dtype=np.float64)
+
+    folded_coef = coef / scale
+    folded_intercept = intercept - folded_coef @ center
+    if impute is not None:
+        impute = impute * scale + center
+
+    return LinearClock(folded_coef, folded_intercept, impute=impute)
@@ -0,0 +1,456 @@
+"""
+Batched multi-organ scoring.
+
+This module loads every organ clock once and scores a cohort for all organs
+in a single pass over one shared feature matrix, instead of re-slicing the
+DataFrame and calling predict once per organ. Cohorts larger than memory
+can be scored chunk by chunk into a Parquet dataset.
+"""
+
+import json
+import warnings
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .models import load_model
+from .store import FeatureStore
+from .trees import FlatTreeEnsemble
+
+
+# Model classes that route missing values natively instead of failing on NaN
+NAN_NATIVE_MODELS = {
+    'HistGradientBoostingRegressor',
+    'LGBMRegressor',
+    'XGBRegressor',
+    'FlatTreeEnsemble',
+}
+
+
+def _handles_missing(model: Any) -> bool:
+    """Whether a model predicts on rows with missing values."""
+    if type(model).__name__ in NAN_NATIVE_MODELS:
+        return True
+    # Linear clocks trained on NaN-bearing data carry their own imputer
+    steps = getattr(model, 'steps', None)
+    if steps and type(steps[0][1]).__name__ == 'SimpleImputer':
+        return True
+    return getattr(model, 'impute', None) is not None
+
+
+class OrganClock:
+    """
+    A single fitted organ clock: model, feature order and scaling parameters.
+
+    Args:
+        organ: Organ name (e.g., 'liver').
+        model: Fitted model with a predict method.
+        features: Ordered list of feature names the model was trained on.
+        center: Per-feature centering values (scaler mean_/center_), or None.
+        scale: Per-feature scaling values (scaler scale_), or None.
+        metadata: Optional metadata saved alongside the model.
+    """
+
+    def __init__(self,
+                 organ: str,
+                 model: Any,
+                 features: List[str],
+                 center: Optional[np.ndarray] = None,
+                 scale: Optional[np.ndarray] = None,
+                 metadata: Optional[Dict] = None):
+        self.organ = organ
+        self.model = model
+        self.features = list(features)
+        self.center = None if center is None else np.asarray(center, dtype=np.float64)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float64)
+        self.metadata = metadata or {}
+        self.handles_missing = _handles_missing(model)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict biological age from an unscaled feature block.
+
+        Args:
+            X: Array of shape (n_samples, len(features)) in raw units.
+               It is scaled in place, so pass a private copy.
+
+        Returns:
+            Predicted ages. Rows with missing values are NaN unless the
+            model handles missing values natively.
+        """
+        if self.center is not None:
+            X -= self.center
+        if self.scale is not None:
+            X /= self.scale
+
+        if self.handles_missing:
+            valid = None
+        else:
+            valid = ~np.isnan(X).any(axis=1)
+            if valid.all():
+                valid = None
+
+        pred = np.full(X.shape[0], np.nan)
+        with warnings.catch_warnings():
+            # Models fitted on DataFrames warn about missing feature names
+            warnings.simplefilter("ignore")
+            if valid is None:
+                pred[:] = self.model.predict(X)
+            elif valid.any():
+                pred[valid] = self.model.predict(X[valid])
+
+        return pred
+
+
+def _scaler_params(scaler: Any):
+    """Extract (center, scale) arrays from a fitted sklearn scaler."""
+    center = getattr(scaler, 'mean_', None)
+    if center is None:
+        center = getattr(scaler, 'center_', None)
+    scale = getattr(scaler, 'scale_', None)
+    return center, scale
+
+
+class OrganClockEnsemble:
+    """
+    All organ clocks loaded once and scored together.
+
+    The ensemble keeps a single ordered list of every feature used by any
+    organ. Scoring builds one contiguous float32 matrix over those features
+    and each organ reads its columns through a precomputed index array.
+
+    Args:
+        clocks: List of OrganClock objects.
+
+    Example:
+        >>> ensemble = OrganClockEnsemble.from_models_dir("models")
+        >>> age_gaps = ensemble.score(df, age_col='RIDAGEYR')
+        >>> print(age_gaps[['liver_age_bio', 'liver_age_gap']].head())
+    """
+
+    def __init__(self, clocks: List[OrganClock]):
+        if not clocks:
+            raise ValueError("No organ clocks provided")
+
+        self.clocks = {clock.organ: clock for clock in clocks}
+
+        # Union of all organ features, preserving first-seen order
+        self.feature_names = list(dict.fromkeys(
+            feature for clock in clocks for feature in clock.features
+        ))
+        position = {name: i for i, name in enumerate(self.feature_names)}
+        self.column_index = {
+            clock.organ: np.array([position[f] for f in clock.features], dtype=np.intp)
+            for clock in clocks
+        }
+
+    @property
+    def organs(self) -> List[str]:
+        """Names of the organs in scoring order."""
+        return list(self.clocks.keys())
+
+    @classmethod
+    def from_models_dir(cls,
+                        models_dir: str = "models",
+                        organs: Optional[List[str]] = None,
+                        compile_trees: bool = False,
+                        fold_scalers: bool = False) -> "OrganClockEnsemble":
+        """
+        Load the best model and scaler for every organ from a models directory.
+
+        The best model per organ is taken from 'best_models_summary.json' when
+        present, otherwise from the first 'best_model_*.pkl' in the organ folder.
+        Scalers are read from 'scalers/<organ>_scaler.pkl' when present.
+
+        Args:
+            models_dir: Directory containing organ model folders.
+            organs: Optional subset of organs to load. Defaults to all organs.
+            compile_trees: If True, replace HistGradientBoosting clocks with
+                          their FlatTreeEnsemble export for faster small-batch
+                          inference.
+            fold_scalers: If True, fold each linear clock's scaler into its
+                         coefficients (scaling.fold_scaler_into_linear), so
+                         those clocks skip the scaling pass.
+
+        Returns:
+            Loaded OrganClockEnsemble.
+
+        Raises:
+            FileNotFoundError: If no model can be found for a requested organ.
+            ValueError: If a model's feature order cannot be determined.
+        """
+        models_dir = Path(models_dir)
+
+        best_files = {}
+        summary_path = models_dir / "best_models_summary.json"
+        if summary_path.exists():
+            with open(summary_path, 'r') as f:
+                summary = json.load(f)
+            best_files = {
+                organ: info['filename']
+                for organ, info in summary.get('best_models', {}).items()
+            }
+
+        if organs is None:
+            organs = list(best_files) or sorted(
+                p.name for p in models_dir.iterdir()
+                if p.is_dir() and any(p.glob("best_model_*.pkl"))
+            )
+
+        clocks = []
+        for organ in organs:
+            if organ in best_files:
+                model_path = models_dir / organ / best_files[organ]
+            else:
+                candidates = sorted((models_dir / organ).glob("best_model_*.pkl"))
+                if not candidates:
+                    raise FileNotFoundError(f"No best model found for {organ}")
+                model_path = candidates[0]
+
+            model, metadata = load_model(str(model_path), return_metadata=True)
+
+            center, scale = None, None
+            scaler = None
+            scaler_path = models_dir / "scalers" / f"{organ}_scaler.pkl"
+            if scaler_path.exists():
+                import joblib
+                scaler = joblib.load(scaler_path)
+                center, scale = _scaler_params(scaler)
+
+            features = metadata.get('features')
+            if not features:
+                for source in (model, scaler):
+                    names = getattr(source, 'feature_names_in_', None)
+                    if names is not None:
+                        features = list(names)
+                        break
+            if not features:
+                raise ValueError(f"Cannot determine feature order for {organ} model")
+
+            if compile_trees and type(model).__name__ == 'HistGradientBoostingRegressor':
+                model = FlatTreeEnsemble.from_hist_gb(model)
+
+            if fold_scalers and (hasattr(model, 'coef_') or hasattr(model, 'steps')):
+                from .scaling import fold_scaler_into_linear
+                model = fold_scaler_into_linear(model, scaler)
+                center, scale = None, None
+
+            clocks.append(OrganClock(organ, model, features, center, scale, metadata))
+
+        print(f"Loaded {len(clocks)} organ clocks: {', '.join(c.organ for c in clocks)}")
+
+        return cls(clocks)
+
+    @classmethod
+    def from_bundle(cls,
+                    bundle_dir: str,
+                    organs: Optional[List[str]] = None,
+                    mmap: bool = True) -> "OrganClockEnsemble":
+        """
+        Load organ clocks from a model bundle written by bundle.save_bundle.
+
+        Args:
+            bundle_dir: Bundle directory containing manifest.json.
+            organs: Optional subset of organs to load. Defaults to all organs.
+            mmap: If True, memory-map the bundle arrays read-only.
+
+        Returns:
+            Loaded OrganClockEnsemble.
+
+        Example:
+            >>> ensemble = OrganClockEnsemble.from_bundle("models/bundle")
+        """
+        from .bundle import load_bundle
+
+        clocks = load_bundle(bundle_dir, organs=organs, mmap=mmap)
+        print(f"Loaded {len(clocks)} organ clocks: {', '.join(c.organ for c in clocks)}")
+
+        return cls(clocks)
+
+    def build_feature_matrix(self, df: Any) -> np.ndarray:
+        """
+        Build the shared float32 feature matrix for all organs.
+
+        Args:
+            df: DataFrame or store.FeatureStore containing every feature in
+               feature_names.
+
+        Returns:
+            C-contiguous float32 array of shape (n_samples, n_features).
+
+        Raises:
+            ValueError: If any required feature column is missing.
+        """
+        columns = df.columns
+        missing = [col for col in self.feature_names if col not in columns]
+        if missing:
+            raise ValueError(f"Missing feature columns for scoring: {missing}")
+
+        X = np.empty((len(df), len(self.feature_names)), dtype=np.float32)
+        for j, col in enumerate(self.feature_names):
+            if isinstance(df, FeatureStore):
+                X[:, j] = df.column(col)
+            else:
+                X[:, j] = df[col].to_numpy(dtype=np.float32, na_value=np.nan)
+
+        return X
+
+    def predict(self, X: np.ndarray, batch_size: int = 65536) -> Dict[str, np.ndarray]:
+        """
+        Predict biological ages for all organs from the shared feature matrix.
+
+        Args:
+            X: Array of shape (n_samples, n_features) ordered as feature_names.
+            batch_size: Rows per block. Bounds the temporary per-organ copies.
+
+        Returns:
+            Dictionary mapping organ names to predicted age arrays.
+        """
+        X = np.asarray(X)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+            raise ValueError(
+                f"Expected feature matrix with {len(self.feature_names)} columns, "
+                f"got shape {X.shape}"
+            )
+
+        n_samples = X.shape[0]
+        predictions = {organ: np.empty(n_samples) for organ in self.clocks}
+
+        for start in range(0, n_samples, batch_size):
+            block = X[start:start + batch_size]
+            for organ, clock in self.clocks.items():
+                # Fancy indexing yields a fresh float64 block we can scale in place
+                X_organ = block[:, self.column_index[organ]].astype(np.float64)
+                predictions[organ][start:start + len(block)] = clock.predict(X_organ)
+
+        return predictions
+
+    def score(self,
+              df: pd.DataFrame,
+              age_col: str = 'AGE',
+              id_col: Optional[str] = 'SEQN',
+              batch_size: int = 65536) -> pd.DataFrame:
+        """
+        Compute biological ages and age gaps for all organs in one pass.
+
+        Args:
+            df: DataFrame or store.FeatureStore containing chronological age
+               and all organ features. A store's index is used as the id column.
+            age_col: Name of the chronological age column.
+            id_col: Optional identifier column copied into the result.
+            batch_size: Rows per scoring block.
+
+        Returns:
+            DataFrame with the id and age columns followed by
+            '<organ>_age_bio' and '<organ>_age_gap' for every organ.
+
+        Example:
+            >>> result = ensemble.score(df, age_col='RIDAGEYR')
+        """
+        if age_col not in df.columns:
+            raise ValueError(f"Age column '{age_col}' not found in DataFrame")
+
+        X = self.build_feature_matrix(df)
+        predictions = self.predict(X, batch_size=batch_size)
+
+        columns = {}
+        if isinstance(df, FeatureStore):
+            age = df.column(age_col).astype(np.float64)
+            index = pd.RangeIndex(len(df))
+            if id_col is not None:
+                columns[id_col] = df.index
+        else:
+            age = df[age_col].to_numpy(dtype=np.float64, na_value=np.nan)
+            index = df.index
+            if id_col is not None and id_col in df.columns:
+                columns[id_col] = df[id_col].to_numpy()
+        columns[age_col] = age
+
+        for organ, pred_ages in predictions.items():
+            columns[f"{organ}_age_bio"] = pred_ages
+            columns[f"{organ}_age_gap"] = pred_ages - age
+
+        return pd.DataFrame(columns, index=index)
+
+
+def score_in_chunks(chunks: Iterable[pd.DataFrame],
+                    ensemble: OrganClockEnsemble,
+                    output_dir: str,
+                    transforms: Optional[List[Callable[[pd.DataFrame], pd.DataFrame]]] = None,
+                    age_col: str = 'AGE',
+                    id_col: Optional[str] = 'SEQN',
+                    explanations_dir: Optional[str] = None) -> int:
+    """
+    Score a cohort chunk by chunk and write age gaps to a Parquet dataset.
+
+    Each chunk is passed through the transforms (preprocessing, feature
+    engineering), scored for all organs and written as its own part file,
+    so peak memory is bounded by the chunk size rather than the cohort size.
+    With explanations_dir, the per-individual attributions of every organ
+    (explanations.explain_cohort) are written alongside, one part file per
+    chunk, ready for explanations.ExplanationStore.load.
+
+    Args:
+        chunks: Iterable of raw DataFrame chunks, e.g. from
+                data_loading.iter_merged_chunks or iter_table_chunks.
+        ensemble: Loaded OrganClockEnsemble.
+        output_dir: Directory for the Parquet dataset. Existing part files
+                   in it are replaced.
+        transforms: Optional list of functions applied to each chunk in order.
+                   They must be row-local (no statistics fitted on the chunk).
+        age_col: Name of the chronological age column.
+        id_col: Optional identifier column copied into the output.
+        explanations_dir: Optional directory for the explanation dataset.
+                         Requires id_col. Existing part files in it are replaced.
+
+    Returns:
+        Total number of rows written.
+
+    Example:
+        >>> chunks = data_loading.iter_merged_chunks(paths_config, chunksize=50000)
+        >>> n = score_in_chunks(chunks, ensemble, "data/processed/age_gaps",
+        ...                     transforms=[add_engineered_features], age_col='RIDAGEYR')
+        >>> age_gaps = pd.read_parquet("data/processed/age_gaps")
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if explanations_dir is not None:
+        from .explanations import explain_cohort
+        if id_col is None:
+            raise ValueError("explanations_dir requires an id_col to key explanations by")
+
+    output_dirs = [Path(output_dir)] + ([Path(explanations_dir)] if explanations_dir else [])
+    for directory in output_dirs:
+        directory.mkdir(parents=True, exist_ok=True)
+        for old_part in directory.glob("part-*.parquet"):
+            old_part.unlink()
+    output_dir = output_dirs[0]
+
+    n_rows = 0
+    n_parts = 0
+
+    for chunk in chunks:
+        for transform in transforms or []:
+            chunk = transform(chunk)
+
+        if len(chunk) == 0:
+            continue
+
+        result = ensemble.score(chunk, age_col=age_col, id_col=id_col)
+        table = pa.Table.from_pandas(result, preserve_index=False)
+        pq.write_table(table, output_dir / f"part-{n_parts:05d}.parquet")
+
+        if explanations_dir is not None:
+            explanations = explain_cohort(ensemble, chunk, id_col=id_col)
+            pq.write_table(pa.Table.from_pandas(explanations, preserve_index=False),
+                           Path(explanations_dir) / f"part-{n_parts:05d}.parquet")
+
+        n_rows += len(result)
+        n_parts += 1
+
+    print(f"Scored {n_rows} rows in {n_parts} chunks → {output_dir}")
+
+    return n_rows
@@ -0,0 +1,322 @@
+"""
+HTTP scoring service for organ clocks.
+
+This module keeps every organ clock resident in memory and scores raw lab
+panels on request. The request path works on plain dicts and NumPy arrays
+(no pandas): raw biomarkers are turned into the engineered features, scaled
+with the saved scaler parameters and passed to each organ clock.
+
+Endpoints:
+    GET  /health       -> {"status": "ok", "organs": [...]}
+    GET  /explanations/<SEQN>?k=5 -> top-k drivers per organ, when the
+                                     service has a precomputed ExplanationStore
+    POST /score        -> one person's biomarkers as a JSON object
+    POST /score/batch  -> {"records": [...]} with up to max_batch_size people
+
+Run with:
+    python -m organ_aging.serving --models-dir models --port 8080
+    python -m organ_aging.serving --bundle-dir models/bundle --port 8080
+    python -m organ_aging.serving --explanations data/processed/explanations --port 8080
+"""
+
+import argparse
+import json
+import math
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from .explanations import ExplanationStore
+from .features import compute_engineered_features
+from .preprocessing import PreprocessingPipeline
+from .scoring import OrganClockEnsemble
+
+
+# Dummy-encoded covariates follow pandas naming, e.g. 'RIAGENDR_2.0'
+_DUMMY_PATTERN = re.compile(r'^(?P<base>.+)_(?P<value>-?\d+(?:\.\d+)?)$')
+
+
+class ScoringService:
+    """
+    Score raw biomarker records against a resident OrganClockEnsemble.
+
+    Args:
+        ensemble: Loaded OrganClockEnsemble.
+        max_batch_size: Maximum number of records accepted per batch.
+        age_keys: Record keys searched, in order, for chronological age.
+        pipeline: Optional fitted PreprocessingPipeline applied to every
+                 record before feature engineering.
+        explanations: Optional precomputed ExplanationStore served by
+                     GET /explanations/<id>.
+
+    Example:
+        >>> service = ScoringService(OrganClockEnsemble.from_models_dir("models"))
+        >>> service.score_records([{'RIDAGEYR': 52, 'RIAGENDR': 2, 'LBXSATSI': 21, ...}])
+    """
+
+    def __init__(self,
+                 ensemble: OrganClockEnsemble,
+                 max_batch_size: int = 10000,
+                 age_keys: Tuple[str, ...] = ('RIDAGEYR', 'AGE'),
+                 pipeline: Optional[PreprocessingPipeline] = None,
+                 explanations: Optional[ExplanationStore] = None):
+        self.ensemble = ensemble
+        self.max_batch_size = max_batch_size
+        self.age_keys = age_keys
+        self.pipeline = pipeline
+        self.explanations = explanations
+
+    def _columns_from_records(self, records: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Transpose records into float64 column arrays, missing values as NaN."""
+        keys = dict.fromkeys(key for record in records for key in record)
+        columns = {}
+        for key in keys:
+            values = [record.get(key) for record in records]
+            try:
+                columns[key] = np.array(
+                    [np.nan if value is None else value for value in values],
+                    dtype=np.float64
+                )
+            except (TypeError, ValueError):
+                raise ValueError(f"Non-numeric value for '{key}'")
+        return columns
+
+    def build_feature_matrix(self, records: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Build the ensemble's float32 feature matrix from raw records.
+
+        Args:
+            records: List of dicts mapping NHANES variable names to values.
+
+        Returns:
+            Tuple of (feature matrix, chronological age array).
+        """
+        raw_columns = self._columns_from_records(records)
+        columns = raw_columns
+        if self.pipeline is not None:
+            columns = self.pipeline.transform_columns(raw_columns, n_rows=len(records))
+        columns.update({
+            name: values
+            for name, values in compute_engineered_features(
+                columns, features=self.ensemble.feature_names
+            ).items()
+            if name not in columns
+        })
+
+        n_records = len(records)
+        X = np.full((n_records, len(self.ensemble.feature_names)), np.nan, dtype=np.float32)
+
+        for j, name in enumerate(self.ensemble.feature_names):
+            if name in columns:
+                X[:, j] = columns[name]
+                continue
+
+            match = _DUMMY_PATTERN.match(name)
+            if match and match.group('base') in columns:
+                base = columns[match.group('base')]
+                X[:, j] = np.where(np.isnan(base), np.nan, base == float(match.group('value')))
+
+        age = np.full(n_records, np.nan)
+        # Chronological age is read before imputation so a missing age
+        # yields a missing age gap rather than one against the median age
+        for key in self.age_keys:
+            if key in raw_columns:
+                age = raw_columns[key]
+                break
+
+        return X, age
+
+    def score_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Score a list of raw biomarker records for all organs.
+
+        Args:
+            records: List of dicts mapping NHANES variable names to values.
+
+        Returns:
+            One result per record: {"organs": {organ: {"age_bio", "age_gap"}}},
+            plus "SEQN" when the record carries one. Values that cannot be
+            computed are None.
+
+        Raises:
+            ValueError: If the batch is empty, too large, or malformed.
+        """
+        if not records:
+            raise ValueError("No records provided")
+        if len(records) > self.max_batch_size:
+            raise ValueError(f"Batch of {len(records)} exceeds limit of {self.max_batch_size}")
+        if not all(isinstance(record, dict) for record in records):
+            raise ValueError("Each record must be a JSON object")
+
+        X, age = self.build_feature_matrix(records)
+        predictions = self.ensemble.predict(X)
+
+        def clean(value):
+            value = float(value)
+            return None if math.isnan(value) else value
+
+        results = []
+        for i, record in enumerate(records):
+            organs = {
+                organ: {
+                    'age_bio': clean(pred[i]),
+                    'age_gap': clean(pred[i] - age[i]),
+                }
+                for organ, pred in predictions.items()
+            }
+            result = {'organs': organs}
+            if 'SEQN' in record:
+                result['SEQN'] = record['SEQN']
+            results.append(result)
+
+        return results
+
+
+def make_handler(service: ScoringService):
+    """
+    Create a request handler class bound to a scoring service.
+
+    Args:
+        service: ScoringService shared by all request threads.
+
+    Returns:
+        BaseHTTPRequestHandler subclass.
+    """
+    class ScoringHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send_json(self, status: int, payload: Any) -> None:
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self) -> Any:
+            length = int(self.headers.get('Content-Length', 0))
+            return json.loads(self.rfile.read(length) or b'null')
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path == '/health':
+                self._send_json(200, {'status': 'ok', 'organs': service.ensemble.organs})
+            elif url.path.startswith('/explanations/') and service.explanations is not None:
+                person_id = url.path[len('/explanations/'):]
+                if person_id.lstrip('-').isdigit():
+                    person_id = int(person_id)
+                try:
+                    k = int(parse_qs(url.query).get('k', ['5'])[0])
+                    drivers = service.explanations.top_drivers(person_id, k=k)
+                except ValueError:
+                    self._send_json(400, {'error': 'k must be an integer'})
+                    return
+                except KeyError as e:
+                    self._send_json(404, {'error': e.args[0]})
+                    return
+                self._send_json(200, {'id': person_id, 'drivers': {
+                    organ: [{'feature': feature, 'contribution': value} for feature, value in pairs]
+                    for organ, pairs in drivers.items()
+                }})
+            else:
+                self._send_json(404, {'error': f"Unknown path: {self.path}"})
+
+        def do_POST(self):
+            try:
+                payload = self._read_json()
+            except ValueError:
+                self._send_json(400, {'error': 'Request body is not valid JSON'})
+                return
+
+            try:
+                if self.path == '/score':
+                    if not isinstance(payload, dict):
+                        raise ValueError("Expected a JSON object of biomarkers")
+                    self._send_json(200, service.score_records([payload])[0])
+
+                elif self.path == '/score/batch':
+                    records = payload.get('records') if isinstance(payload, dict) else None
+                    if not isinstance(records, list):
+                        raise ValueError("Expected {\"records\": [...]}")
+                    if len(records) > service.max_batch_size:
+                        self._send_json(413, {
+                            'error': f"Batch of {len(records)} exceeds limit of {service.max_batch_size}"
+                        })
+                        return
+                    self._send_json(200, {'results': service.score_records(records)})
+
+                else:
+                    self._send_json(404, {'error': f"Unknown path: {self.path}"})
+
+            except ValueError as e:
+                self._send_json(400, {'error': str(e)})
+
+        def log_message(self, format, *args):
+            # Keep the per-request path free of stderr writes
+            pass
+
+    return ScoringHandler
+
+
+def create_server(service: ScoringService,
+                  host: str = '127.0.0.1',
+                  port: int = 8080) -> ThreadingHTTPServer:
+    """
+    Create (but do not start) a threaded HTTP server for a scoring service.
+
+    The ensemble is warmed up with one dummy request so the first real
+    request does not pay lazy initialisation costs.
+
+    Args:
+        service: ScoringService to expose.
+        host: Interface to bind.
+        port: Port to bind (0 picks a free port).
+
+    Returns:
+        ThreadingHTTPServer; call serve_forever() to start it.
+    """
+    service.score_records([{}])
+    return ThreadingHTTPServer((host, port), make_handler(service))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point for the scoring service."""
+    parser = argparse.ArgumentParser(description="Serve organ clock scoring over HTTP")
+    parser.add_argument('--models-dir', default='models', help="Directory with organ models")
+    parser.add_argument('--bundle-dir', default=None,
+                        help="Model bundle directory (used instead of --models-dir)")
+    parser.add_argument('--preprocessing', default=None,
+                        help="Fitted preprocessing pipeline JSON (e.g. models/preprocessing.json)")
+    parser.add_argument('--explanations', default=None,
+                        help="Precomputed explanations Parquet file or dataset directory")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to bind")
+    parser.add_argument('--port', type=int, default=8080, help="Port to bind")
+    parser.add_argument('--max-batch-size', type=int, default=10000,
+                        help="Maximum records per batch request")
+    args = parser.parse_args(argv)
+
+    if args.bundle_dir:
+        ensemble = OrganClockEnsemble.from_bundle(args.bundle_dir)
+    else:
+        ensemble = OrganClockEnsemble.from_models_dir(args.models_dir, compile_trees=True,
+                                                       fold_scalers=True)
+    pipeline = PreprocessingPipeline.load(args.preprocessing) if args.preprocessing else None
+    explanations = ExplanationStore.load(args.explanations) if args.explanations else None
+    service = ScoringService(ensemble, max_batch_size=args.max_batch_size, pipeline=pipeline,
+                             explanations=explanations)
+    server = create_server(service, host=args.host, port=args.port)
+
+    print(f"Serving {len(ensemble.organs)} organ clocks on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
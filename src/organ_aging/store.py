@@ -0,0 +1,344 @@
+"""
+Shared columnar feature store with lightweight per-organ views.
+
+features.build_organ_datasets copies the feature columns of every organ out
+of the cleaned cohort and then drops incomplete rows separately, so the
+covariates shared by all panels (BMI, sex, ...) are held once per organ. A
+FeatureStore keeps every column exactly once in a single column-major
+float32 array. An OrganView describes an organ dataset as column positions
+into the store plus the positions of its usable rows; the organ matrix is
+only gathered when a model actually reads it, one organ at a time.
+
+Views behave like the (X, y) pairs of build_organ_datasets where the
+pipeline needs them to: they expose columns, index, shape and len(), and
+convert to a float32 array with np.asarray, so scikit-learn estimators,
+features.scale_features and training.train_organs_parallel accept them
+directly.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class FeatureStore:
+    """
+    Column-major float32 matrix holding every feature column once.
+
+    Args:
+        values: Array of shape (n_samples, n_columns).
+        columns: Column names, one per array column.
+        index: Optional row identifiers (e.g. SEQN). Defaults to row positions.
+        index_name: Name of the identifier column.
+
+    Example:
+        >>> store = FeatureStore.from_frame(df)
+        >>> view = store.view(['ALT', 'AST', 'BMXBMI'], target='AGE')
+        >>> model.fit(view, view.y)
+    """
+
+    def __init__(self,
+                 values: np.ndarray,
+                 columns: Sequence[str],
+                 index: Optional[np.ndarray] = None,
+                 index_name: Optional[str] = None):
+        values = np.asarray(values, dtype=np.float32)
+        if values.ndim != 2 or values.shape[1] != len(columns):
+            raise ValueError(f"Expected a 2-D array with {len(columns)} columns, "
+                             f"got shape {values.shape}")
+
+        # Column-major so that every column is one contiguous block
+        self.values = np.asfortranarray(values)
+        self.columns = list(columns)
+        self.index = np.arange(len(values)) if index is None else np.asarray(index)
+        self.index_name = index_name
+
+        self._positions = {col: j for j, col in enumerate(self.columns)}
+        if len(self._positions) != len(self.columns):
+            raise ValueError("Column names must be unique")
+        if len(self.index) != len(values):
+            raise ValueError(f"Index has {len(self.index)} entries for {len(values)} rows")
+
+    @classmethod
+    def from_frame(cls,
+                   df: pd.DataFrame,
+                   columns: Optional[List[str]] = None,
+                   index_col: Optional[str] = 'SEQN') -> 'FeatureStore':
+        """
+        Build a store from a DataFrame, converting one column at a time.
+
+        Args:
+            df: Input DataFrame.
+            columns: Columns to store. Defaults to every numeric column
+                    except index_col.
+            index_col: Identifier column used as the store index, if present.
+                      Falls back to the DataFrame index.
+
+        Returns:
+            FeatureStore with the requested columns.
+
+        Raises:
+            ValueError: If a requested column is missing.
+        """
+        if columns is None:
+            columns = [col for col in df.select_dtypes(include=[np.number, 'bool']).columns
+                       if col != index_col]
+
+        missing = [col for col in columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"Columns not found in DataFrame: {missing}")
+
+        values = np.empty((len(df), len(columns)), dtype=np.float32, order='F')
+        for j, col in enumerate(columns):
+            values[:, j] = df[col].to_numpy(dtype=np.float32, na_value=np.nan)
+
+        if index_col is not None and index_col in df.columns:
+            return cls(values, columns, index=df[index_col].to_numpy(), index_name=index_col)
+        return cls(values, columns, index=df.index.to_numpy(), index_name=df.index.name)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.values.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.index.nbytes
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __contains__(self, column: str) -> bool:
+        return column in self._positions
+
+    def __repr__(self) -> str:
+        return (f"FeatureStore({len(self)} rows, {len(self.columns)} columns, "
+                f"{self.values.nbytes / 1024 ** 2:.1f} MB)")
+
+    def column_positions(self, columns: Sequence[str]) -> np.ndarray:
+        """
+        Positions of the given columns in the store.
+
+        Raises:
+            ValueError: If any column is not in the store.
+        """
+        missing = [col for col in columns if col not in self._positions]
+        if missing:
+            raise ValueError(f"Columns not in feature store: {missing}")
+        return np.array([self._positions[col] for col in columns], dtype=np.intp)
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of one column (no copy)."""
+        column = self.values[:, self.column_positions([name])[0]]
+        column.flags.writeable = False
+        return column
+
+    def complete_rows(self, columns: Sequence[str]) -> np.ndarray:
+        """Positions of the rows with no missing value in any of the columns."""
+        valid = np.ones(len(self), dtype=bool)
+        for j in self.column_positions(columns):
+            valid &= ~np.isnan(self.values[:, j])
+        return np.flatnonzero(valid)
+
+    def view(self,
+             columns: Sequence[str],
+             rows: Optional[np.ndarray] = None,
+             target: Optional[str] = None,
+             name: Optional[str] = None) -> 'OrganView':
+        """Create an OrganView over a subset of columns and rows."""
+        return OrganView(self, columns, rows=rows, target=target, name=name)
+
+
+class OrganView:
+    """
+    Organ dataset defined as column and row positions into a FeatureStore.
+
+    Creating a view copies nothing. The feature matrix and target are
+    gathered on demand by matrix() and y, or implicitly by np.asarray(view).
+    When pickled (e.g. sent to a training worker process), a view carries
+    only its own rows and columns, not the whole store.
+
+    Args:
+        store: Backing FeatureStore.
+        columns: Feature column names, in model order.
+        rows: Optional row positions into the store. Defaults to all rows.
+        target: Optional name of the target column in the store.
+        name: Optional dataset name, e.g. the organ.
+    """
+
+    def __init__(self,
+                 store: FeatureStore,
+                 columns: Sequence[str],
+                 rows: Optional[np.ndarray] = None,
+                 target: Optional[str] = None,
+                 name: Optional[str] = None):
+        self.store = store
+        self.columns = list(columns)
+        self.positions = store.column_positions(self.columns)
+        self.rows = None if rows is None else np.asarray(rows, dtype=np.intp)
+        self.target = target
+        self.name = name
+
+        if target is not None:
+            self._target_position = store.column_positions([target])[0]
+
+    def __len__(self) -> int:
+        return len(self.store) if self.rows is None else len(self.rows)
+
+    def __repr__(self) -> str:
+        label = f"{self.name}: " if self.name else ""
+        return f"OrganView({label}{len(self)} rows, {len(self.columns)} features)"
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (len(self), len(self.columns))
+
+    @property
+    def index(self) -> pd.Index:
+        """Row identifiers of the view, e.g. SEQN."""
+        ids = self.store.index if self.rows is None else self.store.index[self.rows]
+        return pd.Index(ids, name=self.store.index_name)
+
+    def matrix(self) -> np.ndarray:
+        """
+        Gather the feature matrix of the view.
+
+        Returns:
+            C-contiguous float32 array of shape (n_samples, n_features).
+        """
+        X = np.empty(self.shape, dtype=np.float32)
+        for j, position in enumerate(self.positions):
+            column = self.store.values[:, position]
+            X[:, j] = column if self.rows is None else column[self.rows]
+        return X
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        X = self.matrix()
+        return X if dtype is None else X.astype(dtype, copy=False)
+
+    @property
+    def y(self) -> np.ndarray:
+        """Target values of the view as float64."""
+        if self.target is None:
+            raise ValueError("View has no target column")
+        column = self.store.values[:, self._target_position]
+        values = column if self.rows is None else column[self.rows]
+        return values.astype(np.float64)
+
+    def take(self, positions: np.ndarray) -> 'OrganView':
+        """
+        Select rows of the view by position, e.g. a train or test split.
+
+        Args:
+            positions: Row positions relative to this view.
+
+        Returns:
+            New OrganView over the same store.
+        """
+        positions = np.asarray(positions, dtype=np.intp)
+        rows = positions if self.rows is None else self.rows[positions]
+        return OrganView(self.store, self.columns, rows=rows, target=self.target, name=self.name)
+
+    def to_frame(self) -> Tuple[pd.DataFrame, Optional[pd.Series]]:
+        """Materialize the view as the (X, y) pair build_organ_datasets returns."""
+        index = self.index
+        X = pd.DataFrame(self.matrix(), columns=self.columns, index=index)
+        y = None if self.target is None else pd.Series(self.y, index=index, name=self.target)
+        return X, y
+
+    def __reduce__(self):
+        y = None if self.target is None else self.y
+        index = self.store.index if self.rows is None else self.store.index[self.rows]
+        return (_compact_view,
+                (self.matrix(), self.columns, y, self.target, self.name, index, self.store.index_name))
+
+
+def _compact_view(X: np.ndarray,
+                  columns: List[str],
+                  y: Optional[np.ndarray],
+                  target: Optional[str],
+                  name: Optional[str],
+                  index: np.ndarray,
+                  index_name: Optional[str]) -> OrganView:
+    """Rebuild a pickled view over a store holding only its own data."""
+    store_columns = list(columns)
+    if target is not None and target not in store_columns:
+        X = np.column_stack([X, y])
+        store_columns.append(target)
+    store = FeatureStore(X, store_columns, index=index, index_name=index_name)
+    return OrganView(store, columns, target=target, name=name)
+
+
+def build_organ_views(df: pd.DataFrame,
+                      organ_panels: Dict[str, List[str]],
+                      global_covars: List[str],
+                      target_col: str = 'AGE',
+                      index_col: Optional[str] = 'SEQN',
+                      dropna: bool = True) -> Dict[str, OrganView]:
+    """
+    Build organ datasets as views over one shared FeatureStore.
+
+    Follows the same rules as features.build_organ_datasets: each organ gets
+    its available biomarkers followed by the available global covariates,
+    and rows with a missing feature or target are left out of that organ
+    unless dropna is False. Every column is stored once, however many
+    organs use it.
+
+    Args:
+        df: Input DataFrame containing all biomarkers and covariates.
+        organ_panels: Dictionary mapping organ names to lists of biomarker column names.
+        global_covars: List of global covariate columns (e.g., SEX, BMI, SMOKING_STATUS).
+        target_col: Name of the target variable (chronological age).
+        index_col: Identifier column used as the view index, if present.
+        dropna: If True, leave out each organ's rows with a missing feature.
+               If False, keep missing values for NaN-native models: every
+               organ shares one row set (the rows with a target).
+
+    Returns:
+        Dictionary mapping organ names to OrganView objects sharing one store.
+
+    Example:
+        >>> views = build_organ_views(df, organ_panels, global_covars=['RIAGENDR_2.0', 'BMXBMI'])
+        >>> liver = views['liver']
+        >>> model = train_nonlinear_model(liver, liver.y)
+    """
+    if target_col not in df.columns:
+        raise ValueError(f"Target column '{target_col}' not found in DataFrame")
+
+    organ_names = [name for name in organ_panels.keys() if name != 'global_covariates']
+    covariates = [col for col in global_covars if col in df.columns]
+
+    organ_columns = {}
+    for organ_name in organ_names:
+        biomarkers = organ_panels[organ_name]
+        available_biomarkers = [col for col in biomarkers if col in df.columns]
+        missing_biomarkers = set(biomarkers) - set(available_biomarkers)
+
+        if missing_biomarkers:
+            print(f"Warning: {organ_name} - missing biomarkers: {missing_biomarkers}")
+
+        if not available_biomarkers:
+            print(f"Warning: {organ_name} - no biomarkers available, skipping")
+            continue
+
+        organ_columns[organ_name] = (list(dict.fromkeys(available_biomarkers + covariates)),
+                                     len(available_biomarkers))
+
+    store_columns = list(dict.fromkeys(
+        [col for columns, _ in organ_columns.values() for col in columns] + [target_col]
+    ))
+    store = FeatureStore.from_frame(df, columns=store_columns, index_col=index_col)
+
+    shared_rows = store.complete_rows([target_col])
+
+    views = {}
+    for organ_name, (feature_cols, n_biomarkers) in organ_columns.items():
+        rows = store.complete_rows(feature_cols + [target_col]) if dropna else shared_rows
+        views[organ_name] = store.view(feature_cols, rows=rows, target=target_col, name=organ_name)
+
+        print(f"{organ_name}: {len(rows)} samples, {len(feature_cols)} features "
+              f"({n_biomarkers} biomarkers + {len(feature_cols) - n_biomarkers} covariates)")
+
+    print(f"Feature store: {len(store.columns)} columns, {store.values.nbytes / 1024 ** 2:.1f} MB")
+
+    return views
@@ -0,0 +1,296 @@
+"""
+Parallel multi-organ training orchestrator.
+
+This module trains every (organ, model type) pair in its own worker
+process. Available cores are split between the concurrently running jobs
+and each model's internal threading (OpenMP/BLAS for scikit-learn,
+n_jobs for LightGBM/XGBoost) so the machine is not oversubscribed.
+Finished models are checkpointed to disk, so an interrupted run resumes
+where it stopped, and every job reports its wall time and peak memory.
+"""
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+
+# Model type -> (training function, model_type argument)
+MODEL_TYPES = {
+    'linear': ('linear', 'linear'),
+    'elastic_net': ('linear', 'elastic_net'),
+    'hist_gb': ('nonlinear', 'hist_gb'),
+    'lightgbm': ('nonlinear', 'lightgbm'),
+    'xgboost': ('nonlinear', 'xgboost'),
+}
+
+# Relative cost per sample, used to start the longest jobs first
+_RELATIVE_COST = {'linear': 1, 'elastic_net': 2, 'hist_gb': 20, 'lightgbm': 15, 'xgboost': 20}
+
+# Environment variables read by native thread pools when they initialise
+_THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')
+
+
+def plan_thread_budget(n_jobs: int, n_cores: Optional[int] = None,
+                       max_workers: Optional[int] = None) -> Dict[str, int]:
+    """
+    Split cores between concurrent training jobs and per-model threads.
+
+    Args:
+        n_jobs: Number of jobs to run.
+        n_cores: Total cores to use. Defaults to os.cpu_count().
+        max_workers: Optional cap on concurrently running jobs.
+
+    Returns:
+        Dictionary with 'workers' (concurrent processes) and
+        'threads_per_job' (threads each model may use).
+
+    Example:
+        >>> plan_thread_budget(n_jobs=10, n_cores=8)
+        {'workers': 8, 'threads_per_job': 1}
+    """
+    n_cores = max(1, n_cores or os.cpu_count() or 1)
+    workers = max(1, min(n_jobs, n_cores, max_workers or n_cores))
+    return {'workers': workers, 'threads_per_job': max(1, n_cores // workers)}
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of the current process in MB, if available."""
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    if os.uname().sysname == 'Darwin':
+        return peak / 1024 ** 2
+    return peak / 1024
+
+
+def _importance_metadata(model: Any, features: List[str]) -> Dict[str, Dict[str, float]]:
+    """Split-gain and split-count importances of a boosted tree model, per feature."""
+    from .explainability import get_feature_importance
+
+    return {
+        importance_type: {row.feature: float(row.importance) for row in
+                          get_feature_importance(model, features, importance_type).itertuples()}
+        for importance_type in ('gain', 'split')
+    }
+
+
+def _train_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Train, evaluate and checkpoint one (organ, model type) job.
+
+    Runs in a fresh worker process, so thread limits set here apply to
+    every native library the job imports.
+    """
+    threads = job['threads']
+    for name in _THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+
+    from threadpoolctl import threadpool_limits
+    from .binning import codes_to_float
+    from .evaluation import calculate_metrics
+    from .models import save_model, train_linear_model, train_nonlinear_model
+
+    start = time.perf_counter()
+    family, model_type = MODEL_TYPES[job['model_type']]
+    params = dict(job['params'])
+    if model_type in ('lightgbm', 'xgboost'):
+        params.setdefault('n_jobs', threads)
+
+    splits = job['splits']
+    bin_edges = job.get('bin_edges')
+    if bin_edges is not None:
+        # Pre-binned jobs receive compact uint8 codes
+        splits = {name: codes_to_float(value) if name.startswith('X_') else value
+                  for name, value in splits.items()}
+
+    with threadpool_limits(limits=threads):
+        if family == 'linear':
+            model = train_linear_model(splits['X_train'], splits['y_train'],
+                                       model_type=model_type, **params)
+        else:
+            model = train_nonlinear_model(splits['X_train'], splits['y_train'],
+                                          model_type=model_type, **params)
+
+        metrics = {}
+        for split_name in ('train', 'val', 'test'):
+            if f'X_{split_name}' in splits:
+                y_pred = model.predict(splits[f'X_{split_name}'])
+                metrics[split_name] = calculate_metrics(splits[f'y_{split_name}'], y_pred)
+
+    if bin_edges is not None:
+        # Map code thresholds back to raw values so the clock scores raw features
+        from .trees import FlatTreeEnsemble
+        model = FlatTreeEnsemble.from_hist_gb(model, bin_edges=bin_edges)
+        model.feature_names = list(job['features'])
+
+    fit_seconds = time.perf_counter() - start
+
+    metadata = {
+        'organ': job['organ'],
+        'model_type': job['model_type'],
+        'features': list(job['features']),
+        'metrics': metrics,
+    }
+    if family == 'nonlinear':
+        # Read from the fitted split nodes, so recording it costs no predictions
+        metadata['feature_importance'] = _importance_metadata(model, job['features'])
+
+    # Write to a temporary file first so a killed job never leaves a
+    # truncated checkpoint that a resumed run would mistake for finished
+    model_path = Path(job['model_path'])
+    tmp_path = model_path.with_suffix('.tmp')
+    save_model(model, tmp_path, metadata=metadata)
+    os.replace(tmp_path, model_path)
+
+    return {
+        'organ': job['organ'],
+        'model_type': job['model_type'],
+        'status': 'trained',
+        'wall_time_s': time.perf_counter() - start,
+        'fit_time_s': fit_seconds,
+        'peak_rss_mb': _peak_rss_mb(),
+        'threads': threads,
+        'n_samples': len(splits['X_train']),
+        'model_path': str(model_path),
+        'metrics': metrics,
+    }
+
+
+def train_organs_parallel(organ_splits: Dict[str, Dict],
+                          model_types: List[str] = ('linear', 'hist_gb'),
+                          save_dir: str = "models",
+                          n_cores: Optional[int] = None,
+                          max_workers: Optional[int] = None,
+                          model_params: Optional[Dict[str, Dict]] = None,
+                          overwrite: bool = False,
+                          binned: Optional[Any] = None) -> pd.DataFrame:
+    """
+    Train all organs and model types in parallel worker processes.
+
+    Each job trains one model for one organ and saves it to
+    '<save_dir>/<organ>/<model_type>_model.pkl', the same layout as
+    models.train_organ_models. Jobs whose model file already exists are
+    skipped unless overwrite is True, so re-running after an interruption
+    only trains what is missing. Jobs that fail (e.g. an optional library
+    is not installed) are reported without stopping the others.
+
+    With a binning.BinnedDataset of the cohort, hist_gb jobs are fitted on
+    its bin codes (sent to the worker as uint8) and saved as a
+    trees.FlatTreeEnsemble whose thresholds are mapped back to raw values,
+    so the checkpoint scores unbinned features like any other clock.
+
+    Args:
+        organ_splits: Dictionary mapping organ names to split dictionaries
+                     with 'X_train', 'y_train' and optionally 'X_val',
+                     'y_val', 'X_test', 'y_test'. Feature matrices may be
+                     DataFrames or store.OrganView objects; a view is sent
+                     to its worker as its own rows and columns only.
+        model_types: Model types to train, any of MODEL_TYPES.
+        save_dir: Directory to save trained models.
+        n_cores: Total cores to use. Defaults to os.cpu_count().
+        max_workers: Optional cap on concurrently running jobs.
+        model_params: Optional mapping from model type to extra parameters.
+        overwrite: If True, retrain jobs that already have a checkpoint.
+        binned: Optional binning.BinnedDataset covering the rows and columns
+               of every split, used for hist_gb jobs.
+
+    Returns:
+        DataFrame with one row per job: organ, model_type, status,
+        wall_time_s, fit_time_s, peak_rss_mb, threads, n_samples,
+        model_path and error. The report is also written to
+        '<save_dir>/training_report.json'. On Python < 3.11 workers are
+        reused across jobs, so peak_rss_mb is an upper bound.
+
+    Example:
+        >>> report = train_organs_parallel(organ_splits,
+        ...                                model_types=['elastic_net', 'hist_gb'],
+        ...                                model_params={'elastic_net': {'alpha': 0.1}})
+        >>> print(report[['organ', 'model_type', 'wall_time_s', 'peak_rss_mb']])
+    """
+    unknown = [m for m in model_types if m not in MODEL_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown model types: {unknown}. Choose from {list(MODEL_TYPES)}")
+
+    save_dir = Path(save_dir)
+    model_params = model_params or {}
+
+    results = []
+    jobs = []
+    for organ, splits in organ_splits.items():
+        (save_dir / organ).mkdir(parents=True, exist_ok=True)
+        for model_type in model_types:
+            model_path = save_dir / organ / f"{model_type}_model.pkl"
+            if model_path.exists() and not overwrite:
+                results.append({'organ': organ, 'model_type': model_type,
+                                'status': 'skipped', 'model_path': str(model_path)})
+                continue
+            job = {
+                'organ': organ,
+                'model_type': model_type,
+                'splits': splits,
+                'features': list(splits['X_train'].columns),
+                'params': model_params.get(model_type, {}),
+                'model_path': str(model_path),
+            }
+            if binned is not None and model_type == 'hist_gb':
+                job['splits'] = {name: binned.for_data(value, as_codes=True) if name.startswith('X_')
+                                 else value for name, value in splits.items()}
+                job['bin_edges'] = binned.edges_for(job['features'])
+            jobs.append(job)
+
+    print(f"Training {len(jobs)} jobs ({len(results)} already checkpointed)")
+
+    if jobs:
+        budget = plan_thread_budget(len(jobs), n_cores=n_cores, max_workers=max_workers)
+        print(f"  {budget['workers']} workers × {budget['threads_per_job']} threads")
+
+        # Longest jobs first keeps the pool busy until the end
+        jobs.sort(key=lambda job: -_RELATIVE_COST[job['model_type']] * len(job['splits']['X_train']))
+        for job in jobs:
+            job['threads'] = budget['threads_per_job']
+
+        # One process per job: thread limits apply from a clean state and
+        # the peak RSS reported by the worker belongs to that job alone.
+        # max_tasks_per_child needs Python 3.11; before that workers are
+        # reused and peak_rss_mb is the worker's high-water mark so far.
+        pool_options = {'max_tasks_per_child': 1} if sys.version_info >= (3, 11) else {}
+        with ProcessPoolExecutor(max_workers=budget['workers'], **pool_options) as executor:
+            futures = {executor.submit(_train_job, job): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    result = future.result()
+                    rss = result['peak_rss_mb']
+                    print(f"  ✓ {job['organ']}/{job['model_type']}: {result['wall_time_s']:.1f}s"
+                          + (f", peak RSS {rss:.0f} MB" if rss is not None else ""))
+                except Exception as e:
+                    result = {'organ': job['organ'], 'model_type': job['model_type'],
+                              'status': 'failed', 'error': f"{type(e).__name__}: {e}"}
+                    print(f"  ✗ {job['organ']}/{job['model_type']}: {result['error']}")
+                results.append(result)
+
+    # Report jobs in input order rather than completion order
+    order = {(organ, m): i for i, (organ, m) in enumerate(
+        (organ, m) for organ in organ_splits for m in model_types
+    )}
+    results.sort(key=lambda r: order[(r['organ'], r['model_type'])])
+
+    report = pd.DataFrame(results)
+    columns = ['organ', 'model_type', 'status', 'wall_time_s', 'fit_time_s', 'peak_rss_mb',
+               'threads', 'n_samples', 'model_path', 'error']
+    report = report.reindex(columns=columns)
+
+    with open(save_dir / "training_report.json", 'w') as f:
+        json.dump(results, f, indent=2, default=float)
+
+    return report
@@ -0,0 +1,483 @@
+"""
+Flat-array tree evaluator for gradient boosted organ clocks.
+
+This module flattens a fitted HistGradientBoostingRegressor into a handful
+of NumPy node arrays and evaluates them with vectorized NumPy code. It
+imports only NumPy, so compiled clocks can be loaded and scored without
+importing scikit-learn and without its per-call validation overhead.
+
+Exported ensembles also carry each node's training sample count (cover),
+which is what exact path-dependent TreeSHAP needs: shap_values explains
+every row with the polynomial-time algorithm of Lundberg et al. (2020),
+vectorized over rows, so gradient boosted clocks never fall back to the
+sampling-based KernelExplainer.
+"""
+
+from pathlib import Path
+from typing import Any, List, Optional
+
+import numpy as np
+
+
+# Losses whose inverse link is the identity, so raw predictions are ages
+_IDENTITY_LOSSES = {'squared_error', 'absolute_error', 'quantile'}
+
+
+def _raw_thresholds(threshold: np.ndarray,
+                    feature: np.ndarray,
+                    is_leaf: np.ndarray,
+                    bin_edges: List[np.ndarray]) -> np.ndarray:
+    """
+    Map split thresholds on bin codes back to raw feature values.
+
+    Code k holds the values in (edges[k-1], edges[k]], so 'code <= t' is
+    the same split as 'x <= edges[floor(t)]'. Splits below every code or
+    above the last edge become -inf and +inf.
+    """
+    raw = threshold.copy()
+    for j, edges in enumerate(bin_edges):
+        nodes = ~is_leaf & (feature == j)
+        if not nodes.any():
+            continue
+        padded = np.concatenate([[-np.inf], np.asarray(edges, dtype=np.float64), [np.inf]])
+        k = np.floor(threshold[nodes]).astype(np.int64)
+        raw[nodes] = padded[np.clip(k, -1, len(edges)) + 1]
+    return raw
+
+
+class FlatTreeEnsemble:
+    """
+    Gradient boosted trees stored as flat node arrays.
+
+    Nodes of all trees are concatenated; child indices are global positions
+    in the node arrays and roots[t] is the root node of tree t.
+
+    Args:
+        feature: Split feature index per node.
+        threshold: Split threshold per node (go left if x <= threshold).
+        left: Left child index per node.
+        right: Right child index per node.
+        value: Leaf value per node.
+        missing_left: Whether missing values go to the left child.
+        is_leaf: Whether the node is a leaf.
+        roots: Root node index per tree.
+        baseline: Constant added to the sum of tree outputs.
+        max_depth: Maximum depth over all trees.
+        n_features: Number of input features.
+        feature_names: Optional feature names in input order.
+        cover: Optional number of training samples reaching each node,
+              required by shap_values.
+        gain: Optional loss reduction of each split (0 for leaves),
+             required by feature_importance('gain').
+
+    Example:
+        >>> flat = FlatTreeEnsemble.from_hist_gb(model)
+        >>> np.allclose(flat.predict(X), model.predict(X))
+        True
+    """
+
+    # Node-level arrays persisted by save() and required by the evaluator
+    NODE_ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'missing_left', 'is_leaf')
+
+    def __init__(self,
+                 feature: np.ndarray,
+                 threshold: np.ndarray,
+                 left: np.ndarray,
+                 right: np.ndarray,
+                 value: np.ndarray,
+                 missing_left: np.ndarray,
+                 is_leaf: np.ndarray,
+                 roots: np.ndarray,
+                 baseline: float,
+                 max_depth: int,
+                 n_features: int,
+                 feature_names: Optional[List[str]] = None,
+                 cover: Optional[np.ndarray] = None,
+                 gain: Optional[np.ndarray] = None):
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.missing_left = np.asarray(missing_left, dtype=bool)
+        self.is_leaf = np.asarray(is_leaf, dtype=bool)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.baseline = float(baseline)
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.feature_names = None if feature_names is None else list(feature_names)
+        self.cover = None if cover is None else np.asarray(cover, dtype=np.float64)
+        self.gain = None if gain is None else np.asarray(gain, dtype=np.float64)
+
+    @property
+    def n_trees(self) -> int:
+        """Number of trees in the ensemble."""
+        return len(self.roots)
+
+    @classmethod
+    def from_hist_gb(cls, model: Any, bin_edges: Optional[List[np.ndarray]] = None) -> "FlatTreeEnsemble":
+        """
+        Flatten a fitted HistGradientBoostingRegressor.
+
+        Args:
+            model: Fitted HistGradientBoostingRegressor.
+            bin_edges: Per-feature bin edges if the model was fitted on bin
+                      codes (binning.BinnedDataset). Thresholds are mapped
+                      back to raw feature values, so the exported ensemble
+                      predicts from unbinned features.
+
+        Returns:
+            Equivalent FlatTreeEnsemble.
+
+        Raises:
+            ValueError: If the model is not fitted, uses categorical splits,
+                       or has a non-identity loss link.
+        """
+        predictors = getattr(model, '_predictors', None)
+        if predictors is None:
+            raise ValueError("Model is not a fitted HistGradientBoostingRegressor")
+
+        if model.loss not in _IDENTITY_LOSSES:
+            raise ValueError(f"Unsupported loss for flat export: {model.loss}")
+
+        if getattr(model, '_preprocessor', None) is not None:
+            raise ValueError("Models with categorical features are not supported")
+
+        fields = {name: [] for name in cls.NODE_ARRAYS}
+        cover = []
+        gain = []
+        roots = []
+        offset = 0
+        max_depth = 0
+
+        for iteration in predictors:
+            if len(iteration) != 1:
+                raise ValueError("Only single-output regressors are supported")
+            nodes = iteration[0].nodes
+
+            if nodes['is_categorical'].any():
+                raise ValueError("Models with categorical splits are not supported")
+
+            is_leaf = nodes['is_leaf'].astype(bool)
+            fields['feature'].append(np.where(is_leaf, 0, nodes['feature_idx']))
+            fields['threshold'].append(nodes['num_threshold'])
+            # Leaves point to themselves so the evaluator can step past them
+            own_index = np.arange(len(nodes)) + offset
+            fields['left'].append(np.where(is_leaf, own_index, nodes['left'].astype(np.intp) + offset))
+            fields['right'].append(np.where(is_leaf, own_index, nodes['right'].astype(np.intp) + offset))
+            fields['value'].append(np.where(is_leaf, nodes['value'], 0.0))
+            fields['missing_left'].append(nodes['missing_go_to_left'].astype(bool))
+            fields['is_leaf'].append(is_leaf)
+            cover.append(nodes['count'])
+            gain.append(np.where(is_leaf, 0.0, nodes['gain']))
+
+            roots.append(offset)
+            offset += len(nodes)
+            max_depth = max(max_depth, int(nodes['depth'].max()))
+
+        arrays = {name: np.concatenate(parts) for name, parts in fields.items()}
+        if bin_edges is not None:
+            arrays['threshold'] = _raw_thresholds(arrays['threshold'], arrays['feature'],
+                                                  arrays['is_leaf'], bin_edges)
+        feature_names = getattr(model, 'feature_names_in_', None)
+
+        return cls(
+            roots=np.array(roots),
+            baseline=float(np.ravel(model._baseline_prediction)[0]),
+            max_depth=max_depth,
+            n_features=model.n_features_in_,
+            feature_names=None if feature_names is None else list(feature_names),
+            cover=np.concatenate(cover),
+            gain=np.concatenate(gain),
+            **arrays
+        )
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Find the leaf reached by every row in every tree.
+
+        Args:
+            X: Array of shape (n_samples, n_features).
+
+        Returns:
+            Array of shape (n_samples, n_trees) with global leaf node indices.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.n_trees)).copy()
+
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            go_left = (x <= self.threshold[node]) | (np.isnan(x) & self.missing_left[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        return node
+
+    def predict(self, X: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+        """
+        Predict with the flattened ensemble.
+
+        Args:
+            X: Array of shape (n_samples, n_features). Missing values are NaN.
+            batch_size: Rows per block, bounding the (rows × trees) work arrays.
+
+        Returns:
+            Predictions of shape (n_samples,).
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+
+        pred = np.empty(X.shape[0])
+        for start in range(0, X.shape[0], batch_size):
+            leaves = self.apply(X[start:start + batch_size])
+            pred[start:start + len(leaves)] = self.value[leaves].sum(axis=1) + self.baseline
+
+        return pred
+
+    def feature_importance(self, importance_type: str = 'gain') -> np.ndarray:
+        """
+        Split-based feature importance, summed over all split nodes.
+
+        Args:
+            importance_type: 'gain' (total loss reduction of the splits on
+                            each feature) or 'split' (number of splits).
+
+        Returns:
+            Array of shape (n_features,).
+
+        Raises:
+            ValueError: If importance_type is unknown, or 'gain' is requested
+                       for an ensemble exported without split gains.
+        """
+        splits = ~self.is_leaf
+        if importance_type == 'split':
+            return np.bincount(self.feature[splits], minlength=self.n_features).astype(np.float64)
+        if importance_type == 'gain':
+            if self.gain is None:
+                raise ValueError("Ensemble has no split gains; re-export it with from_hist_gb")
+            return np.bincount(self.feature[splits], weights=self.gain[splits],
+                               minlength=self.n_features)
+        raise ValueError(f"Unknown importance_type: {importance_type}. Choose 'gain' or 'split'")
+
+    @property
+    def expected_value(self) -> float:
+        """Mean prediction over the training data, weighting leaves by cover."""
+        if self.cover is None:
+            raise ValueError("Ensemble has no node cover; re-export it with from_hist_gb")
+        tree_of_node = np.searchsorted(self.roots, np.arange(len(self.value)), side='right') - 1
+        leaves = np.flatnonzero(self.is_leaf)
+        weights = self.cover[leaves] / self.cover[self.roots[tree_of_node[leaves]]]
+        return self.baseline + float(np.sum(self.value[leaves] * weights))
+
+    def shap_values(self, X: np.ndarray, n_jobs: int = -1, chunk_size: int = 4096) -> np.ndarray:
+        """
+        Exact path-dependent TreeSHAP values for every row.
+
+        Uses the node covers as the background distribution, like
+        shap.TreeExplainer without a background dataset. For every row,
+        the values add up to predict(X) - expected_value.
+
+        Args:
+            X: Array of shape (n_samples, n_features). Missing values are NaN.
+            n_jobs: Number of parallel workers over row chunks (-1 uses all cores).
+            chunk_size: Rows per chunk.
+
+        Returns:
+            Array of shape (n_samples, n_features) with one attribution per feature.
+
+        Raises:
+            ValueError: If the ensemble has no node cover or X has the wrong width.
+
+        Example:
+            >>> phi = flat.shap_values(X_test)
+            >>> np.allclose(phi.sum(axis=1) + flat.expected_value, flat.predict(X_test))
+            True
+        """
+        if self.cover is None:
+            raise ValueError("Ensemble has no node cover; re-export it with from_hist_gb")
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+
+        chunks = [X[start:start + chunk_size] for start in range(0, len(X), chunk_size)]
+        if n_jobs == 1 or len(chunks) <= 1:
+            parts = [_tree_shap(self, chunk) for chunk in chunks]
+        else:
+            from joblib import Parallel, delayed
+            parts = Parallel(n_jobs=n_jobs)(delayed(_tree_shap)(self, chunk) for chunk in chunks)
+
+        return np.concatenate(parts) if parts else np.zeros((0, self.n_features))
+
+    def _array_dict(self) -> dict:
+        """Arrays and scalars describing the ensemble, for persistence."""
+        arrays = {name: getattr(self, name) for name in self.NODE_ARRAYS}
+        arrays.update({
+            'roots': self.roots,
+            'baseline': np.array(self.baseline),
+            'max_depth': np.array(self.max_depth),
+            'n_features': np.array(self.n_features),
+        })
+        if self.feature_names is not None:
+            arrays['feature_names'] = np.array(self.feature_names, dtype=str)
+        for name in ('cover', 'gain'):
+            if getattr(self, name) is not None:
+                arrays[name] = getattr(self, name)
+        return arrays
+
+    @classmethod
+    def _from_array_dict(cls, arrays) -> "FlatTreeEnsemble":
+        """Rebuild an ensemble from persisted arrays."""
+        feature_names = arrays['feature_names'].tolist() if 'feature_names' in arrays else None
+        return cls(
+            roots=arrays['roots'],
+            baseline=float(arrays['baseline']),
+            max_depth=int(arrays['max_depth']),
+            n_features=int(arrays['n_features']),
+            feature_names=feature_names,
+            cover=arrays['cover'] if 'cover' in arrays else None,
+            gain=arrays['gain'] if 'gain' in arrays else None,
+            **{name: arrays[name] for name in cls.NODE_ARRAYS}
+        )
+
+    def save(self, filepath: str) -> None:
+        """
+        Save the ensemble as an uncompressed .npz archive (no pickle).
+
+        Args:
+            filepath: Destination path.
+        """
+        filepath = Path(filepath)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        with open(filepath, 'wb') as f:
+            np.savez(f, **self._array_dict())
+        print(f"Flat tree ensemble saved to {filepath}")
+
+    @classmethod
+    def load(cls, filepath: str) -> "FlatTreeEnsemble":
+        """
+        Load an ensemble saved with save().
+
+        Args:
+            filepath: Path to the .npz archive.
+
+        Returns:
+            Loaded FlatTreeEnsemble.
+        """
+        filepath = Path(filepath)
+        if not filepath.exists():
+            raise FileNotFoundError(f"Flat tree file not found: {filepath}")
+
+        with np.load(filepath, allow_pickle=False) as arrays:
+            return cls._from_array_dict(arrays)
+
+
+def _tree_shap(ensemble: FlatTreeEnsemble, X: np.ndarray) -> np.ndarray:
+    """TreeSHAP values of one chunk of rows, summed over all trees."""
+    phi = np.zeros(X.shape)
+    ones = np.ones(len(X))
+    for root in ensemble.roots:
+        _shap_recurse(ensemble, X, phi, root, [], [], [], [], 1.0, ones, -1)
+    return phi
+
+
+def _shap_recurse(ensemble: FlatTreeEnsemble,
+                  X: np.ndarray,
+                  phi: np.ndarray,
+                  node: int,
+                  features: list,
+                  zeros: list,
+                  ones: list,
+                  weights: list,
+                  zero: float,
+                  one: np.ndarray,
+                  feature: int) -> None:
+    """
+    RECURSE of path-dependent TreeSHAP, with every row explained at once.
+
+    The path holds the unique features split on so far with their zero
+    fraction (share of the background reaching this node, a scalar) and
+    one fraction (whether each row follows the path, one value per row).
+    Every node is visited once for all rows; rows only differ in their
+    one fractions and path weights.
+    """
+    features, zeros, ones, weights = _extend(features, zeros, ones, weights, zero, one, feature)
+
+    if ensemble.is_leaf[node]:
+        if len(features) > 1:
+            contributions = _unwound_sums(zeros, ones, weights) * ensemble.value[node]
+            phi[:, features[1:]] += contributions.T
+        return
+
+    split = ensemble.feature[node]
+    x = X[:, split]
+    go_left = (x <= ensemble.threshold[node]) | (np.isnan(x) & ensemble.missing_left[node])
+
+    incoming_zero, incoming_one = 1.0, 1.0
+    if split in features[1:]:
+        # A feature split on twice keeps one path entry
+        k = features.index(split, 1)
+        incoming_zero, incoming_one = zeros[k], ones[k]
+        features, zeros, ones, weights = _unwind(features, zeros, ones, weights, k)
+
+    left, right = ensemble.left[node], ensemble.right[node]
+    cover = ensemble.cover[node]
+    _shap_recurse(ensemble, X, phi, left, features, zeros, ones, weights,
+                  incoming_zero * ensemble.cover[left] / cover, incoming_one * go_left, split)
+    _shap_recurse(ensemble, X, phi, right, features, zeros, ones, weights,
+                  incoming_zero * ensemble.cover[right] / cover, incoming_one * ~go_left, split)
+
+
+def _extend(features: list, zeros: list, ones: list, weights: list,
+            zero: float, one: np.ndarray, feature: int):
+    """EXTEND: add a feature to the path and update the subset weights."""
+    depth = len(weights)
+    weights = weights + [np.full(len(one), 1.0 if depth == 0 else 0.0)]
+    for i in range(depth - 1, -1, -1):
+        weights[i + 1] = weights[i + 1] + one * weights[i] * (i + 1) / (depth + 1)
+        weights[i] = zero * weights[i] * (depth - i) / (depth + 1)
+    return features + [feature], zeros + [zero], ones + [one], weights
+
+
+def _unwind(features: list, zeros: list, ones: list, weights: list, k: int):
+    """UNWIND: remove path entry k, undoing its EXTEND."""
+    depth = len(weights) - 1
+    zero, hot = zeros[k], ones[k] > 0
+    next_one = weights[depth]
+    unwound = weights[:depth]
+    for i in range(depth - 1, -1, -1):
+        hot_weight = next_one * (depth + 1) / (i + 1)
+        cold_weight = weights[i] * (depth + 1) / (zero * (depth - i)) if zero > 0 else 0.0
+        next_one = weights[i] - hot_weight * zero * (depth - i) / (depth + 1)
+        unwound[i] = np.where(hot, hot_weight, cold_weight)
+    return features[:k] + features[k + 1:], zeros[:k] + zeros[k + 1:], ones[:k] + ones[k + 1:], unwound
+
+
+def _unwound_sums(zeros: list, ones: list, weights: list) -> np.ndarray:
+    """
+    UNWOUNDPATHSUM for every path entry at once, times (one - zero).
+
+    Returns:
+        Array of shape (path_length - 1, n_rows) with the contribution of
+        each feature on the path, per unit of leaf value.
+    """
+    depth = len(weights) - 1
+    zero = np.array(zeros[1:])[:, None]
+    one = np.stack(ones[1:])
+    safe_zero = np.where(zero > 0, zero, 1.0)
+
+    next_one = np.broadcast_to(weights[depth], one.shape)
+    hot_total = np.zeros(one.shape)
+    cold_total = np.zeros(one.shape)
+    for i in range(depth - 1, -1, -1):
+        step = next_one * (depth + 1) / (i + 1)
+        hot_total += step
+        next_one = weights[i] - step * zero * (depth - i) / (depth + 1)
+        cold_total += weights[i] / safe_zero * (depth + 1) / (depth - i)
+
+    cold_total *= zero > 0
+    return np.where(one > 0, hot_total, cold_total) * (one - zero)
@@ -0,0 +1,436 @@
+"""
+Budgeted hyperparameter search for organ clocks.
+
+Each organ clock is tuned with successive halving. A random sample of
+candidate configurations is fitted on a small subsample of the training
+rows (and, for boosting models, few iterations). The best 1/eta are
+kept, and the survivors are refitted with eta times more rows and
+iterations. There are floor(log_eta(n_candidates)) rungs (at least one),
+so the last one fits eta or more candidates (all of them, if fewer were
+drawn) on all training rows and picks the winner; no rung is spent on a
+lone survivor. The search stops early when the next rung would exceed
+the organ's time budget. The candidates of a rung are fitted in
+parallel. Tree candidates share one binned copy of the training data, so
+no candidate re-bins it. The best configuration of every model type is
+refitted on the full training set, the organ's best model is selected on
+validation MAE, and the selection is written to
+'best_models_summary.json'.
+"""
+
+import itertools
+import json
+import math
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Search space per model type: parameter -> candidate values
+SEARCH_SPACES = {
+    'linear': {},
+    'elastic_net': {
+        'alpha': [0.001, 0.003, 0.01, 0.03, 0.1, 0.3, 1.0],
+        'l1_ratio': [0.1, 0.5, 0.9],
+    },
+    'hist_gb': {
+        'learning_rate': [0.03, 0.06, 0.1, 0.2],
+        'max_depth': [3, 5, 8, None],
+        'max_leaf_nodes': [15, 31, 63],
+        'min_samples_leaf': [10, 20, 50],
+        'l2_regularization': [0.0, 0.1, 1.0],
+    },
+    'lightgbm': {
+        'learning_rate': [0.03, 0.06, 0.1, 0.2],
+        'num_leaves': [15, 31, 63],
+        'min_child_samples': [10, 20, 50],
+        'reg_lambda': [0.0, 0.1, 1.0],
+    },
+    'xgboost': {
+        'learning_rate': [0.03, 0.06, 0.1, 0.2],
+        'max_depth': [3, 5, 8],
+        'min_child_weight': [1, 5, 10],
+        'reg_lambda': [0.0, 1.0, 5.0],
+    },
+}
+
+# Parameter holding the number of boosting iterations
+ITERATION_PARAMS = {'hist_gb': 'max_iter', 'lightgbm': 'n_estimators', 'xgboost': 'n_estimators'}
+
+# Filenames and summary names used by notebook 03 for the selected model
+BEST_MODEL_FILES = {
+    'linear': ('linear', 'best_model_linear.pkl'),
+    'elastic_net': ('linear', 'best_model_linear.pkl'),
+    'hist_gb': ('gradient_boosting', 'best_model_gb.pkl'),
+    'lightgbm': ('lightgbm', 'best_model_lightgbm.pkl'),
+    'xgboost': ('xgboost', 'best_model_xgboost.pkl'),
+}
+
+
+def sample_candidates(search_space: Dict[str, List[Any]],
+                      n_candidates: int,
+                      random_state: int = 42) -> List[Dict[str, Any]]:
+    """
+    Draw distinct parameter combinations from a grid.
+
+    Args:
+        search_space: Mapping from parameter name to candidate values.
+        n_candidates: Number of combinations to draw.
+        random_state: Seed for the draw.
+
+    Returns:
+        List of parameter dictionaries; the whole grid if it is smaller
+        than n_candidates.
+    """
+    names = list(search_space)
+    grid = list(itertools.product(*(search_space[name] for name in names)))
+    if len(grid) > n_candidates:
+        rng = np.random.default_rng(random_state)
+        grid = [grid[i] for i in sorted(rng.choice(len(grid), n_candidates, replace=False))]
+    return [dict(zip(names, values)) for values in grid]
+
+
+def _fit_candidate(X_train: np.ndarray,
+                   y_train: np.ndarray,
+                   X_val: np.ndarray,
+                   model_type: str,
+                   params: Dict[str, Any]) -> Dict[str, Any]:
+    """Fit one candidate and return its validation predictions and cost."""
+    import warnings
+    from .models import train_linear_model, train_nonlinear_model
+    from .training import MODEL_TYPES
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    family, model_type = MODEL_TYPES[model_type]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        if family == 'linear':
+            model = train_linear_model(X_train, y_train, model_type=model_type, **params)
+        else:
+            model = train_nonlinear_model(X_train, y_train, model_type=model_type, **params)
+        y_pred = model.predict(X_val)
+
+    return {
+        'y_pred': y_pred,
+        'fit_s': time.perf_counter() - wall_start,
+        'cpu_s': time.process_time() - cpu_start,
+    }
+
+
+def successive_halving(X_train: np.ndarray,
+                       y_train: np.ndarray,
+                       X_val: np.ndarray,
+                       y_val: np.ndarray,
+                       model_type: str,
+                       candidates: List[Dict[str, Any]],
+                       eta: int = 3,
+                       max_iterations: int = 300,
+                       min_samples: int = 200,
+                       min_iterations: int = 20,
+                       budget_s: Optional[float] = None,
+                       budget_type: str = 'wall',
+                       n_jobs: int = -1,
+                       random_state: int = 42) -> Dict[str, Any]:
+    """
+    Select the best candidate of one model type with successive halving.
+
+    Rung r of R fits the surviving candidates on the first
+    n_train × eta^(r - R + 1) rows of a fixed shuffle and, for boosting
+    models, max_iterations × eta^(r - R + 1) iterations, then keeps the
+    best 1/eta by validation MAE. R is chosen so the last rung still
+    compares several candidates: a rung fitting a lone survivor would
+    only repeat the caller's final refit. A rung is skipped when its
+    projected cost exceeds the remaining budget; the first rung always
+    runs.
+
+    The same validation split ranks the candidates and gives 'val_mae',
+    so that score is optimistic; use a held-out split to report accuracy.
+
+    Args:
+        X_train: Training features (raw or pre-binned).
+        y_train: Training target.
+        X_val: Validation features, in the same representation as X_train.
+        y_val: Validation target.
+        model_type: Any of SEARCH_SPACES.
+        candidates: Parameter dictionaries, e.g. from sample_candidates.
+        eta: Halving rate.
+        max_iterations: Boosting iterations in the last rung.
+        min_samples: Minimum training rows per fit.
+        min_iterations: Minimum boosting iterations per fit.
+        budget_s: Optional budget in seconds for this search.
+        budget_type: 'wall' for elapsed time or 'cpu' for the summed CPU
+                    time of the fits.
+        n_jobs: Number of parallel workers (-1 uses all cores).
+        random_state: Seed for the row shuffle.
+
+    Returns:
+        Dictionary with 'params' (best parameters, including iterations),
+        'val_mae' (its MAE in the last completed rung) and 'history'
+        (list of per-fit records).
+    """
+    from joblib import Parallel, delayed
+
+    if budget_type not in ('wall', 'cpu'):
+        raise ValueError(f"Unknown budget type: {budget_type}. Use 'wall' or 'cpu'.")
+    if not candidates:
+        raise ValueError("No candidates to evaluate")
+
+    iteration_param = ITERATION_PARAMS.get(model_type)
+    n_train = len(y_train)
+    n_rungs = max(1, int(math.floor(math.log(len(candidates), eta) + 1e-9)))
+    order = np.random.default_rng(random_state).permutation(n_train)
+    # Next rung cost relative to the last: each fit gets eta times the rows
+    # (and iterations for boosting) while 1/eta as many candidates run
+    growth = eta ** (2 if iteration_param else 1) / eta
+
+    start = time.perf_counter()
+    spent = 0.0
+    last_cost = None
+    history = []
+    survivors = [(i, dict(params)) for i, params in enumerate(candidates)]
+
+    for rung in range(n_rungs):
+        if last_cost is not None and budget_s is not None and spent + last_cost * growth > budget_s:
+            print(f"  {model_type}: budget reached after {rung} rungs")
+            break
+
+        shrink = float(eta) ** (rung - n_rungs + 1)
+        n_samples = min(n_train, max(min_samples, int(n_train * shrink)))
+        rows = order[:n_samples]
+        X_rung, y_rung = X_train[rows], y_train[rows]
+        fit_params = []
+        for _, params in survivors:
+            params = dict(params)
+            if iteration_param:
+                params[iteration_param] = max(min_iterations, int(max_iterations * shrink))
+            fit_params.append(params)
+
+        rung_start = time.perf_counter()
+        outputs = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_candidate)(X_rung, y_rung, X_val, model_type, params)
+            for params in fit_params
+        )
+        rung_wall = time.perf_counter() - rung_start
+        rung_cpu = sum(output['cpu_s'] for output in outputs)
+        last_cost = rung_wall if budget_type == 'wall' else rung_cpu
+        spent = time.perf_counter() - start if budget_type == 'wall' else spent + rung_cpu
+
+        scores = []
+        for (candidate, _), params, output in zip(survivors, fit_params, outputs):
+            val_mae = float(np.mean(np.abs(output['y_pred'] - y_val)))
+            scores.append(val_mae)
+            history.append({'model_type': model_type, 'rung': rung, 'candidate': candidate,
+                            'n_samples': n_samples, 'params': params, 'val_mae': val_mae,
+                            'fit_s': output['fit_s'], 'cpu_s': output['cpu_s']})
+
+        ranked = np.argsort(scores, kind='stable')
+        best_index = ranked[0]
+        best = (fit_params[best_index], scores[best_index])
+        n_keep = max(1, len(survivors) // eta)
+        survivors = [survivors[i] for i in ranked[:n_keep]]
+
+    best_params, best_mae = best
+    if iteration_param:
+        # The selected configuration is refitted with the full iteration count
+        best_params = dict(best_params, **{iteration_param: max_iterations})
+
+    return {'params': best_params, 'val_mae': best_mae, 'history': history}
+
+
+def tune_organ_clocks(organ_splits: Dict[str, Dict[str, Any]],
+                      model_types: List[str] = ('elastic_net', 'hist_gb'),
+                      search_spaces: Optional[Dict[str, Dict[str, List[Any]]]] = None,
+                      n_candidates: int = 27,
+                      eta: int = 3,
+                      max_iterations: int = 300,
+                      budget_s: Optional[float] = 300.0,
+                      budget_type: str = 'wall',
+                      n_jobs: int = -1,
+                      prebin: bool = True,
+                      random_state: int = 42,
+                      save_dir: Optional[str] = "models",
+                      binned: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Tune every organ clock, select the best model per organ and save it.
+
+    For each organ, the budget is split evenly between the model types.
+    Each type is searched with successive_halving on the training split
+    and scored on the validation split. The best configuration of each
+    type is then refitted on the full (raw) training split, and the type
+    with the lowest validation MAE becomes the organ's best model. Since
+    the validation split drives both the search and this choice, the
+    reported validation metrics are optimistic; pass 'X_test'/'y_test'
+    for an unbiased estimate. The best model is
+    saved as '<save_dir>/<organ>/best_model_<kind>.pkl' (same names as
+    notebook 03), and 'best_models_summary.json' is updated for those
+    organs, so OrganClockEnsemble.from_models_dir and
+    bundle.export_model_bundle pick the tuned models up directly.
+
+    Args:
+        organ_splits: Dictionary mapping organs to split dictionaries with
+                     'X_train', 'y_train', 'X_val', 'y_val' and optionally
+                     'X_test', 'y_test' (DataFrames or store.OrganView),
+                     scaled as the clocks will be at inference.
+        model_types: Model types to search, any of SEARCH_SPACES.
+        search_spaces: Optional overrides of SEARCH_SPACES per model type.
+        n_candidates: Candidates drawn per model type.
+        eta: Halving rate.
+        max_iterations: Boosting iterations of the final rung and refit.
+        budget_s: Budget in seconds per organ, or None for no limit.
+        budget_type: 'wall' or 'cpu'.
+        n_jobs: Number of parallel workers per rung (-1 uses all cores).
+        prebin: Whether tree candidates share pre-binned features.
+        random_state: Seed for candidate sampling and subsampling.
+        save_dir: Models directory to write to, or None to only return results.
+        binned: Optional binning.BinnedDataset of the cohort. Tree candidates
+               then take their codes from it instead of binning each
+               organ's training split.
+
+    Returns:
+        Dictionary with:
+            'summary': DataFrame with one row per (organ, model_type) and
+                      its tuned parameters, validation and test metrics
+                      and whether it was selected.
+            'history': DataFrame with one row per candidate fit.
+            'models': {organ: selected fitted model}.
+
+    Example:
+        >>> results = tune_organ_clocks(organ_splits, ['elastic_net', 'hist_gb'], budget_s=120)
+        >>> print(results['summary'][['organ', 'model_type', 'val_mae', 'selected']])
+    """
+    from .binning import apply_bins, codes_to_float, fit_bin_edges
+    from .evaluation import calculate_metrics
+    from .models import save_model
+    from .training import _importance_metadata
+
+    search_spaces = {**SEARCH_SPACES, **(search_spaces or {})}
+    unknown = [m for m in model_types if m not in search_spaces or m not in BEST_MODEL_FILES]
+    if unknown:
+        raise ValueError(f"Unknown model types: {unknown}. Choose from {list(SEARCH_SPACES)}")
+    tree_models = set(ITERATION_PARAMS)
+
+    summary_rows = []
+    history = []
+    best_models = {}
+    best_entries = {}
+
+    for organ, splits in organ_splits.items():
+        features = list(getattr(splits['X_train'], 'columns', []))
+        X_train = np.asarray(splits['X_train'], dtype=np.float64)
+        y_train = np.asarray(splits['y_train'], dtype=np.float64)
+        X_val = np.asarray(splits['X_val'], dtype=np.float64)
+        y_val = np.asarray(splits['y_val'], dtype=np.float64)
+
+        binned_splits = None
+        if prebin and tree_models.intersection(model_types):
+            if binned is not None:
+                binned_splits = (binned.for_data(splits['X_train']), binned.for_data(splits['X_val']))
+            else:
+                edges = fit_bin_edges(X_train)
+                binned_splits = (codes_to_float(apply_bins(X_train, edges)),
+                                 codes_to_float(apply_bins(X_val, edges)))
+
+        print(f"Tuning {organ}: {len(y_train)} training rows, {', '.join(model_types)}")
+        type_budget = None if budget_s is None else budget_s / len(model_types)
+
+        organ_rows = []
+        fitted = {}
+        for model_type in model_types:
+            candidates = sample_candidates(search_spaces[model_type], n_candidates, random_state)
+            if binned_splits is not None and model_type in tree_models:
+                X_fit, X_score = binned_splits
+            else:
+                X_fit, X_score = X_train, X_val
+            result = successive_halving(
+                X_fit, y_train, X_score, y_val, model_type, candidates,
+                eta=eta, max_iterations=max_iterations, budget_s=type_budget,
+                budget_type=budget_type, n_jobs=n_jobs, random_state=random_state
+            )
+            history.extend({'organ': organ, **record} for record in result['history'])
+
+            model = _refit(X_train, y_train, model_type, result['params'])
+            metrics = {'val': calculate_metrics(y_val, model.predict(X_val))}
+            if 'X_test' in splits:
+                metrics['test'] = calculate_metrics(np.asarray(splits['y_test'], dtype=np.float64),
+                                                    model.predict(np.asarray(splits['X_test'],
+                                                                             dtype=np.float64)))
+            fitted[model_type] = (model, result['params'], metrics)
+            organ_rows.append({
+                'organ': organ, 'model_type': model_type, 'params': result['params'],
+                'search_val_mae': result['val_mae'],
+                'n_fits': len(result['history']),
+                **{f'{split}_{name}': value for split, split_metrics in metrics.items()
+                   for name, value in split_metrics.items()},
+            })
+
+        best_type = min(fitted, key=lambda m: fitted[m][2]['val']['mae'])
+        for row in organ_rows:
+            row['selected'] = row['model_type'] == best_type
+        summary_rows.extend(organ_rows)
+
+        model, params, metrics = fitted[best_type]
+        best_models[organ] = model
+        kind, filename = BEST_MODEL_FILES[best_type]
+        best_entries[organ] = {
+            'model_type': kind,
+            'tuned_model_type': best_type,
+            'params': params,
+            'selection_criterion': 'lowest_val_mae',
+            **{f'{split}_{name}': value for split, split_metrics in metrics.items()
+               for name, value in split_metrics.items()},
+            'filename': filename,
+        }
+        print(f"  ✓ {organ}: {best_type} (val MAE {metrics['val']['mae']:.2f})")
+
+        if save_dir is not None:
+            metadata = {
+                'organ': organ,
+                'model_type': kind,
+                'selection_criterion': 'lowest_val_mae',
+                'features': features,
+                'n_features': len(features),
+                'params': params,
+                'metrics': metrics,
+            }
+            if best_type in tree_models and features:
+                metadata['feature_importance'] = _importance_metadata(model, features)
+            save_model(model, Path(save_dir) / organ / filename, metadata=metadata)
+
+    if save_dir is not None:
+        _update_best_models_summary(Path(save_dir), best_entries)
+
+    return {
+        'summary': pd.DataFrame(summary_rows),
+        'history': pd.DataFrame(history),
+        'models': best_models,
+    }
+
+
+def _refit(X_train: np.ndarray, y_train: np.ndarray, model_type: str, params: Dict[str, Any]) -> Any:
+    """Refit a tuned configuration on the full raw training split."""
+    from .models import train_linear_model, train_nonlinear_model
+    from .training import MODEL_TYPES
+
+    family, model_type = MODEL_TYPES[model_type]
+    if family == 'linear':
+        return train_linear_model(X_train, y_train, model_type=model_type, **params)
+    return train_nonlinear_model(X_train, y_train, model_type=model_type, **params)
+
+
+def _update_best_models_summary(save_dir: Path, entries: Dict[str, Dict[str, Any]]) -> None:
+    """Merge new best-model entries into best_models_summary.json."""
+    summary_path = save_dir / "best_models_summary.json"
+    summary = {'best_models': {}}
+    if summary_path.exists():
+        with open(summary_path, 'r') as f:
+            summary = json.load(f)
+    summary.setdefault('best_models', {}).update(entries)
+
+    save_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = summary_path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(summary, f, indent=2, default=float)
+    tmp_path.replace(summary_path)
+    print(f"Best models summary saved to {summary_path}")
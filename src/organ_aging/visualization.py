@@ -7,14 +7,12 @@ and other aspects of organ aging analysis.
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from typing import List, Optional, Tuple, Dict
 
 
 def plot_age_gap_distribution(df: pd.DataFrame,
                               gap_columns: Optional[List[str]] = None,
-                              figsize: Tuple[int, int] = (12, 8)) -> plt.Figure:
+                              figsize: Tuple[int, int] = (12, 8)) -> "plt.Figure":
     """
     Plot distribution of age gaps for all organs.
 
@@ -30,6 +28,8 @@ def plot_age_gap_distribution(df: pd.DataFrame,
         >>> fig = plot_age_gap_distribution(df)
         >>> plt.show()
     """
+    import matplotlib.pyplot as plt
+
     if gap_columns is None:
         gap_columns = [col for col in df.columns if col.endswith('_age_gap')]
 
@@ -68,7 +68,7 @@ def plot_age_gap_distribution(df: pd.DataFrame,
 
 def plot_gap_correlation_heatmap(corr_matrix: pd.DataFrame,
                                  figsize: Tuple[int, int] = (10, 8),
-                                 cmap: str = 'coolwarm') -> plt.Figure:
+                                 cmap: str = 'coolwarm') -> "plt.Figure":
     """
     Plot heatmap of correlations between organ age gaps.
 
@@ -85,6 +85,9 @@ def plot_gap_correlation_heatmap(corr_matrix: pd.DataFrame,
         >>> fig = plot_gap_correlation_heatmap(corr)
         >>> plt.show()
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     # Clean up labels
     labels = [col.replace('_age_gap', '').replace('_', ' ').title()
               for col in corr_matrix.columns]
@@ -105,7 +108,7 @@ def plot_gap_correlation_heatmap(corr_matrix: pd.DataFrame,
 def plot_gaps_vs_age(df: pd.DataFrame,
                     gap_columns: Optional[List[str]] = None,
                     age_col: str = 'AGE',
-                    figsize: Tuple[int, int] = (14, 10)) -> plt.Figure:
+                    figsize: Tuple[int, int] = (14, 10)) -> "plt.Figure":
     """
     Plot age gaps vs chronological age for all organs.
 
@@ -122,6 +125,8 @@ def plot_gaps_vs_age(df: pd.DataFrame,
         >>> fig = plot_gaps_vs_age(df)
         >>> plt.show()
     """
+    import matplotlib.pyplot as plt
+
     if gap_columns is None:
         gap_columns = [col for col in df.columns if col.endswith('_age_gap')]
 
@@ -152,7 +157,7 @@ def plot_gaps_vs_age(df: pd.DataFrame,
 
 
 def plot_trajectory(trajectory_data: Dict[str, pd.DataFrame],
-                   figsize: Tuple[int, int] = (12, 8)) -> plt.Figure:
+                   figsize: Tuple[int, int] = (12, 8)) -> "plt.Figure":
     """
     Plot pseudo-longitudinal trajectories for organ age gaps.
 
@@ -168,6 +173,8 @@ def plot_trajectory(trajectory_data: Dict[str, pd.DataFrame],
         >>> fig = plot_trajectory(trajectories)
         >>> plt.show()
     """
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=figsize)
 
     for organ_name, trajectory_df in trajectory_data.items():
@@ -196,7 +203,7 @@ def plot_individual_profile(df: pd.DataFrame,
                            gap_columns: Optional[List[str]] = None,
                            id_col: str = 'SEQN',
                            age_col: str = 'AGE',
-                           figsize: Tuple[int, int] = (10, 6)) -> plt.Figure:
+                           figsize: Tuple[int, int] = (10, 6)) -> "plt.Figure":
     """
     Plot organ aging profile for a single individual.
 
@@ -215,6 +222,8 @@ def plot_individual_profile(df: pd.DataFrame,
         >>> fig = plot_individual_profile(df, individual_id=12345)
         >>> plt.show()
     """
+    import matplotlib.pyplot as plt
+
     if gap_columns is None:
         gap_columns = [col for col in df.columns if col.endswith('_age_gap')]
 
@@ -250,7 +259,7 @@ def plot_individual_profile(df: pd.DataFrame,
 
 def plot_model_comparison(comparison_df: pd.DataFrame,
                          metric: str = 'mae',
-                         figsize: Tuple[int, int] = (10, 6)) -> plt.Figure:
+                         figsize: Tuple[int, int] = (10, 6)) -> "plt.Figure":
     """
     Plot comparison of model performance across organs.
 
@@ -267,6 +276,8 @@ def plot_model_comparison(comparison_df: pd.DataFrame,
         >>> fig = plot_model_comparison(comparison, metric='mae')
         >>> plt.show()
     """
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=figsize)
 
     if metric not in comparison_df.columns:
@@ -0,0 +1,82 @@
+"""Shared fixtures: a synthetic cohort and organ clocks trained on it."""
+import json
+import pytest
+import joblib
+import pandas as pd
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+from src.organ_aging.models import train_linear_model, train_nonlinear_model, save_model
+
+
+ORGAN_FEATURES = {
+    'liver': ['ALT', 'AST', 'BMI'],
+    'kidney': ['CREAT', 'BUN', 'BMI'],
+}
+
+
+def _make_cohort(n=200):
+    """Create a synthetic cohort with all organ features."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'SEQN': np.arange(n),
+        'AGE': rng.integers(18, 80, n).astype(float),
+        'ALT': rng.normal(25, 5, n),
+        'AST': rng.normal(22, 4, n),
+        'CREAT': rng.normal(0.9, 0.2, n),
+        'BUN': rng.normal(14, 3, n),
+        'BMI': rng.normal(27, 4, n),
+    })
+    df['AST'] += 0.2 * df['AGE']
+    df['CREAT'] += 0.01 * df['AGE']
+    return df
+
+
+@pytest.fixture
+def make_cohort():
+    """Builder of synthetic cohorts, for tests that need a given size."""
+    return _make_cohort
+
+
+@pytest.fixture
+def cohort():
+    """Synthetic cohort of 200 participants with all organ features."""
+    return _make_cohort()
+
+
+@pytest.fixture
+def organ_clocks(tmp_path, cohort):
+    """
+    Models directory with one scaled clock per organ, as notebook 03 saves them.
+
+    The liver clock is a HistGradientBoosting model, the kidney clock a
+    linear model. Returns (models_dir, reference) where reference maps each
+    organ to the predictions of its pickled model on the cohort.
+    """
+    models_dir = tmp_path / "models"
+    reference = {}
+    summary = {'best_models': {}}
+
+    for organ, features in ORGAN_FEATURES.items():
+        X = cohort[features].astype(np.float32)
+        scaler = StandardScaler().fit(X)
+        X_scaled = pd.DataFrame(scaler.transform(X), columns=features)
+
+        if organ == 'liver':
+            model = train_nonlinear_model(X_scaled, cohort['AGE'], model_type='hist_gb', max_iter=20)
+            filename = "best_model_gb.pkl"
+        else:
+            model = train_linear_model(X_scaled, cohort['AGE'])
+            filename = "best_model_linear.pkl"
+
+        save_model(model, models_dir / organ / filename, metadata={'features': features})
+        (models_dir / "scalers").mkdir(parents=True, exist_ok=True)
+        joblib.dump(scaler, models_dir / "scalers" / f"{organ}_scaler.pkl")
+
+        summary['best_models'][organ] = {'filename': filename}
+        X_ref = pd.DataFrame(scaler.transform(X.astype(np.float64)), columns=features)
+        reference[organ] = model.predict(X_ref)
+
+    with open(models_dir / "best_models_summary.json", 'w') as f:
+        json.dump(summary, f)
+
+    return models_dir, reference
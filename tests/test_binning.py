@@ -0,0 +1,152 @@
+"""Tests for binning module."""
+import pytest
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor
+from src.organ_aging import binning
+from src.organ_aging.binning import (MISSING_CODE, BinnedDataset, apply_bins, clear_binned_cache,
+                                     codes_to_float, fit_bin_edges)
+from src.organ_aging.models import load_model
+from src.organ_aging.store import FeatureStore
+from src.organ_aging.training import train_organs_parallel
+from src.organ_aging.trees import FlatTreeEnsemble
+
+
+class TestBinning:
+    """Test shared feature binning."""
+
+    def test_codes_preserve_order_and_missing(self):
+        """Test that bin codes are monotone in the raw values and keep NaN."""
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(1000, 3))
+        X[::7, 1] = np.nan
+
+        codes = apply_bins(X, fit_bin_edges(X, max_bins=32))
+
+        assert codes.dtype == np.uint8
+        assert (codes[::7, 1] == MISSING_CODE).all()
+        order = np.argsort(X[:, 0])
+        assert (np.diff(codes[order, 0].astype(int)) >= 0).all()
+        assert codes[:, 0].max() < 32
+        assert np.isnan(codes_to_float(codes)[::7, 1]).all()
+
+    def test_fit_on_codes_matches_fit_on_low_cardinality_data(self):
+        """Test that codes give the same model when every value has its own bin."""
+        rng = np.random.default_rng(1)
+        X = rng.integers(0, 50, size=(500, 3)).astype(float)
+        X[rng.random(X.shape) < 0.05] = np.nan
+        y = X[:, 0] * 0.5 + rng.normal(size=500)
+        y[np.isnan(y)] = 0
+
+        X_codes = codes_to_float(apply_bins(X, fit_bin_edges(X)))
+        raw = HistGradientBoostingRegressor(max_iter=20, random_state=0).fit(X, y)
+        binned = HistGradientBoostingRegressor(max_iter=20, random_state=0).fit(X_codes, y)
+
+        np.testing.assert_allclose(binned.predict(X_codes), raw.predict(X), atol=1e-10)
+
+    def test_invalid_max_bins_raises(self):
+        """Test that max_bins outside [2, 255] raises ValueError."""
+        with pytest.raises(ValueError):
+            fit_bin_edges(np.zeros((5, 1)), max_bins=256)
+
+
+@pytest.fixture
+def binned_cohort():
+    """Cohort with continuous and missing features plus a target."""
+    n = 600
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(n, 4)), columns=['ALT', 'AST', 'CREAT', 'BMI'])
+    df.loc[::11, 'AST'] = np.nan
+    df['AGE'] = 50 + 8 * df['ALT'] - 5 * df['BMI'] + rng.normal(size=n)
+    df['SEQN'] = np.arange(1000, 1000 + n)
+    return df
+
+
+class TestBinnedDataset:
+    """Test the cohort-level binned dataset cache."""
+
+    def test_build_is_cached_in_memory_and_on_disk(self, tmp_path, binned_cohort):
+        """Test that rebuilding the same cohort reuses the cached codes."""
+        features = ['ALT', 'AST', 'CREAT', 'BMI']
+
+        binned = BinnedDataset.build(binned_cohort[features], cache_dir=str(tmp_path))
+        assert BinnedDataset.build(binned_cohort[features], cache_dir=str(tmp_path)) is binned
+        assert BinnedDataset.build(binned_cohort[features], max_bins=64).key != binned.key
+        assert (tmp_path / f"binned-{binned.key}.npz").exists()
+
+        clear_binned_cache()
+        restored = BinnedDataset.build(binned_cohort[features], cache_dir=str(tmp_path))
+        assert restored is not binned
+        np.testing.assert_array_equal(restored.codes(features), binned.codes(features))
+        for loaded, original in zip(restored.edges, binned.edges):
+            np.testing.assert_array_equal(loaded, original)
+
+    def test_memory_cache_is_bounded_and_clearable(self, monkeypatch, binned_cohort):
+        """Test that the in-memory cache evicts the least recently used cohort."""
+        monkeypatch.setattr(binning, '_BINNED_CACHE_SIZE', 2)
+        clear_binned_cache()
+        features = ['ALT', 'AST', 'CREAT', 'BMI']
+
+        first = BinnedDataset.build(binned_cohort[features], max_bins=16)
+        second = BinnedDataset.build(binned_cohort[features], max_bins=32)
+        assert BinnedDataset.build(binned_cohort[features], max_bins=16) is first
+        BinnedDataset.build(binned_cohort[features], max_bins=64)
+
+        assert len(binning._BINNED_CACHE) == 2
+        assert first.key in binning._BINNED_CACHE
+        assert second.key not in binning._BINNED_CACHE
+        clear_binned_cache()
+        assert not binning._BINNED_CACHE
+
+    def test_column_subsets_match_per_column_binning(self, binned_cohort):
+        """Test that organ subsets equal binning each column over the cohort."""
+        store = FeatureStore.from_frame(binned_cohort)
+        binned = BinnedDataset.build(store, columns=['ALT', 'AST', 'CREAT', 'BMI'])
+
+        X = binned_cohort.set_index('SEQN').iloc[::3][['BMI', 'AST']]
+        codes = binned.for_data(X, as_codes=True)
+
+        edges = fit_bin_edges(binned_cohort[['BMI', 'AST']].to_numpy(np.float32))
+        expected = apply_bins(X.to_numpy(np.float32), edges)
+        assert codes.dtype == np.uint8
+        np.testing.assert_array_equal(codes, expected)
+        np.testing.assert_array_equal(np.isnan(binned.for_data(X)), X.isna().to_numpy())
+
+        with pytest.raises(ValueError):
+            binned.for_data(X.rename(index=lambda seqn: seqn + 10 ** 6))
+
+    def test_code_model_exports_to_raw_feature_ensemble(self, binned_cohort):
+        """Test that thresholds mapped to raw values reproduce the code model."""
+        features = ['ALT', 'AST', 'CREAT', 'BMI']
+        binned = BinnedDataset.build(binned_cohort[features], max_bins=32)
+
+        model = HistGradientBoostingRegressor(max_iter=30, random_state=0)
+        model.fit(binned.matrix(features), binned_cohort['AGE'])
+        flat = FlatTreeEnsemble.from_hist_gb(model, bin_edges=binned.edges_for(features))
+
+        raw = binned_cohort[features].to_numpy()
+        np.testing.assert_allclose(flat.predict(raw), model.predict(binned.matrix(features)),
+                                   atol=1e-10)
+
+    def test_training_from_binned_codes_saves_raw_clock(self, tmp_path, binned_cohort):
+        """Test that pre-binned hist_gb jobs save clocks that score raw features."""
+        df = binned_cohort.set_index('SEQN')
+        features = ['ALT', 'AST', 'BMI']
+        binned = BinnedDataset.build(df[['ALT', 'AST', 'CREAT', 'BMI']])
+        organ_splits = {'liver': {
+            'X_train': df[features].iloc[:500], 'y_train': df['AGE'].iloc[:500],
+            'X_test': df[features].iloc[500:], 'y_test': df['AGE'].iloc[500:],
+        }}
+
+        report = train_organs_parallel(organ_splits, model_types=['hist_gb'], save_dir=str(tmp_path),
+                                       n_cores=1, model_params={'hist_gb': {'max_iter': 20}},
+                                       binned=binned)
+
+        assert list(report['status']) == ['trained']
+        model, metadata = load_model(str(tmp_path / "liver" / "hist_gb_model.pkl"),
+                                     return_metadata=True)
+        assert isinstance(model, FlatTreeEnsemble)
+        assert metadata['features'] == features
+        y_test = df['AGE'].iloc[500:].to_numpy()
+        mae = np.abs(model.predict(df[features].iloc[500:].to_numpy()) - y_test).mean()
+        assert mae == pytest.approx(metadata['metrics']['test']['mae'], rel=1e-9)
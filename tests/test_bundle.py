@@ -0,0 +1,73 @@
+"""Tests for bundle module."""
+import json
+import pytest
+import numpy as np
+from src.organ_aging.bundle import export_model_bundle, load_bundle, save_bundle
+from src.organ_aging.models import train_linear_model
+from src.organ_aging.scoring import OrganClock, OrganClockEnsemble
+
+
+class TestModelBundle:
+    """Test the content-addressed model bundle format."""
+
+    def test_bundle_scores_like_pickled_models(self, tmp_path, cohort, organ_clocks):
+        """Test that a bundle reproduces the pickled ensemble's scores."""
+        models_dir, _ = organ_clocks
+        bundle_dir = tmp_path / "bundle"
+
+        export_model_bundle(str(models_dir), str(bundle_dir), panels={'liver': ['ALT', 'AST']})
+
+        expected = OrganClockEnsemble.from_models_dir(str(models_dir)).score(cohort)
+        result = OrganClockEnsemble.from_bundle(str(bundle_dir)).score(cohort)
+
+        for organ in ['liver', 'kidney']:
+            np.testing.assert_allclose(result[f'{organ}_age_bio'], expected[f'{organ}_age_bio'],
+                                       rtol=1e-10)
+
+        clocks = {clock.organ: clock for clock in load_bundle(str(bundle_dir))}
+        assert clocks['liver'].metadata['panel'] == ['ALT', 'AST']
+        # Memory-mapped read-only, not copied into process memory
+        assert not clocks['liver'].model.value.flags.writeable
+
+    def test_duplicate_arrays_stored_once(self, tmp_path, organ_clocks):
+        """Test that exporting the same models twice adds no new blobs."""
+        models_dir, _ = organ_clocks
+        bundle_dir = tmp_path / "bundle"
+
+        export_model_bundle(str(models_dir), str(bundle_dir))
+        n_blobs = len(list((bundle_dir / "blobs").glob("*.npy")))
+        export_model_bundle(str(models_dir), str(bundle_dir))
+
+        assert len(list((bundle_dir / "blobs").glob("*.npy"))) == n_blobs
+        assert not list(bundle_dir.rglob("*.pkl"))
+
+    def test_unsupported_version_and_corrupt_blob(self, tmp_path, organ_clocks):
+        """Test that unknown format versions and tampered blobs are rejected."""
+        models_dir, _ = organ_clocks
+        bundle_dir = tmp_path / "bundle"
+        manifest_path = export_model_bundle(str(models_dir), str(bundle_dir))
+
+        blob = next((bundle_dir / "blobs").glob("*.npy"))
+        data = blob.read_bytes()
+        blob.write_bytes(data[:-1] + bytes([data[-1] ^ 0xFF]))
+        with pytest.raises(ValueError):
+            load_bundle(str(bundle_dir), verify=True)
+
+        manifest = json.loads(manifest_path.read_text())
+        manifest['format_version'] = 99
+        manifest_path.write_text(json.dumps(manifest))
+        with pytest.raises(ValueError):
+            load_bundle(str(bundle_dir))
+
+    def test_imputing_linear_clock_scores_missing_rows(self, tmp_path, cohort):
+        """Test that a NaN-tolerant linear pipeline bundles with its impute values."""
+        features = ['CREAT', 'BUN', 'BMI']
+        X = cohort[features].copy()
+        X.loc[::5, 'BUN'] = np.nan
+        model = train_linear_model(X, cohort['AGE'])
+
+        save_bundle([OrganClock('kidney', model, features)], str(tmp_path / "bundle"))
+        clock = load_bundle(str(tmp_path / "bundle"))[0]
+
+        assert clock.handles_missing
+        np.testing.assert_allclose(clock.predict(X.to_numpy()), model.predict(X), rtol=1e-10)
@@ -2,7 +2,15 @@
 import pytest
 import pandas as pd
 import numpy as np
-from src.organ_aging.data_loading import load_nhanes_tables, merge_nhanes_tables
+from src.organ_aging.data_loading import (
+    load_nhanes_tables,
+    merge_nhanes_tables,
+    iter_table_chunks,
+    iter_merged_chunks,
+    compact_dtypes,
+    memory_report
+)
+from src.organ_aging.preprocessing import PreprocessingPipeline
 
 
 class TestDataLoading:
@@ -77,3 +85,183 @@ class TestDataLoading:
         assert isinstance(result, pd.DataFrame)
         # Inner join should only have overlapping SEQN
         assert len(result) >= 2
+
+    def test_merge_nhanes_tables_keeps_string_and_bool_columns(self):
+        """Test that string and bool columns survive inner, left and outer joins."""
+        tables = {
+            "demographics": pd.DataFrame({
+                'SEQN': [1, 2, 3],
+                'SDDSRVYR': pd.array(['J', 'J', 'J'], dtype='str'),
+                'EXAMINED': [True, False, True]
+            }),
+            "biochemistry": pd.DataFrame({
+                'SEQN': [2, 3, 4],
+                'LBXSATSI': [25.0, 30.0, 35.0]
+            })
+        }
+
+        inner = merge_nhanes_tables(tables)
+        assert list(inner['SDDSRVYR']) == ['J', 'J']
+        assert inner['EXAMINED'].dtype == bool
+
+        outer = merge_nhanes_tables(tables, how='outer')
+        assert outer['SDDSRVYR'].dtype == tables['demographics']['SDDSRVYR'].dtype
+        assert outer['SDDSRVYR'].isna().tolist() == [False, False, False, True]
+        assert outer['EXAMINED'].dtype == 'boolean'
+        assert outer['EXAMINED'].tolist()[:3] == [True, False, True]
+        assert outer['EXAMINED'].isna().tolist()[3]
+
+    def test_iter_table_chunks_reads_csv_and_parquet(self, tmp_path):
+        """Test chunked reading of CSV and Parquet files."""
+        df = pd.DataFrame({'seqn': np.arange(25), 'alt': np.arange(25) * 1.5})
+        df.to_csv(tmp_path / "BIO.csv", index=False)
+        df.to_parquet(tmp_path / "BIO.parquet", index=False)
+
+        for filename in ["BIO.csv", "BIO.parquet"]:
+            chunks = list(iter_table_chunks(tmp_path / filename, chunksize=10))
+            assert [len(c) for c in chunks] == [10, 10, 5]
+            assert list(chunks[0].columns) == ['SEQN', 'ALT']
+
+    def test_iter_merged_chunks_matches_full_merge(self, tmp_path):
+        """Test that the streaming join equals the in-memory inner merge."""
+        rng = np.random.default_rng(0)
+        demo = pd.DataFrame({'SEQN': np.arange(100), 'AGE': rng.integers(18, 80, 100)})
+        bio_seqn = np.sort(rng.choice(120, 70, replace=False))
+        bio = pd.DataFrame({'SEQN': bio_seqn, 'ALT': rng.normal(25, 5, 70)})
+        cbc_seqn = np.sort(rng.choice(100, 90, replace=False))
+        cbc = pd.DataFrame({'SEQN': cbc_seqn, 'WBC': rng.normal(7, 1, 90)})
+
+        demo.to_csv(tmp_path / "DEMO.csv", index=False)
+        bio.to_csv(tmp_path / "BIO.csv", index=False)
+        cbc.to_parquet(tmp_path / "CBC.parquet", index=False)
+
+        paths_config = {
+            "raw_data_dir": str(tmp_path),
+            "nhanes_files": {"demographics": "DEMO.csv", "biochemistry": "BIO.csv", "cbc": "CBC.parquet"}
+        }
+
+        streamed = pd.concat(iter_merged_chunks(paths_config, chunksize=7), ignore_index=True)
+        expected = merge_nhanes_tables({'demographics': demo, 'biochemistry': bio, 'cbc': cbc})
+
+        pd.testing.assert_frame_equal(streamed, expected.reset_index(drop=True), check_dtype=False)
+
+    def test_iter_merged_chunks_rejects_unsorted_table(self, tmp_path):
+        """Test that an unsorted table raises ValueError."""
+        pd.DataFrame({'SEQN': [1, 2, 3], 'AGE': [25, 35, 45]}).to_csv(tmp_path / "DEMO.csv", index=False)
+        pd.DataFrame({'SEQN': [3, 1, 2], 'ALT': [20, 25, 30]}).to_csv(tmp_path / "BIO.csv", index=False)
+
+        paths_config = {
+            "raw_data_dir": str(tmp_path),
+            "nhanes_files": {"demographics": "DEMO.csv", "biochemistry": "BIO.csv"}
+        }
+
+        with pytest.raises(ValueError):
+            list(iter_merged_chunks(paths_config, chunksize=2))
+
+    def test_load_nhanes_tables_uses_parquet_cache(self, tmp_path):
+        """Test that parsed tables are cached and invalidated on change."""
+        raw_dir = tmp_path / "raw"
+        raw_dir.mkdir()
+        pd.DataFrame({'seqn': [1, 2, 3], 'age': [25, 35, 45]}).to_csv(raw_dir / "DEMO.csv", index=False)
+        pd.DataFrame({'seqn': [1, 2, 3], 'alt': [20.5, 25.0, 30.5]}).to_csv(raw_dir / "BIO.csv", index=False)
+
+        paths_config = {
+            "raw_data_dir": str(raw_dir),
+            "cache_dir": str(tmp_path / "cache"),
+            "nhanes_files": {"demographics": "DEMO.csv", "biochemistry": "BIO.csv"}
+        }
+
+        cold = load_nhanes_tables(paths_config, n_jobs=2)
+        assert len(list((tmp_path / "cache").glob("*.parquet"))) == 2
+
+        warm = load_nhanes_tables(paths_config)
+        for name in cold:
+            pd.testing.assert_frame_equal(cold[name], warm[name])
+        assert list(warm.keys()) == ["demographics", "biochemistry"]
+
+        # Changing the source file must invalidate its cache entry
+        pd.DataFrame({'seqn': [1, 2], 'age': [50, 60]}).to_csv(raw_dir / "DEMO.csv", index=False)
+        reloaded = load_nhanes_tables(paths_config, n_jobs=1)
+        assert reloaded["demographics"]['AGE'].tolist() == [50, 60]
+        assert len(list((tmp_path / "cache").glob("*.parquet"))) == 2
+
+    def test_merge_nhanes_tables_join_policies_and_match_rates(self):
+        """Test inner, left and outer policies and reported match rates."""
+        tables = {
+            "demographics": pd.DataFrame({'SEQN': [3, 1, 2], 'AGE': [45, 25, 35]}),
+            "biochemistry": pd.DataFrame({'SEQN': [2, 3, 4], 'ALT': [25, 30, 35]})
+        }
+
+        inner = merge_nhanes_tables(tables, how='inner')
+        assert inner['SEQN'].tolist() == [3, 2]
+        assert inner['ALT'].tolist() == [30, 25]
+        assert inner.attrs['match_rates']['biochemistry']['n_matched'] == 2
+
+        left = merge_nhanes_tables(tables, how='left')
+        assert left['SEQN'].tolist() == [3, 1, 2]
+        assert np.isnan(left.loc[1, 'ALT'])
+
+        outer = merge_nhanes_tables(tables, how='outer')
+        assert outer['SEQN'].tolist() == [1, 2, 3, 4]
+        assert outer.attrs['match_rates']['demographics']['match_rate'] == 1.0
+
+    def test_merge_nhanes_tables_rejects_duplicate_seqn(self):
+        """Test that duplicate SEQN values raise ValueError."""
+        tables = {
+            "demographics": pd.DataFrame({'SEQN': [1, 1], 'AGE': [25, 35]}),
+            "biochemistry": pd.DataFrame({'SEQN': [1, 2], 'ALT': [25, 30]})
+        }
+
+        with pytest.raises(ValueError):
+            merge_nhanes_tables(tables)
+
+    def test_compact_dtypes_downcasts_labs_and_codes(self):
+        """Test that labs become float32, codes categoricals and SEQN a small int."""
+        rng = np.random.default_rng(0)
+        n = 500
+        df = pd.DataFrame({
+            'SEQN': np.arange(n, dtype=float) + 83732,
+            'RIAGENDR': rng.choice([1.0, 2.0], n),
+            'LBXSATSI': np.round(rng.normal(25, 5, n), 1),
+            'LBXPLTSI': rng.integers(150, 400, n).astype(float),
+            'BIGCOUNT': rng.integers(2 ** 25, 2 ** 26, n).astype(float) + 1,
+        })
+        df.loc[::9, 'LBXSATSI'] = np.nan
+
+        compacted, report = compact_dtypes(df)
+
+        assert compacted['SEQN'].dtype == np.int32
+        assert isinstance(compacted['RIAGENDR'].dtype, pd.CategoricalDtype)
+        assert compacted['LBXSATSI'].dtype == np.float32
+        assert compacted['LBXPLTSI'].dtype == np.float32
+        # Integers beyond float32's exact range keep float64
+        assert compacted['BIGCOUNT'].dtype == np.float64
+        assert compacted['LBXSATSI'].isna().sum() == df['LBXSATSI'].isna().sum()
+        assert report['mb_after'].sum() < report['mb_before'].sum()
+        assert list(report.index) == list(df.columns)
+
+    def test_compacted_codes_keep_dummy_names(self):
+        """Test that categorical codes still encode to 'RIAGENDR_2.0' style columns."""
+        rng = np.random.default_rng(1)
+        df = pd.DataFrame({
+            'SEQN': np.arange(100, dtype=float),
+            'RIDAGEYR': rng.integers(20, 80, 100).astype(float),
+            'RIAGENDR': rng.choice([1.0, 2.0], 100),
+            'LBXSCR': rng.normal(0.9, 0.2, 100),
+        })
+        compacted, _ = compact_dtypes(df)
+
+        expected = PreprocessingPipeline(categorical_cols=['RIAGENDR']).fit(df).transform(df)
+        result = PreprocessingPipeline(categorical_cols=['RIAGENDR']).fit(compacted).transform(compacted)
+
+        assert 'RIAGENDR_2.0' in result.columns
+        np.testing.assert_array_equal(result['RIAGENDR_2.0'], expected['RIAGENDR_2.0'])
+        np.testing.assert_allclose(result['LBXSCR'], expected['LBXSCR'], rtol=1e-6)
+
+    def test_compact_dtypes_enforces_memory_budget(self):
+        """Test that exceeding the memory budget raises MemoryError."""
+        df = pd.DataFrame({'LBXSCR': np.linspace(0.5, 1.5, 100000)})
+
+        assert memory_report(df).loc['LBXSCR', 'dtype'] == 'float64'
+        with pytest.raises(MemoryError, match="LBXSCR"):
+            compact_dtypes(df, memory_budget_mb=0.1)
@@ -5,8 +5,26 @@ import numpy as np
 from src.organ_aging.evaluation import (
     calculate_metrics,
     compute_age_bio_and_gaps,
-    compare_models
+    compare_models,
+    clear_fold_cache,
+    cross_validate_organs,
+    get_cv_folds
 )
+from src.organ_aging import evaluation
+
+
+@pytest.fixture
+def organ_datasets():
+    """(X, y) datasets for two organs."""
+    n = 300
+    rng = np.random.default_rng(0)
+    datasets = {}
+    for organ in ['liver', 'kidney']:
+        X = pd.DataFrame(rng.normal(size=(n, 4)), columns=['a', 'b', 'c', 'd'])
+        y = pd.Series((50 + 6 * X['a'] + 3 * np.sin(X['b'])).to_numpy() + rng.normal(size=n),
+                      index=np.arange(1000, 1000 + n))
+        datasets[organ] = (X, y)
+    return datasets
 
 
 class TestEvaluation:
@@ -60,3 +78,78 @@ class TestEvaluation:
         assert 'model_name' in result.columns
         assert 'mae' in result.columns
         assert len(result) == 3
+
+    def test_get_cv_folds_partitions_and_caches(self, tmp_path, organ_datasets):
+        """Test that folds partition the rows and are cached on disk."""
+        X, y = organ_datasets['liver']
+
+        folds = get_cv_folds(X, y, n_folds=5, cache_dir=str(tmp_path))
+        val_rows = np.concatenate([val_idx for _, val_idx in folds])
+
+        assert np.array_equal(np.sort(val_rows), np.arange(len(y)))
+        assert len(list(tmp_path.glob("folds-*.npy"))) == 1
+        again = get_cv_folds(X, y, n_folds=5, cache_dir=str(tmp_path))
+        assert all(np.array_equal(a[1], b[1]) for a, b in zip(folds, again))
+
+    def test_fold_cache_is_bounded_and_clearable(self, monkeypatch, organ_datasets):
+        """Test that the in-memory fold cache evicts old entries and can be cleared."""
+        monkeypatch.setattr(evaluation, '_FOLD_CACHE_SIZE', 2)
+        clear_fold_cache()
+        X, y = organ_datasets['liver']
+        for n_folds in (3, 4, 5):
+            get_cv_folds(X, y, n_folds=n_folds)
+
+        assert len(evaluation._FOLD_CACHE) == 2
+        assert all(not key.endswith('-k3-s42') for key in evaluation._FOLD_CACHE)
+        clear_fold_cache()
+        assert not evaluation._FOLD_CACHE
+
+    def test_cross_validate_organs_matches_sklearn_elastic_net(self, organ_datasets):
+        """Test that the warm-started path reproduces ElasticNet CV at a fixed alpha."""
+        from sklearn.linear_model import ElasticNet
+        from sklearn.model_selection import KFold, cross_val_score
+
+        cv = cross_validate_organs(organ_datasets, ['elastic_net', 'hist_gb'], n_jobs=1,
+                                   alphas=[0.1], model_params={'hist_gb': {'max_iter': 20}})
+
+        X, y = organ_datasets['liver']
+        expected = -cross_val_score(ElasticNet(alpha=0.1, l1_ratio=0.5), X, y,
+                                    cv=KFold(5, shuffle=True, random_state=42),
+                                    scoring='neg_mean_absolute_error').mean()
+        summary = cv['summary'].set_index(['organ', 'model_type'])
+
+        assert summary.loc[('liver', 'elastic_net'), 'mae_mean'] == pytest.approx(expected, rel=1e-4)
+        assert len(cv['fold_metrics']) == 2 * 2 * 5
+        oof = cv['oof_predictions']['liver']
+        assert list(oof.columns) == ['elastic_net', 'hist_gb']
+        assert oof.index.equals(y.index)
+        assert not oof.isna().any().any()
+
+    def test_cross_validate_organs_selects_alpha_from_path(self, organ_datasets):
+        """Test that the selected alpha minimises mean validation MAE on the path."""
+        cv = cross_validate_organs(organ_datasets, ['elastic_net'], n_jobs=2)
+
+        path = cv['alpha_path']['kidney']
+        selected = cv['summary'].set_index('organ').loc['kidney', 'alpha']
+        assert selected == path.loc[path['mae_mean'].idxmin(), 'alpha']
+        assert selected < 10
+
+    def test_cross_validate_organs_scores_elastic_net_nested(self, organ_datasets):
+        """Test that each fold is scored at an alpha chosen without its labels."""
+        from sklearn.linear_model import ElasticNet
+
+        X, y = organ_datasets['liver']
+        cv = cross_validate_organs({'liver': (X, y)}, ['elastic_net'], n_jobs=1)
+        folds = cv['fold_metrics'].set_index('fold')
+        train_idx, val_idx = get_cv_folds(X, y)[0]
+
+        model = ElasticNet(alpha=folds.loc[0, 'alpha'], l1_ratio=0.5, max_iter=10000)
+        model.fit(X.iloc[train_idx], y.iloc[train_idx])
+        mae = np.abs(model.predict(X.iloc[val_idx]) - y.iloc[val_idx]).mean()
+        assert folds.loc[0, 'mae'] == pytest.approx(mae, rel=1e-3)
+
+        # Changing the validation labels of fold 0 cannot change its alpha
+        y_shifted = y.copy()
+        y_shifted.iloc[val_idx] += 100
+        shifted = cross_validate_organs({'liver': (X, y_shifted)}, ['elastic_net'], n_jobs=1)
+        assert shifted['fold_metrics'].set_index('fold').loc[0, 'alpha'] == folds.loc[0, 'alpha']
@@ -0,0 +1,145 @@
+"""Tests for explainability module."""
+import pytest
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.linear_model import ElasticNet, Ridge
+from sklearn.preprocessing import StandardScaler
+from src.organ_aging.explainability import (calculate_permutation_importance, calculate_shap_values,
+                                            get_feature_importance, linear_attributions,
+                                            panel_feature_groups)
+from src.organ_aging.models import train_linear_model
+from src.organ_aging.trees import FlatTreeEnsemble
+
+
+@pytest.fixture
+def clock_data():
+    """A biomarker DataFrame, a target and a fitted HistGB clock."""
+    n = 300
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(n, 3)), columns=['ALT', 'AST', 'BMI'])
+    X.loc[::10, 'AST'] = np.nan
+    y = 50 + 8 * X['ALT'] - 3 * X['BMI'] + rng.normal(size=n)
+    model = HistGradientBoostingRegressor(max_iter=20, random_state=0).fit(X, y)
+    return X, y, model
+
+
+class TestExplainability:
+    """Test model explanation tools."""
+
+    def test_hist_gb_shap_uses_native_tree_shap(self, clock_data):
+        """Test that HistGB clocks get exact TreeSHAP values without KernelExplainer."""
+        X, _, model = clock_data
+
+        explanation = calculate_shap_values(model, X, n_jobs=1)
+
+        assert explanation.values.shape == X.shape
+        assert explanation.feature_names == ['ALT', 'AST', 'BMI']
+        np.testing.assert_allclose(explanation.values.sum(axis=1) + explanation.base_values,
+                                   model.predict(X), atol=1e-9)
+
+        flat = calculate_shap_values(FlatTreeEnsemble.from_hist_gb(model), X, n_jobs=1)
+        np.testing.assert_allclose(flat.values, explanation.values)
+
+    def test_gain_and_split_importance_from_tree_nodes(self, clock_data):
+        """Test that HistGB importances are read from the fitted split nodes."""
+        X, _, model = clock_data
+        nodes = np.concatenate([predictor[0].nodes for predictor in model._predictors])
+        splits = nodes[nodes['is_leaf'] == 0]
+
+        gain = get_feature_importance(model, list(X.columns), importance_type='gain')
+        split = get_feature_importance(model, list(X.columns), importance_type='split')
+        auto = get_feature_importance(model, list(X.columns))
+
+        assert gain['feature'].iloc[0] == 'ALT'
+        expected = {j: splits['gain'][splits['feature_idx'] == j].sum() for j in range(3)}
+        np.testing.assert_allclose(gain.set_index('feature').loc[X.columns, 'importance'],
+                                   [expected[j] for j in range(3)])
+        assert split['importance'].sum() == len(splits)
+        pd.testing.assert_frame_equal(auto, gain)
+
+        with pytest.raises(ValueError, match="no coefficients"):
+            get_feature_importance(model, list(X.columns), importance_type='coef')
+
+    def test_gain_and_split_importance_of_sklearn_forests(self, clock_data):
+        """Test that random forests report impurity gain and split counts."""
+        from sklearn.ensemble import RandomForestRegressor
+
+        X, y, _ = clock_data
+        forest = RandomForestRegressor(n_estimators=5, max_depth=3, random_state=0).fit(X.fillna(0), y)
+
+        gain = get_feature_importance(forest, list(X.columns), importance_type='gain')
+        split = get_feature_importance(forest, list(X.columns), importance_type='split')
+
+        pd.testing.assert_frame_equal(gain, get_feature_importance(forest, list(X.columns)))
+        n_splits = sum((tree.tree_.feature >= 0).sum() for tree in forest.estimators_)
+        assert split['importance'].sum() == n_splits
+        with pytest.raises(ValueError, match="Unknown importance_type"):
+            get_feature_importance(forest, list(X.columns), importance_type='weight')
+
+    def test_permutation_importance_is_deterministic_across_chunks_and_jobs(self, clock_data):
+        """Test that chunking and parallelism do not change permutation importance."""
+        X, y, model = clock_data
+
+        single = calculate_permutation_importance(model, X, y, n_repeats=3, chunk_size=10 ** 6, n_jobs=1)
+        chunked = calculate_permutation_importance(model, X, y, n_repeats=3, chunk_size=37, n_jobs=2)
+
+        pd.testing.assert_frame_equal(single, chunked)
+        assert single['feature'].iloc[0] == 'ALT'
+        assert single.set_index('feature').loc['AST', 'importance_mean'] < 0.05
+
+        order = np.random.default_rng((42, 0, 0)).permutation(len(X))
+        X_permuted = X.copy()
+        X_permuted['ALT'] = X['ALT'].to_numpy()[order]
+        mae = calculate_permutation_importance(model, X, y, n_repeats=1, metric='mae', n_jobs=1)
+        expected = np.abs(model.predict(X_permuted) - y).mean() - np.abs(model.predict(X) - y).mean()
+        assert mae.set_index('feature').loc['ALT', 'importance_mean'] == pytest.approx(expected)
+
+    def test_grouped_permutation_scores_correlated_features_together(self):
+        """Test that permuting a group of duplicated features reveals their shared signal."""
+        rng = np.random.default_rng(0)
+        signal = rng.normal(size=500)
+        X = pd.DataFrame({'TC_HDL_Ratio': signal, 'TG_HDL_Ratio': signal + rng.normal(0, 0.01, 500),
+                          'BMXBMI': rng.normal(size=500)})
+        y = 50 + 10 * signal + rng.normal(size=500)
+        model = Ridge(alpha=10).fit(X, y)
+        groups = panel_feature_groups({'lipid_ratios': ['TC_HDL_Ratio', 'TG_HDL_Ratio', 'LBXTC']},
+                                      list(X.columns))
+
+        assert groups == {'lipid_ratios': ['TC_HDL_Ratio', 'TG_HDL_Ratio'], 'BMXBMI': ['BMXBMI']}
+        grouped = calculate_permutation_importance(model, X, y, groups=groups, n_jobs=1).set_index('feature')
+        single = calculate_permutation_importance(model, X, y, n_jobs=1).set_index('feature')
+
+        assert grouped.loc['lipid_ratios', 'n_features'] == 2
+        assert grouped.loc['lipid_ratios', 'importance_mean'] > single['importance_mean'].max()
+
+        with pytest.raises(ValueError):
+            calculate_permutation_importance(model, X, y, groups={'panel': ['LBXTC']})
+
+    def test_linear_attributions_fold_scaler_into_raw_units(self, clock_data):
+        """Test closed-form linear attributions against coef * (z - mean) in scaled space."""
+        X, y, _ = clock_data
+        X = X.fillna(X.mean())
+        scaler = StandardScaler().fit(X)
+        X_scaled = scaler.transform(X)
+        model = ElasticNet(alpha=0.01).fit(X_scaled, y)
+
+        values, base_values = linear_attributions(model, X, scaler=scaler)
+
+        np.testing.assert_allclose(values, model.coef_ * (X_scaled - X_scaled.mean(axis=0)), atol=1e-9)
+        np.testing.assert_allclose(values.sum(axis=1) + base_values, model.predict(X_scaled), atol=1e-9)
+
+        explanation = calculate_shap_values(model, X, scaler=scaler)
+        np.testing.assert_allclose(explanation.values, values)
+        assert explanation.feature_names == ['ALT', 'AST', 'BMI']
+
+    def test_linear_attributions_follow_imputation_of_missing_values(self, clock_data):
+        """Test that NaN-tolerant linear clocks attribute missing values through their imputer."""
+        X, y, _ = clock_data
+        model = train_linear_model(X, y, model_type='linear')
+
+        values, base_values = linear_attributions(model, X, dtype=np.float32)
+
+        assert values.dtype == np.float32
+        assert not np.isnan(values).any()
+        np.testing.assert_allclose(values.sum(axis=1) + base_values, model.predict(X), atol=1e-4)
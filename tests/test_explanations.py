@@ -0,0 +1,66 @@
+"""Tests for explanations module."""
+import pytest
+import pandas as pd
+import numpy as np
+from src.organ_aging.explanations import ExplanationStore, explain_cohort, export_explanations
+from src.organ_aging.scoring import OrganClockEnsemble, score_in_chunks
+
+
+class TestExplanations:
+    """Test precomputed per-individual explanations."""
+
+    def test_attributions_add_up_to_predicted_ages(self, cohort, organ_clocks):
+        """Test that every organ's attributions plus base value give its predicted age."""
+        models_dir, reference = organ_clocks
+        ensemble = OrganClockEnsemble.from_models_dir(str(models_dir))
+
+        explanations = explain_cohort(ensemble, cohort, n_jobs=1)
+
+        assert list(explanations.columns[:3]) == ['SEQN', 'organ', 'base_value']
+        assert len(explanations) == 2 * len(cohort)
+        for organ, features in (('liver', ['ALT', 'AST', 'BMI']), ('kidney', ['CREAT', 'BUN', 'BMI'])):
+            rows = explanations[explanations['organ'] == organ]
+            np.testing.assert_array_equal(rows['SEQN'], cohort['SEQN'])
+            unused = [col for col in ensemble.feature_names if col not in features]
+            assert rows[unused].isna().all().all()
+            total = rows[features].sum(axis=1) + rows['base_value']
+            np.testing.assert_allclose(total, reference[organ], atol=1e-3)
+
+    def test_store_returns_top_drivers_from_parquet(self, tmp_path, cohort, organ_clocks):
+        """Test export to Parquet and top-k lookup by SEQN."""
+        models_dir, _ = organ_clocks
+        ensemble = OrganClockEnsemble.from_models_dir(str(models_dir))
+        path = tmp_path / "explanations.parquet"
+
+        n_rows = export_explanations(ensemble, cohort, str(path), dtype=np.float16, n_jobs=1)
+        store = ExplanationStore.load(str(path))
+
+        assert n_rows == 2 * len(cohort)
+        assert pd.read_parquet(path)['ALT'].dtype == np.float16
+        assert store.organs == ['liver', 'kidney']
+
+        drivers = store.top_drivers(7, k=2)
+        liver = store.explain(7, 'liver')
+        expected = liver.drop('base_value').abs().sort_values(ascending=False, kind='stable')
+        assert [feature for feature, _ in drivers['liver']] == list(expected.index[:2])
+        assert drivers['liver'][0][1] == pytest.approx(liver[expected.index[0]])
+        assert set(store.explain(7, 'kidney').index) == {'CREAT', 'BUN', 'BMI', 'base_value'}
+        assert list(store.top_drivers(7, k=1, organs=['kidney'])) == ['kidney']
+
+        with pytest.raises(KeyError):
+            store.top_drivers(10 ** 6)
+
+    def test_chunked_export_writes_explanations_alongside_age_gaps(self, tmp_path, cohort, organ_clocks):
+        """Test that score_in_chunks writes an explanation dataset keyed like the age gaps."""
+        models_dir, _ = organ_clocks
+        ensemble = OrganClockEnsemble.from_models_dir(str(models_dir))
+
+        score_in_chunks([cohort.iloc[:120], cohort.iloc[120:]], ensemble, str(tmp_path / "age_gaps"),
+                        explanations_dir=str(tmp_path / "explanations"))
+        store = ExplanationStore.load(str(tmp_path / "explanations"))
+
+        assert len(store) == 2 * len(cohort)
+        single = explain_cohort(ensemble, cohort, n_jobs=1)
+        kidney = single[(single['organ'] == 'kidney') & (single['SEQN'] == 150)]
+        np.testing.assert_allclose(store.explain(150, 'kidney')[['CREAT', 'BUN', 'BMI']],
+                                   kidney[['CREAT', 'BUN', 'BMI']].to_numpy()[0])
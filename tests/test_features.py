@@ -5,8 +5,18 @@ import numpy as np
 from src.organ_aging.features import (
     build_organ_datasets,
     split_train_val_test,
-    scale_features
+    scale_features,
+    compute_egfr,
+    compute_engineered_features,
+    add_engineered_features,
+    panel_derived_features,
+    resolve_derived_features,
+    make_split_manifest,
+    DERIVED_FEATURES,
+    DerivedFeature,
+    SplitManifest
 )
+from src.organ_aging.store import build_organ_views
 
 
 class TestFeatureEngineering:
@@ -71,3 +81,140 @@ class TestFeatureEngineering:
         assert X_test_scaled.shape == X_test.shape
         assert abs(X_train_scaled.mean().mean()) < 0.1  # Close to 0
         assert scaler is not None
+
+    def test_compute_egfr_matches_training_formula(self):
+        """Test eGFR against hand-computed CKD-EPI 2009 values used in training."""
+        egfr = compute_egfr(
+            creatinine=np.array([0.7, 1.2, 1.0, 0.0]),
+            age=np.array([50, 60, 40, 40]),
+            sex=np.array([2, 1, np.nan, 1])
+        )
+        female = 141 * 0.993 ** 50 * 1.018
+        male = 141 * (1.2 / 0.9) ** -1.209 * 0.993 ** 60
+        np.testing.assert_allclose(egfr[:2], [female, male])
+        assert np.isnan(egfr[2:]).all()
+
+    def test_compute_engineered_features_handles_zero_and_missing(self):
+        """Test vectorized derived features with zero and missing denominators."""
+        columns = {
+            'LBXSASSI': np.array([30.0, 20.0, 25.0]),
+            'LBXSATSI': np.array([15.0, 0.0, np.nan]),
+            'LBXTC': np.array([200.0, 180.0, 190.0]),
+            'LBDHDD': np.array([50.0, 60.0, 0.0]),
+        }
+
+        derived = compute_engineered_features(columns)
+
+        np.testing.assert_allclose(derived['AST_ALT_Ratio'], [2.0, np.nan, np.nan])
+        np.testing.assert_allclose(derived['TC_HDL_Ratio'], [4.0, 3.0, np.nan])
+        np.testing.assert_allclose(derived['Non_HDL'], [150.0, 120.0, 190.0])
+        assert 'TG_HDL_Ratio' not in derived
+        assert 'eGFR' not in derived
+
+    def test_panel_derived_features_selects_only_needed_features(self):
+        """Test that only derived features used by the scored panels are computed."""
+        organ_panels = {
+            'liver': ['LBXSATSI', 'LBXSASSI', 'AST_ALT_Ratio'],
+            'kidney': ['LBXSCR', 'eGFR', 'ACR'],
+            'global_covariates': ['BMXBMI'],
+        }
+        columns = {
+            'LBXSATSI': np.array([20.0]), 'LBXSASSI': np.array([30.0]),
+            'LBXSCR': np.array([0.9]), 'RIDAGEYR': np.array([50.0]), 'RIAGENDR': np.array([1.0]),
+            'LBXTC': np.array([200.0]), 'LBDHDD': np.array([50.0]),
+        }
+
+        needed = panel_derived_features(organ_panels, organs=['kidney'])
+        derived = compute_engineered_features(columns, features=needed)
+
+        assert needed == ['eGFR', 'ACR']
+        assert list(derived) == ['eGFR']
+        assert set(compute_engineered_features(columns)) == {
+            'eGFR', 'AST_ALT_Ratio', 'Non_HDL', 'TC_HDL_Ratio'
+        }
+
+    def test_resolve_derived_features_orders_dependencies(self, monkeypatch):
+        """Test that derived-on-derived features are computed after their inputs."""
+        monkeypatch.setitem(DERIVED_FEATURES, 'eGFR_per_Cr', DerivedFeature(
+            ('eGFR', 'LBXSCR'), lambda egfr, cr: egfr / cr
+        ))
+
+        assert resolve_derived_features(['eGFR_per_Cr']) == ['eGFR', 'eGFR_per_Cr']
+        columns = {'LBXSCR': np.array([1.0]), 'RIDAGEYR': np.array([40.0]),
+                   'RIAGENDR': np.array([2.0])}
+        derived = compute_engineered_features(columns, features=['eGFR_per_Cr'])
+        np.testing.assert_allclose(derived['eGFR_per_Cr'], derived['eGFR'])
+
+    def test_batch_and_single_row_features_agree(self):
+        """Test that DataFrame and single-row computation give identical values."""
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({
+            'LBXSCR': rng.uniform(0.5, 1.5, 50), 'RIDAGEYR': rng.uniform(20, 80, 50),
+            'RIAGENDR': rng.choice([1.0, 2.0], 50), 'LBXWBCSI': rng.uniform(4, 10, 50),
+            'LBXLYPCT': rng.uniform(20, 40, 50), 'LBXNEPCT': rng.uniform(40, 70, 50),
+        })
+
+        batch = add_engineered_features(df)
+        row = compute_engineered_features({k: np.array([v]) for k, v in df.iloc[7].items()})
+
+        for name, values in row.items():
+            assert batch[name].iloc[7] == pytest.approx(values[0])
+        assert 'NLR' in batch.columns
+
+    def test_split_manifest_rebuilds_original_split(self, tmp_path):
+        """Test that a saved manifest reproduces the split it recorded."""
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame({'feature1': rng.normal(size=100)}, index=np.arange(100) + 1000)
+        y = pd.Series(rng.integers(20, 80, 100).astype(float), index=X.index)
+
+        *splits, manifest = split_train_val_test(X, y, stratify_bins=4, return_manifest=True)
+        manifest.save(tmp_path / "splits.json")
+        rebuilt = SplitManifest.load(tmp_path / "splits.json").split(X, y)
+
+        assert manifest.params['stratify_bins'] == 4
+        for original, restored in zip(splits, rebuilt):
+            pd.testing.assert_index_equal(original.index, restored.index)
+
+    def test_split_manifest_is_shared_across_organs(self):
+        """Test that organ splits use the same participants in each split."""
+        rng = np.random.default_rng(1)
+        df = pd.DataFrame({
+            'SEQN': np.arange(200) + 5000,
+            'AGE': rng.integers(20, 80, 200).astype(float),
+            'ALT': rng.normal(25, 5, 200),
+            'CREAT': rng.normal(0.9, 0.2, 200),
+            'BMI': rng.normal(27, 4, 200),
+        })
+        df.loc[:19, 'ALT'] = np.nan
+
+        manifest = make_split_manifest(df, target_col='AGE', id_col='SEQN')
+        views = build_organ_views(df, {'liver': ['ALT'], 'kidney': ['CREAT']}, global_covars=['BMI'])
+        organ_splits = manifest.organ_splits(views)
+
+        for split_name in SplitManifest.SPLITS:
+            liver_ids = set(organ_splits['liver'][f'X_{split_name}'].index)
+            kidney_ids = set(organ_splits['kidney'][f'X_{split_name}'].index)
+            assert liver_ids <= kidney_ids
+            assert kidney_ids == set(manifest.ids[split_name])
+        assert len(organ_splits['liver']['y_train']) == len(organ_splits['liver']['X_train'])
+        assert sum(len(organ_splits['liver'][f'X_{name}']) for name in SplitManifest.SPLITS) == 180
+
+    def test_build_organ_datasets_keeps_missing_values_without_dropna(self):
+        """Test that dropna=False gives every organ the same rows with NaN kept."""
+        df = pd.DataFrame({
+            'AGE': [25, 35, 45, 55, np.nan],
+            'ALT': [20, np.nan, 30, 35, 40],
+            'CREAT': [0.8, 0.9, np.nan, 1.1, 1.0],
+            'BMI': [22, 25, 28, np.nan, 26]
+        })
+        panels = {'liver': ['ALT'], 'kidney': ['CREAT']}
+
+        dropped = build_organ_datasets(df, panels, global_covars=['BMI'])
+        kept = build_organ_datasets(df, panels, global_covars=['BMI'], dropna=False)
+        views = build_organ_views(df, panels, global_covars=['BMI'], index_col=None, dropna=False)
+
+        assert len(dropped['liver'][0]) == 2
+        assert list(kept['liver'][0].index) == list(kept['kidney'][0].index) == [0, 1, 2, 3]
+        assert kept['liver'][0].isna().any().any()
+        assert views['liver'].rows is views['kidney'].rows
+        np.testing.assert_array_equal(views['liver'].matrix(), kept['liver'][0].to_numpy(np.float32))
@@ -63,3 +63,28 @@ class TestModels:
         original_pred = model.predict(X_train)
         loaded_pred = loaded_model.predict(X_train)
         np.testing.assert_array_almost_equal(original_pred, loaded_pred)
+
+    def test_train_linear_model_imputes_missing_values(self):
+        """Test that NaN-bearing training data yields an imputer + linear pipeline."""
+        rng = np.random.default_rng(0)
+        X_train = pd.DataFrame({'feature1': rng.normal(size=100), 'feature2': rng.normal(size=100)})
+        y_train = pd.Series(40 + 5 * X_train['feature1'] + rng.normal(size=100))
+        X_train.loc[::4, 'feature2'] = np.nan
+
+        model = train_linear_model(X_train, y_train)
+
+        assert type(model).__name__ == 'Pipeline'
+        assert not np.isnan(model.predict(X_train)).any()
+        assert type(train_linear_model(X_train.dropna(), y_train[X_train.notna().all(axis=1)])) \
+            is LinearRegression
+
+    def test_train_linear_model_detects_missing_values_in_arrays(self):
+        """Test missing-value detection on float32 and integer arrays."""
+        rng = np.random.default_rng(0)
+        X_train = rng.normal(size=(100, 2)).astype(np.float32)
+        y_train = 40 + 5 * X_train[:, 0] + rng.normal(size=100)
+        X_train[::4, 1] = np.nan
+
+        assert type(train_linear_model(X_train, y_train)).__name__ == 'Pipeline'
+        X_counts = rng.integers(0, 10, size=(100, 2))
+        assert type(train_linear_model(X_counts, y_train)) is LinearRegression
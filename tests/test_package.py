@@ -0,0 +1,77 @@
+"""Tests for package import cost."""
+import json
+import pytest
+import subprocess
+import sys
+from pathlib import Path
+from src.organ_aging.bundle import export_model_bundle
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Cold import plus loading and scoring one bundled clock, excluding
+# interpreter startup. The eager package import alone took ~1.8 s.
+IMPORT_BUDGET_SECONDS = 1.0
+
+SCORING_WORKER = """
+import json, sys, time
+start = time.perf_counter()
+import src.organ_aging as organ_aging
+ensemble = organ_aging.scoring.OrganClockEnsemble.from_bundle(sys.argv[1], organs=['liver'])
+ensemble.predict(ensemble.build_feature_matrix(
+    __import__('pandas').DataFrame({name: [1.0] for name in ensemble.feature_names})
+))
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'elapsed': elapsed,
+    'heavy': [m for m in ('sklearn', 'matplotlib', 'seaborn', 'shap', 'umap', 'joblib')
+              if m in sys.modules],
+}))
+"""
+
+# Import every submodule; plotting and SHAP libraries must stay lazy
+IMPORT_ALL_SUBMODULES = """
+import importlib, json, sys
+import src.organ_aging as organ_aging
+for name in organ_aging._SUBMODULES:
+    importlib.import_module(f"src.organ_aging.{name}")
+print(json.dumps([m for m in ('matplotlib', 'seaborn', 'shap') if m in sys.modules]))
+"""
+
+
+class TestPackageImport:
+    """Test lazy package import."""
+
+    def test_submodules_load_on_attribute_access(self):
+        """Test that submodules are exposed lazily and unknown names raise."""
+        import src.organ_aging as organ_aging
+
+        assert 'scoring' in dir(organ_aging)
+        assert organ_aging.trees.FlatTreeEnsemble is not None
+        with pytest.raises(AttributeError):
+            organ_aging.not_a_module
+
+    def test_every_submodule_imports_without_plotting_libraries(self):
+        """Test that each submodule imports cleanly without matplotlib, seaborn or shap."""
+        completed = subprocess.run(
+            [sys.executable, '-c', IMPORT_ALL_SUBMODULES],
+            cwd=PROJECT_ROOT, capture_output=True, text=True
+        )
+
+        assert completed.returncode == 0, completed.stderr
+        assert json.loads(completed.stdout.strip().splitlines()[-1]) == []
+
+    def test_scoring_worker_import_budget(self, tmp_path, organ_clocks):
+        """Test that a bundle scoring worker stays within the import budget."""
+        models_dir, _ = organ_clocks
+        bundle_dir = tmp_path / "bundle"
+        export_model_bundle(str(models_dir), str(bundle_dir))
+
+        completed = subprocess.run(
+            [sys.executable, '-c', SCORING_WORKER, str(bundle_dir)],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        )
+        report = json.loads(completed.stdout.strip().splitlines()[-1])
+
+        assert report['heavy'] == []
+        assert report['elapsed'] < IMPORT_BUDGET_SECONDS, report
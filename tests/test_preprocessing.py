@@ -5,10 +5,31 @@ import numpy as np
 from src.organ_aging.preprocessing import (
     filter_by_age,
     handle_missing_values,
-    encode_categorical_variables
+    encode_categorical_variables,
+    remove_outliers,
+    standardize_column_names,
+    OutlierBounds,
+    PreprocessingPipeline
 )
 
 
+def make_raw_nhanes(n=60, seed=0):
+    """Create a raw merged NHANES-like frame with missing values."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'SEQN': np.arange(n, dtype=float),
+        'RIDAGEYR': rng.integers(10, 90, n).astype(float),
+        'RIAGENDR': rng.choice([1.0, 2.0], n),
+        'RIDRETH1': rng.choice([1.0, 2.0, 3.0], n),
+        'LBXSATSI': rng.normal(25, 5, n),
+        'LBXSCR': rng.normal(0.9, 0.2, n),
+        'URXUMA': np.nan,
+    })
+    df.loc[::5, 'LBXSATSI'] = np.nan
+    df.loc[::7, 'RIAGENDR'] = np.nan
+    return df
+
+
 class TestPreprocessing:
     """Test data preprocessing functions."""
 
@@ -59,3 +80,92 @@ class TestPreprocessing:
         result = handle_missing_values(df, strategy='median')
         assert not result['A'].isna().any()
         assert result['A'].median() > 0
+
+    def test_remove_outliers_is_column_order_independent(self):
+        """Test that outlier removal uses bounds from the full frame."""
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({'A': rng.normal(size=200), 'B': rng.normal(size=200)})
+        df.loc[:9, 'A'] = 50
+        df.loc[5:14, 'B'] = -50
+
+        forward = remove_outliers(df, columns=['A', 'B'], method='iqr', threshold=1.5)
+        backward = remove_outliers(df, columns=['B', 'A'], method='iqr', threshold=1.5)
+
+        pd.testing.assert_frame_equal(forward, backward)
+        assert not forward.index.isin(range(15)).any()
+
+    def test_outlier_bounds_match_pandas_quantiles(self):
+        """Test that vectorized bounds match per-column pandas quantiles."""
+        rng = np.random.default_rng(1)
+        df = pd.DataFrame({'A': rng.normal(size=100), 'B': rng.exponential(size=100)})
+        df.loc[3, 'B'] = np.nan
+
+        bounds = OutlierBounds(method='iqr', threshold=3.0).fit(df, ['A', 'B'])
+
+        for j, col in enumerate(['A', 'B']):
+            iqr = df[col].quantile(0.75) - df[col].quantile(0.25)
+            assert bounds.lower_[j] == pytest.approx(df[col].quantile(0.25) - 3 * iqr)
+            assert bounds.upper_[j] == pytest.approx(df[col].quantile(0.75) + 3 * iqr)
+
+        zscore = OutlierBounds(method='zscore', threshold=2.0).fit(df, ['A'])
+        assert zscore.upper_[0] == pytest.approx(df['A'].mean() + 2 * df['A'].std())
+
+    def test_outlier_bounds_flag_and_clip_new_rows(self):
+        """Test that fitted bounds flag and clip new rows, also after a round-trip."""
+        train = pd.DataFrame({'A': np.arange(100, dtype=float)})
+        bounds = OutlierBounds.from_dict(
+            OutlierBounds(method='iqr', threshold=1.0).fit(train, ['A']).to_dict()
+        )
+        new = pd.DataFrame({'A': [-500.0, 50.0, np.nan, 500.0]})
+
+        assert bounds.outlier_mask(new).tolist() == [True, False, False, True]
+        clipped = bounds.clip(new)
+        assert clipped['A'].iloc[0] == bounds.lower_[0]
+        assert clipped['A'].iloc[3] == bounds.upper_[0]
+        assert np.isnan(clipped['A'].iloc[2])
+
+    def test_pipeline_matches_notebook_preprocessing(self):
+        """Test that fit/transform reproduces the notebook preprocessing chain."""
+        df = make_raw_nhanes()
+
+        expected = filter_by_age(df, age_col='RIDAGEYR')
+        expected = handle_missing_values(expected, missing_threshold=0.5, strategy='median')
+        expected = standardize_column_names(expected)
+        expected = encode_categorical_variables(expected, categorical_cols=['RIAGENDR', 'RIDRETH1'])
+
+        pipeline = PreprocessingPipeline(age_col='RIDAGEYR').fit(df)
+        result = pipeline.transform(df)
+
+        assert 'RIAGENDR_2.0' in result.columns
+        assert pipeline.dropped_columns_ == ['URXUMA']
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_pipeline_roundtrip_and_column_transform(self, tmp_path):
+        """Test that a saved pipeline transforms new rows and column arrays identically."""
+        df = make_raw_nhanes()
+        pipeline = PreprocessingPipeline(age_col='RIDAGEYR', outlier_columns=['LBXSATSI'],
+                                         outlier_action='clip').fit(df)
+        pipeline.save(str(tmp_path / "preprocessing.json"))
+        loaded = PreprocessingPipeline.load(str(tmp_path / "preprocessing.json"))
+
+        new = make_raw_nhanes(n=20, seed=1)
+        new['RIDAGEYR'] = 50.0
+        new.loc[0, 'LBXSATSI'] = 1000.0
+        result = loaded.transform(new)
+        pd.testing.assert_frame_equal(result, pipeline.transform(new))
+
+        columns = loaded.transform_columns({col: new[col].to_numpy() for col in new.columns})
+        for col in ['LBXSATSI', 'RIAGENDR_2.0', 'RIDRETH1_3.0']:
+            np.testing.assert_allclose(columns[col], result[col].to_numpy(dtype=float))
+        assert 'URXUMA' not in columns
+        filled = loaded.transform_columns({'RIDAGEYR': np.array([50.0])}, n_rows=1)
+        assert filled['LBXSCR'][0] == loaded.fill_values_['LBXSCR']
+        assert columns['LBXSATSI'][0] == loaded.outlier_bounds_.upper_[0]
+
+    def test_pipeline_without_imputation_keeps_missing_values(self):
+        """Test that strategy=None skips imputation for NaN-native models."""
+        df = make_raw_nhanes()
+
+        result = PreprocessingPipeline(strategy=None).fit(df).transform(df)
+
+        assert result['LBXSATSI'].isna().sum() == df.loc[result.index, 'LBXSATSI'].isna().sum() > 0
@@ -0,0 +1,96 @@
+"""Tests for scaling module."""
+import pytest
+import pandas as pd
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import RobustScaler, StandardScaler
+from src.organ_aging.scaling import QuantileSketch, StreamingScaler, fold_scaler_into_linear
+from src.organ_aging.scoring import OrganClockEnsemble
+
+
+@pytest.fixture
+def matrix():
+    """Float matrix with columns on different scales and some NaN."""
+    n = 1000
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.normal(25, 5, n), rng.lognormal(0, 1, n), rng.normal(0.9, 0.2, n)])
+    X[::13, 1] = np.nan
+    return X
+
+
+class TestStreamingScaler:
+    """Test chunked, mergeable feature scaling."""
+
+    def test_chunked_standard_fit_matches_sklearn(self, matrix):
+        """Test that chunked moments equal StandardScaler on the full matrix."""
+
+        scaler = StreamingScaler('standard').fit(matrix, chunk_size=97)
+        reference = StandardScaler().fit(matrix)
+
+        np.testing.assert_allclose(scaler.mean_, reference.mean_, rtol=1e-12)
+        np.testing.assert_allclose(scaler.scale_, reference.scale_, rtol=1e-12)
+        np.testing.assert_array_equal(scaler.n_samples_seen_, reference.n_samples_seen_)
+
+    def test_merged_workers_match_single_fit(self, matrix):
+        """Test that scalers fitted on disjoint chunks merge into the full fit."""
+
+        for method in ('standard', 'robust'):
+            full = StreamingScaler(method).fit(matrix)
+            merged = StreamingScaler(method).partial_fit(matrix[:300])
+            merged.merge(StreamingScaler(method).partial_fit(matrix[300:]))
+
+            np.testing.assert_allclose(merged.center_, full.center_, rtol=1e-12)
+            np.testing.assert_allclose(merged.scale_, full.scale_, rtol=1e-12)
+
+    def test_robust_fit_matches_sklearn_and_sketch_is_accurate(self, matrix):
+        """Test robust parameters while exact and sketch error once compacting."""
+        scaler = StreamingScaler('robust').fit(matrix, chunk_size=100)
+        reference = RobustScaler().fit(matrix)
+
+        np.testing.assert_allclose(scaler.center_, reference.center_, rtol=1e-12)
+        np.testing.assert_allclose(scaler.scale_, reference.scale_, rtol=1e-12)
+
+        values = np.random.default_rng(1).normal(size=200000)
+        sketch = QuantileSketch(k=512)
+        for chunk in np.array_split(values, 40):
+            sketch.update(chunk)
+        assert sum(len(level) for level in sketch.levels) < 20 * 512
+        estimated = sketch.quantile([0.25, 0.5, 0.75])
+        # Compare ranks: the estimate should sit close to the true quantile
+        ranks = np.searchsorted(np.sort(values), estimated) / len(values)
+        np.testing.assert_allclose(ranks, [0.25, 0.5, 0.75], atol=0.01)
+
+    def test_transform_is_in_place_on_float32(self, matrix):
+        """Test that float32 arrays are scaled in place and NaN is kept."""
+        scaler = StreamingScaler('standard').fit(matrix)
+        X32 = matrix.astype(np.float32)
+
+        result = scaler.transform(X32)
+
+        assert result is X32
+        assert np.isnan(result[0, 1])
+        np.testing.assert_allclose(result, StandardScaler().fit(matrix).transform(matrix), atol=1e-5)
+
+    def test_folded_linear_clock_predicts_from_raw_features(self, cohort, organ_clocks, matrix):
+        """Test that folding the scaler gives the same predictions without scaling."""
+        matrix[np.isnan(matrix)] = 0
+        y = matrix @ np.array([1.0, 2.0, 3.0]) + 40
+        scaler = StreamingScaler('robust').fit(matrix)
+        model = LinearRegression().fit(scaler.transform(matrix, copy=True), y)
+
+        clock = fold_scaler_into_linear(model, scaler)
+
+        np.testing.assert_allclose(clock.predict(matrix),
+                                   model.predict(scaler.transform(matrix, copy=True)), rtol=1e-6)
+
+        models_dir, reference = organ_clocks
+        ensemble = OrganClockEnsemble.from_models_dir(str(models_dir), fold_scalers=True)
+        kidney = ensemble.clocks['kidney']
+        assert kidney.center is None and kidney.scale is None
+        np.testing.assert_allclose(ensemble.score(cohort)['kidney_age_bio'], reference['kidney'],
+                                   rtol=1e-9)
+
+    def test_mismatched_merge_raises(self, matrix):
+        """Test that merging different methods raises ValueError."""
+        with pytest.raises(ValueError):
+            StreamingScaler('standard').fit(matrix).merge(StreamingScaler('robust').fit(matrix))
@@ -0,0 +1,84 @@
+"""Tests for scoring module."""
+import pytest
+import pandas as pd
+import numpy as np
+from src.organ_aging.scoring import OrganClockEnsemble, score_in_chunks
+
+
+class TestScoring:
+    """Test batched multi-organ scoring."""
+
+    def test_ensemble_shares_feature_columns(self, cohort, organ_clocks):
+        """Test that shared features appear once in the feature matrix."""
+        models_dir, _ = organ_clocks
+
+        ensemble = OrganClockEnsemble.from_models_dir(str(models_dir))
+
+        assert ensemble.organs == ['liver', 'kidney']
+        assert ensemble.feature_names.count('BMI') == 1
+        X = ensemble.build_feature_matrix(cohort)
+        assert X.dtype == np.float32
+        assert X.flags['C_CONTIGUOUS']
+        assert X.shape == (len(cohort), 5)
+
+    def test_score_matches_per_organ_predictions(self, cohort, organ_clocks):
+        """Test that ensemble scoring matches per-organ model.predict."""
+        models_dir, reference = organ_clocks
+
+        ensemble = OrganClockEnsemble.from_models_dir(str(models_dir))
+        result = ensemble.score(cohort, age_col='AGE', batch_size=64)
+
+        assert list(result.columns[:2]) == ['SEQN', 'AGE']
+        for organ, expected in reference.items():
+            np.testing.assert_allclose(result[f'{organ}_age_bio'], expected, rtol=1e-10)
+            np.testing.assert_allclose(
+                result[f'{organ}_age_gap'], expected - cohort['AGE'], rtol=1e-10
+            )
+
+    def test_missing_values_only_affect_linear_clocks(self, cohort, organ_clocks):
+        """Test that NaN rows yield NaN for linear clocks but not native-NaN trees."""
+        models_dir, _ = organ_clocks
+        cohort.loc[0, 'BMI'] = np.nan
+
+        ensemble = OrganClockEnsemble.from_models_dir(str(models_dir))
+        result = ensemble.score(cohort)
+
+        assert np.isnan(result.loc[0, 'kidney_age_bio'])
+        assert not np.isnan(result.loc[0, 'liver_age_bio'])
+        assert not result['kidney_age_bio'].iloc[1:].isna().any()
+
+    def test_missing_feature_column_raises(self, cohort, organ_clocks):
+        """Test that a missing feature column raises ValueError."""
+        models_dir, _ = organ_clocks
+
+        ensemble = OrganClockEnsemble.from_models_dir(str(models_dir))
+        with pytest.raises(ValueError):
+            ensemble.score(cohort.drop(columns=['ALT']))
+
+    def test_score_in_chunks_writes_parquet_dataset(self, tmp_path, cohort, organ_clocks):
+        """Test that chunked scoring matches in-memory scoring."""
+        models_dir, _ = organ_clocks
+        ensemble = OrganClockEnsemble.from_models_dir(str(models_dir))
+
+        chunks = (cohort.iloc[start:start + 30] for start in range(0, len(cohort), 30))
+        drop_young = lambda chunk: chunk[chunk['AGE'] >= 30]
+        output_dir = tmp_path / "age_gaps"
+
+        n_rows = score_in_chunks(chunks, ensemble, str(output_dir), transforms=[drop_young])
+
+        expected = ensemble.score(drop_young(cohort)).reset_index(drop=True)
+        result = pd.read_parquet(output_dir)
+        assert n_rows == len(expected)
+        assert len(list(output_dir.glob("part-*.parquet"))) == 7
+        pd.testing.assert_frame_equal(result.sort_values('SEQN').reset_index(drop=True), expected)
+
+    def test_compiled_trees_match_sklearn_clocks(self, cohort, organ_clocks):
+        """Test that compile_trees scores identically to the sklearn clocks."""
+        models_dir, _ = organ_clocks
+
+        plain = OrganClockEnsemble.from_models_dir(str(models_dir)).score(cohort)
+        compiled_ensemble = OrganClockEnsemble.from_models_dir(str(models_dir), compile_trees=True)
+        compiled = compiled_ensemble.score(cohort)
+
+        assert type(compiled_ensemble.clocks['liver'].model).__name__ == 'FlatTreeEnsemble'
+        np.testing.assert_allclose(compiled['liver_age_bio'], plain['liver_age_bio'], atol=1e-9)
@@ -0,0 +1,128 @@
+"""Tests for serving module."""
+import json
+import threading
+import urllib.request
+import urllib.error
+import pytest
+import pandas as pd
+import numpy as np
+from src.organ_aging.explanations import ExplanationStore, explain_cohort
+from src.organ_aging.preprocessing import PreprocessingPipeline
+from src.organ_aging.scoring import OrganClockEnsemble
+from src.organ_aging.serving import ScoringService, create_server
+
+
+@pytest.fixture
+def service(cohort, organ_clocks):
+    """Scoring service over a small trained ensemble."""
+    models_dir, _ = organ_clocks
+    ensemble = OrganClockEnsemble.from_models_dir(str(models_dir))
+    return ScoringService(ensemble, max_batch_size=50), cohort
+
+
+def post_json(url, payload):
+    """POST a JSON payload and return (status, decoded body)."""
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'}
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestServing:
+    """Test the scoring service."""
+
+    def test_pipeline_imputes_missing_biomarkers(self, service):
+        """Test that a fitted pipeline fills missing values so linear clocks still score."""
+        service, df = service
+        service.pipeline = PreprocessingPipeline(age_col='AGE', categorical_cols=[]).fit(df)
+
+        record = df.iloc[0].to_dict()
+        del record['BMI']
+        result = service.score_records([record])[0]
+
+        assert result['organs']['kidney']['age_bio'] is not None
+        assert result['organs']['kidney']['age_gap'] == pytest.approx(
+            result['organs']['kidney']['age_bio'] - record['AGE'])
+
+    def test_score_records_matches_batch_scoring(self, service):
+        """Test that per-record scoring matches DataFrame scoring."""
+        service, df = service
+        records = df.head(20).to_dict(orient='records')
+
+        results = service.score_records(records)
+        expected = service.ensemble.score(df.head(20))
+
+        for i, result in enumerate(results):
+            assert result['SEQN'] == records[i]['SEQN']
+            for organ in ['liver', 'kidney']:
+                assert result['organs'][organ]['age_bio'] == pytest.approx(
+                    expected[f'{organ}_age_bio'].iloc[i])
+                assert result['organs'][organ]['age_gap'] == pytest.approx(
+                    expected[f'{organ}_age_gap'].iloc[i])
+
+    def test_score_records_derives_dummy_covariates(self, service):
+        """Test that 'RIAGENDR_2.0' style features are derived from raw codes."""
+        service, _ = service
+        service.ensemble.feature_names.append('RIAGENDR_2.0')
+
+        X, _ = service.build_feature_matrix([{'RIAGENDR': 2}, {'RIAGENDR': 1}, {}])
+
+        assert X[0, -1] == 1.0
+        assert X[1, -1] == 0.0
+        assert np.isnan(X[2, -1])
+
+    def test_score_records_reports_missing_as_none(self, service):
+        """Test that unscorable organs return None instead of NaN."""
+        service, df = service
+        record = df.iloc[0].to_dict()
+        del record['BUN']
+
+        result = service.score_records([record])[0]
+
+        assert result['organs']['kidney']['age_bio'] is None
+        assert result['organs']['liver']['age_bio'] is not None
+
+    def test_http_endpoints(self, service):
+        """Test single, batch, oversized and malformed requests over HTTP."""
+        service, df = service
+        server = create_server(service, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = f"http://127.0.0.1:{server.server_port}"
+
+        try:
+            with urllib.request.urlopen(f"{url}/health") as response:
+                assert json.loads(response.read())['organs'] == ['liver', 'kidney']
+
+            records = df.head(3).to_dict(orient='records')
+            status, body = post_json(f"{url}/score", records[0])
+            assert status == 200
+            assert set(body['organs']) == {'liver', 'kidney'}
+
+            status, body = post_json(f"{url}/score/batch", {'records': records})
+            assert status == 200
+            assert len(body['results']) == 3
+
+            status, _ = post_json(f"{url}/score/batch", {'records': [{}] * 51})
+            assert status == 413
+
+            status, body = post_json(f"{url}/score", {'ALT': 'high'})
+            assert status == 400
+            assert 'ALT' in body['error']
+
+            service.explanations = ExplanationStore(explain_cohort(service.ensemble, df, n_jobs=1))
+            with urllib.request.urlopen(f"{url}/explanations/3?k=2") as response:
+                body = json.loads(response.read())
+            assert body['id'] == 3
+            assert [len(drivers) for drivers in body['drivers'].values()] == [2, 2]
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(f"{url}/explanations/999999")
+            assert error.value.code == 404
+        finally:
+            server.shutdown()
+            server.server_close()
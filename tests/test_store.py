@@ -0,0 +1,102 @@
+"""Tests for store module."""
+import pickle
+import pytest
+import pandas as pd
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from src.organ_aging.features import build_organ_datasets, scale_features
+from src.organ_aging.scoring import OrganClockEnsemble
+from src.organ_aging.store import FeatureStore, build_organ_views
+
+
+ORGAN_PANELS = {
+    'liver': ['ALT', 'AST'],
+    'kidney': ['CREAT', 'BUN'],
+    'global_covariates': ['BMI'],
+}
+
+
+@pytest.fixture
+def cohort_with_gaps(cohort):
+    """The synthetic cohort with organ-specific missing values."""
+    cohort.loc[[3, 7], 'ALT'] = np.nan
+    cohort.loc[[5], 'CREAT'] = np.nan
+    return cohort
+
+
+class TestFeatureStore:
+    """Test the shared feature store and organ views."""
+
+    def test_views_match_build_organ_datasets(self, cohort_with_gaps):
+        """Test that views hold the same rows and columns as the copied datasets."""
+        datasets = build_organ_datasets(cohort_with_gaps, ORGAN_PANELS, global_covars=['BMI'])
+        views = build_organ_views(cohort_with_gaps, ORGAN_PANELS, global_covars=['BMI'])
+
+        for organ, (X, y) in datasets.items():
+            view = views[organ]
+            assert view.columns == list(X.columns)
+            assert len(view) == len(X)
+            np.testing.assert_array_equal(view.index, cohort_with_gaps.loc[X.index, 'SEQN'])
+            np.testing.assert_allclose(view.matrix(), X.to_numpy(np.float32))
+            np.testing.assert_allclose(view.y, y)
+
+    def test_shared_columns_are_stored_once(self, cohort_with_gaps):
+        """Test that all views share one store without copies of shared columns."""
+        views = build_organ_views(cohort_with_gaps, ORGAN_PANELS, global_covars=['BMI'])
+
+        store = views['liver'].store
+        assert views['kidney'].store is store
+        assert store.columns.count('BMI') == 1
+        assert store.values.dtype == np.float32
+        assert np.shares_memory(store.column('BMI'), store.values)
+
+    def test_view_take_selects_rows_by_position(self, cohort_with_gaps):
+        """Test that take composes row positions with the view's rows."""
+        liver = build_organ_views(cohort_with_gaps, ORGAN_PANELS, global_covars=['BMI'])['liver']
+
+        subset = liver.take([0, 2, 4])
+
+        np.testing.assert_array_equal(subset.matrix(), liver.matrix()[[0, 2, 4]])
+        np.testing.assert_array_equal(subset.y, liver.y[[0, 2, 4]])
+
+    def test_pickled_view_carries_only_its_own_data(self, cohort_with_gaps):
+        """Test that a pickled view round-trips without the full store."""
+        views = build_organ_views(cohort_with_gaps, ORGAN_PANELS, global_covars=['BMI'])
+        liver = views['liver'].take(np.arange(50))
+
+        restored = pickle.loads(pickle.dumps(liver))
+
+        assert restored.store.shape == (50, 4)
+        np.testing.assert_array_equal(restored.matrix(), liver.matrix())
+        np.testing.assert_array_equal(restored.y, liver.y)
+        np.testing.assert_array_equal(restored.index, liver.index)
+
+    def test_views_feed_estimators_and_scaling(self, cohort_with_gaps):
+        """Test that sklearn estimators and scale_features accept views."""
+        liver = build_organ_views(cohort_with_gaps, ORGAN_PANELS, global_covars=['BMI'])['liver']
+        X, y = liver.to_frame()
+
+        model = LinearRegression().fit(liver, liver.y)
+        reference = LinearRegression().fit(X, y)
+        np.testing.assert_allclose(model.coef_, reference.coef_, rtol=1e-6)
+
+        X_scaled, _, _, _ = scale_features(liver)
+        assert list(X_scaled.columns) == liver.columns
+        assert X_scaled.index.equals(liver.index)
+
+    def test_ensemble_scores_feature_store(self, cohort, organ_clocks):
+        """Test that scoring a FeatureStore matches scoring the DataFrame."""
+        models_dir, _ = organ_clocks
+        ensemble = OrganClockEnsemble.from_models_dir(str(models_dir))
+
+        store = FeatureStore.from_frame(cohort)
+        result = ensemble.score(store)
+        expected = ensemble.score(cohort)
+
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    def test_unknown_column_raises(self, cohort):
+        """Test that a view over a missing column raises ValueError."""
+        store = FeatureStore.from_frame(cohort)
+        with pytest.raises(ValueError):
+            store.view(['ALT', 'GGT'])
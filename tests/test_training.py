@@ -0,0 +1,65 @@
+"""Tests for training module."""
+import pytest
+import numpy as np
+import pandas as pd
+from src.organ_aging.models import load_model
+from src.organ_aging.training import plan_thread_budget, train_organs_parallel
+
+
+@pytest.fixture
+def organ_splits():
+    """Small train/test splits for two organs."""
+    n = 120
+    rng = np.random.default_rng(0)
+    organ_splits = {}
+    for organ in ['liver', 'kidney']:
+        X = pd.DataFrame(rng.normal(size=(n, 3)), columns=[f'{organ}_{i}' for i in range(3)])
+        y = pd.Series(50 + 10 * X.iloc[:, 0] + rng.normal(size=n), name='AGE')
+        organ_splits[organ] = {
+            'X_train': X.iloc[:100], 'y_train': y.iloc[:100],
+            'X_test': X.iloc[100:], 'y_test': y.iloc[100:],
+        }
+    return organ_splits
+
+
+class TestTraining:
+    """Test the parallel training orchestrator."""
+
+    def test_plan_thread_budget_avoids_oversubscription(self):
+        """Test that workers × threads never exceeds the core count."""
+        assert plan_thread_budget(n_jobs=10, n_cores=8) == {'workers': 8, 'threads_per_job': 1}
+        assert plan_thread_budget(n_jobs=2, n_cores=8) == {'workers': 2, 'threads_per_job': 4}
+        assert plan_thread_budget(n_jobs=6, n_cores=8, max_workers=3) == {
+            'workers': 3, 'threads_per_job': 2
+        }
+
+    def test_trains_all_jobs_and_resumes_from_checkpoints(self, tmp_path, organ_splits):
+        """Test that all jobs are trained, reported, and skipped on re-run."""
+        params = {'hist_gb': {'max_iter': 10}}
+
+        report = train_organs_parallel(organ_splits, model_types=['linear', 'hist_gb'],
+                                       save_dir=str(tmp_path), n_cores=2, model_params=params)
+
+        assert list(report['status']) == ['trained'] * 4
+        assert list(report['organ']) == ['liver', 'liver', 'kidney', 'kidney']
+        assert (report['wall_time_s'] > 0).all()
+        assert (report['peak_rss_mb'] > 0).all()
+        assert (tmp_path / "training_report.json").exists()
+
+        model, metadata = load_model(str(tmp_path / "kidney" / "hist_gb_model.pkl"),
+                                     return_metadata=True)
+        assert metadata['features'] == ['kidney_0', 'kidney_1', 'kidney_2']
+        assert 'test' in metadata['metrics']
+        assert set(metadata['feature_importance']['gain']) == {'kidney_0', 'kidney_1', 'kidney_2'}
+        assert max(metadata['feature_importance']['gain'],
+                   key=metadata['feature_importance']['gain'].get) == 'kidney_0'
+
+        resumed = train_organs_parallel(organ_splits, model_types=['linear', 'hist_gb'],
+                                        save_dir=str(tmp_path), n_cores=2)
+        assert list(resumed['status']) == ['skipped'] * 4
+
+    def test_unknown_model_type_raises(self, tmp_path, organ_splits):
+        """Test that unknown model types raise ValueError."""
+        with pytest.raises(ValueError):
+            train_organs_parallel(organ_splits, model_types=['random_forest'],
+                                  save_dir=str(tmp_path))
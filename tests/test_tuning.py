@@ -0,0 +1,76 @@
+"""Tests for tuning module."""
+import json
+import pytest
+import numpy as np
+from src.organ_aging.features import make_split_manifest
+from src.organ_aging.scoring import OrganClockEnsemble
+from src.organ_aging.store import build_organ_views
+from src.organ_aging.tuning import sample_candidates, successive_halving, tune_organ_clocks
+
+
+@pytest.fixture
+def organ_splits(make_cohort):
+    """Organ splits from views over a 600-participant synthetic cohort."""
+    df = make_cohort(600)
+    views = build_organ_views(df, {'liver': ['ALT', 'AST'], 'kidney': ['CREAT', 'BUN']},
+                              global_covars=['BMI'])
+    return make_split_manifest(df).organ_splits(views)
+
+
+class TestTuning:
+    """Test budgeted successive-halving search."""
+
+    def test_successive_halving_shrinks_candidates_and_grows_resources(self, organ_splits):
+        """Test that each rung keeps 1/eta of the candidates with more rows and iterations."""
+        splits = organ_splits['liver']
+        X_train, y_train = np.asarray(splits['X_train']), splits['y_train']
+        X_val, y_val = np.asarray(splits['X_val']), splits['y_val']
+        candidates = sample_candidates({'learning_rate': [0.05, 0.1, 0.2],
+                                        'max_depth': [2, 3, 4]}, n_candidates=9)
+
+        result = successive_halving(X_train, y_train, X_val, y_val, 'hist_gb', candidates,
+                                    eta=3, max_iterations=30, min_samples=50, min_iterations=5,
+                                    n_jobs=1)
+
+        rungs = {}
+        for record in result['history']:
+            rungs.setdefault(record['rung'], []).append(record)
+        # No rung is spent on a lone survivor, which the caller refits anyway
+        assert [len(rungs[r]) for r in sorted(rungs)] == [9, 3]
+        assert rungs[0][0]['n_samples'] < rungs[1][0]['n_samples'] == len(y_train)
+        assert rungs[0][0]['params']['max_iter'] < rungs[1][0]['params']['max_iter'] == 30
+        assert result['params']['max_iter'] == 30
+
+    def test_budget_stops_before_expensive_rungs(self, organ_splits):
+        """Test that a tiny budget stops after the first rung."""
+        splits = organ_splits['liver']
+        candidates = sample_candidates({'learning_rate': [0.05, 0.1, 0.2],
+                                        'max_depth': [2, 3, 4]}, n_candidates=9)
+
+        result = successive_halving(np.asarray(splits['X_train']), splits['y_train'],
+                                    np.asarray(splits['X_val']), splits['y_val'], 'hist_gb',
+                                    candidates, max_iterations=30, budget_s=1e-6,
+                                    budget_type='cpu', n_jobs=1)
+
+        assert {record['rung'] for record in result['history']} == {0}
+        assert result['params']['max_iter'] == 30
+
+    def test_tune_organ_clocks_writes_best_models(self, tmp_path, organ_splits):
+        """Test that tuned best models and summary load as an ensemble."""
+        models_dir = tmp_path / "models"
+
+        results = tune_organ_clocks(
+            organ_splits, model_types=['elastic_net', 'hist_gb'], n_candidates=4,
+            max_iterations=20, budget_s=None, n_jobs=1, save_dir=str(models_dir)
+        )
+
+        summary = json.loads((models_dir / "best_models_summary.json").read_text())
+        assert set(summary['best_models']) == {'liver', 'kidney'}
+        assert results['summary'].groupby('organ')['selected'].sum().eq(1).all()
+        for organ, entry in summary['best_models'].items():
+            assert (models_dir / organ / entry['filename']).exists()
+            assert entry['val_mae'] == pytest.approx(
+                results['summary'].query("organ == @organ and selected")['val_mae'].iloc[0])
+
+        ensemble = OrganClockEnsemble.from_models_dir(str(models_dir))
+        assert ensemble.clocks['liver'].features == ['ALT', 'AST', 'BMI']